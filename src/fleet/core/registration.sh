@@ -18,19 +18,72 @@ NC='\033[0m' # No Color
 FLEET_DIR="${INSTALL_DIR:-/opt/pipe-pop}/fleet"
 DB_DIR="$FLEET_DIR/db"
 NODES_DB="$DB_DIR/nodes.json"
+NODES_REGISTRY="$DB_DIR/nodes.db"
 SSH_MODULE="$(dirname "$0")/ssh.sh"
+REGISTRY_UI_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../../python_ui" 2>/dev/null && pwd)"
 
 # Import SSH module if available
 if [[ -f "$SSH_MODULE" ]]; then
   source "$SSH_MODULE"
 fi
 
+# Run the SQLite node registry CLI (src/python_ui/utils/fleet_registry.py)
+node_registry() {
+  (cd "$REGISTRY_UI_DIR" && python3 -m utils.fleet_registry --db "$NODES_REGISTRY" "$@")
+}
+
+# Check whether the node registry can be used
+registry_available() {
+  command -v python3 &>/dev/null && [[ -f "${REGISTRY_UI_DIR}/utils/fleet_registry.py" ]]
+}
+
+# Check whether nodes are kept in the registry rather than nodes.json
+using_registry() {
+  registry_available && [[ -f "$NODES_REGISTRY" ]]
+}
+
+# Print the node database Python tools should read: the registry or nodes.json
+fleet_nodes_source() {
+  if using_registry; then
+    echo "$NODES_REGISTRY"
+  else
+    echo "$NODES_DB"
+  fi
+}
+
+# Import nodes.json (and a groups.json) into the node registry
+migrate_node_registry() {
+  local groups_file="${1:-${GROUPS_FILE:-}}"
+  
+  if ! registry_available; then
+    echo -e "${RED}Error: python3 is required for the node registry.${NC}"
+    return 1
+  fi
+  
+  local args=(--nodes "$NODES_DB")
+  if [[ -n "$groups_file" && -f "$groups_file" ]]; then
+    args+=(--groups "$groups_file")
+  fi
+  
+  node_registry migrate "${args[@]}" || return 1
+  echo -e "${GREEN}Node registry ready at $NODES_REGISTRY${NC}"
+}
+
 # Ensure directories exist
 create_db_directories() {
   mkdir -p "$DB_DIR"
   chmod 755 "$DB_DIR"
   echo -e "${GREEN}Database directory created at $DB_DIR${NC}"
   
+  # Nodes live in the SQLite registry when python3 is available
+  if registry_available; then
+    if [[ ! -f "$NODES_REGISTRY" ]]; then
+      migrate_node_registry
+      chmod 644 "$NODES_REGISTRY"
+    fi
+    return 0
+  fi
+  
   # Create empty nodes database if it doesn't exist
   if [[ ! -f "$NODES_DB" ]]; then
     echo "{\"nodes\":[]}" > "$NODES_DB"
@@ -39,6 +92,42 @@ create_db_directories() {
   fi
 }
 
+# Initialize the node database
+init_node_db() {
+  create_db_directories
+}
+
+# Check if a node is registered
+node_exists() {
+  local name="$1"
+  
+  if using_registry; then
+    node_registry exists "$name"
+  else
+    jq -e --arg name "$name" '.nodes[] | select(.name == $name)' "$NODES_DB" >/dev/null 2>&1
+  fi
+}
+
+# Print a node's record as JSON
+get_node_data() {
+  local name="$1"
+  
+  if using_registry; then
+    node_registry get "$name"
+  else
+    jq --arg name "$name" '.nodes[] | select(.name == $name)' "$NODES_DB"
+  fi
+}
+
+# Print the names of all registered nodes, one per line
+list_node_names() {
+  if using_registry; then
+    node_registry names
+  elif [[ -f "$NODES_DB" ]]; then
+    jq -r '.nodes[].name' "$NODES_DB"
+  fi
+}
+
 # Register a new node
 register_node() {
   local name="$1"
@@ -61,7 +150,7 @@ register_node() {
   fi
   
   # Check if name already exists
-  if jq -e ".nodes[] | select(.name == \"$name\")" "$NODES_DB" >/dev/null 2>&1; then
+  if node_exists "$name"; then
     echo -e "${YELLOW}A node with name '$name' already exists.${NC}"
     read -p "Update it? (y/n): " confirm
     if [[ "$confirm" != "y" ]]; then
@@ -69,9 +158,11 @@ register_node() {
       return 0
     fi
     
-    # Remove existing node
-    jq ".nodes |= map(select(.name != \"$name\"))" "$NODES_DB" > "$NODES_DB.tmp"
-    mv "$NODES_DB.tmp" "$NODES_DB"
+    # Remove existing node (the registry replaces it in place)
+    if ! using_registry; then
+      jq ".nodes |= map(select(.name != \"$name\"))" "$NODES_DB" > "$NODES_DB.tmp"
+      mv "$NODES_DB.tmp" "$NODES_DB"
+    fi
   fi
   
   # Check connection if SSH module is available
@@ -84,6 +175,17 @@ register_node() {
     fi
   fi
   
+  if using_registry; then
+    node_registry register "$name" "$ip" "$username" --port "$port" \
+      --location "${location:-Unknown}" --description "${description:-}" --status "$status" >/dev/null || return 1
+    echo -e "${GREEN}Node '$name' registered successfully.${NC}"
+    
+    if type add_node &>/dev/null; then
+      add_node "$name" "$ip" "$username" "$port"
+    fi
+    return 0
+  fi
+  
   # Create node object
   local timestamp=$(date +"%Y-%m-%d %H:%M:%S")
   local node_json=$(jq -n \
@@ -128,7 +230,7 @@ update_node() {
   fi
   
   # Check if node exists
-  if ! jq -e ".nodes[] | select(.name == \"$name\")" "$NODES_DB" >/dev/null 2>&1; then
+  if ! node_exists "$name"; then
     echo -e "${RED}No node with name '$name' found.${NC}"
     return 1
   fi
@@ -146,17 +248,22 @@ update_node() {
   esac
   
   # Update node field
-  jq ".nodes |= map(if .name == \"$name\" then .${field} = \"${value}\" else . end)" "$NODES_DB" > "$NODES_DB.tmp"
-  mv "$NODES_DB.tmp" "$NODES_DB"
+  if using_registry; then
+    node_registry update "$name" "$field" "$value" || return 1
+  else
+    jq ".nodes |= map(if .name == \"$name\" then .${field} = \"${value}\" else . end)" "$NODES_DB" > "$NODES_DB.tmp"
+    mv "$NODES_DB.tmp" "$NODES_DB"
+  fi
   
   echo -e "${GREEN}Node '$name' updated: $field = $value${NC}"
   
   # Update SSH configuration if needed
   if [[ "$field" == "ip" || "$field" == "username" || "$field" == "port" ]] && type add_node &>/dev/null; then
     # Get current node details
-    local ip=$(jq -r ".nodes[] | select(.name == \"$name\") | .ip" "$NODES_DB")
-    local username=$(jq -r ".nodes[] | select(.name == \"$name\") | .username" "$NODES_DB")
-    local port=$(jq -r ".nodes[] | select(.name == \"$name\") | .port" "$NODES_DB")
+    local node_data=$(get_node_data "$name")
+    local ip=$(echo "$node_data" | jq -r .ip)
+    local username=$(echo "$node_data" | jq -r .username)
+    local port=$(echo "$node_data" | jq -r .port)
     
     # Update SSH configuration
     add_node "$name" "$ip" "$username" "$port"
@@ -177,7 +284,7 @@ unregister_node() {
   fi
   
   # Check if node exists
-  if ! jq -e ".nodes[] | select(.name == \"$name\")" "$NODES_DB" >/dev/null 2>&1; then
+  if ! node_exists "$name"; then
     echo -e "${RED}No node with name '$name' found.${NC}"
     return 1
   fi
@@ -190,8 +297,12 @@ unregister_node() {
   fi
   
   # Remove node from database
-  jq ".nodes |= map(select(.name != \"$name\"))" "$NODES_DB" > "$NODES_DB.tmp"
-  mv "$NODES_DB.tmp" "$NODES_DB"
+  if using_registry; then
+    node_registry remove "$name" || return 1
+  else
+    jq ".nodes |= map(select(.name != \"$name\"))" "$NODES_DB" > "$NODES_DB.tmp"
+    mv "$NODES_DB.tmp" "$NODES_DB"
+  fi
   
   echo -e "${GREEN}Node '$name' unregistered successfully.${NC}"
   
@@ -210,12 +321,20 @@ list_registered_nodes() {
   echo -e "${CYAN}==================================================${NC}"
   echo
   
-  if [[ ! -f "$NODES_DB" ]]; then
+  if ! using_registry && [[ ! -f "$NODES_DB" ]]; then
     echo -e "${YELLOW}No nodes registered yet.${NC}"
     return 0
   fi
   
-  local node_count=$(jq '.nodes | length' "$NODES_DB")
+  # name ip port status location registered, tab-separated
+  local node_rows
+  if using_registry; then
+    node_rows=$(node_registry list)
+  else
+    node_rows=$(jq -r '.nodes[] | [.name, .ip, .port, .status, .location, .registered] | @tsv' "$NODES_DB")
+  fi
+  local node_count=0
+  [[ -n "$node_rows" ]] && node_count=$(echo "$node_rows" | wc -l)
   
   if [[ "$node_count" -eq 0 ]]; then
     echo -e "${YELLOW}No nodes registered yet.${NC}"
@@ -227,8 +346,8 @@ list_registered_nodes() {
   echo "------------------------------------------------------------------------------------------------"
   
   # Print nodes
-  jq -r '.nodes[] | "\(.name) \(.ip) \(.port) \(.status) \(.location) \(.registered)"' "$NODES_DB" | \
-  while read -r name ip port status location registered; do
+  echo "$node_rows" | \
+  while IFS=$'\t' read -r name ip port status location registered; do
     # Color status
     if [[ "$status" == "Connected" ]]; then
       status="${GREEN}Connected${NC}"
@@ -257,7 +376,7 @@ get_node_details() {
   fi
   
   # Check if node exists
-  if ! jq -e ".nodes[] | select(.name == \"$name\")" "$NODES_DB" >/dev/null 2>&1; then
+  if ! node_exists "$name"; then
     echo -e "${RED}No node with name '$name' found.${NC}"
     return 1
   fi
@@ -269,7 +388,7 @@ get_node_details() {
   echo
   
   # Extract details
-  local details=$(jq -r ".nodes[] | select(.name == \"$name\")" "$NODES_DB")
+  local details=$(get_node_data "$name")
   
   echo -e "Name:        $(echo "$details" | jq -r .name)"
   echo -e "IP Address:  $(echo "$details" | jq -r .ip)"
@@ -310,8 +429,18 @@ update_node_status() {
     return 1
   fi
   
+  # Update status and last_seen; the registry changes one row
+  if using_registry; then
+    if ! node_registry status "$name" "$status"; then
+      echo -e "${RED}No node with name '$name' found.${NC}"
+      return 1
+    fi
+    echo -e "${GREEN}Node '$name' status updated to $status${NC}"
+    return 0
+  fi
+  
   # Check if node exists
-  if ! jq -e ".nodes[] | select(.name == \"$name\")" "$NODES_DB" >/dev/null 2>&1; then
+  if ! node_exists "$name"; then
     echo -e "${RED}No node with name '$name' found.${NC}"
     return 1
   fi
@@ -334,6 +463,9 @@ process_registration_command() {
     init)
       create_db_directories
       ;;
+    migrate)
+      migrate_node_registry "$@"
+      ;;
     register)
       if [[ $# -lt 3 ]]; then
         echo -e "${RED}Usage: --fleet register <name> <ip> <username> [port] [location] [description]${NC}"
@@ -374,7 +506,7 @@ process_registration_command() {
       ;;
     *)
       echo -e "${RED}Unknown registration command: $command${NC}"
-      echo -e "Available commands: init, register, update, unregister, list, details, status"
+      echo -e "Available commands: init, migrate, register, update, unregister, list, details, status"
       return 1
       ;;
   esac
@@ -389,6 +521,7 @@ if [[ "${BASH_SOURCE[0]}" == "${0}" ]]; then
     echo "Usage: $0 <command> [arguments]"
     echo "Commands:"
     echo "  init                        - Initialize the node database"
+    echo "  migrate [groups.json]       - Import nodes.json and groups into the node registry"
     echo "  register <name> <ip> <user> - Register a new node"
     echo "  update <name> <field> <val> - Update node field"
     echo "  unregister <name>           - Remove a node"
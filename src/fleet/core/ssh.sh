@@ -28,6 +28,16 @@ SSH_DIR="${CONFIG_DIR}/ssh"
 KEY_FILE="${SSH_DIR}/fleet_rsa"
 KNOWN_HOSTS="${SSH_DIR}/known_hosts"
 AUTH_COMMAND="~/tools/pop --status; ~/tools/pop --pulse --export json"
+SSH_CONTROL_DIR="${SSH_DIR}/control"
+SSH_CONTROL_PERSIST="${SSH_CONTROL_PERSIST:-300}"  # Seconds an idle master connection stays open
+FLEET_PYTHON_UI_DIR="${ROOT_DIR}/src/python_ui"
+
+# Fan-out for fleet-wide commands and deploys
+FLEET_EXEC_WIDTH="${FLEET_EXEC_WIDTH:-16}"       # Nodes worked on at once
+FLEET_BATCH_SIZE="${FLEET_BATCH_SIZE:-}"         # Roll out N nodes at a time (empty: all at once)
+FLEET_CANARY="${FLEET_CANARY:-0}"                # Nodes run first, in a batch of their own
+FLEET_MAX_FAILURES="${FLEET_MAX_FAILURES:-}"     # Stop starting nodes once more than N have failed
+FLEET_NODE_TIMEOUT="${FLEET_NODE_TIMEOUT:-}"     # Deadline per node in seconds
 
 # Create SSH directory and files
 create_ssh_directories() {
@@ -42,6 +52,68 @@ create_ssh_directories() {
   echo -e "${GREEN}SSH directories created.${NC}"
 }
 
+# Control socket for a node's shared master connection
+# Must match control_name() in src/python_ui/utils/fleet_ssh.py
+fleet_control_path() {
+  local username="$1"
+  local host="$2"
+  local port="${3:-22}"
+  local digest=$(printf '%s' "${username}@${host}:${port}" | sha1sum | cut -c1-16)
+  
+  echo "${SSH_CONTROL_DIR}/cm-${digest}"
+}
+
+# Set FLEET_SSH_OPTS to ssh options that reuse a node's master connection
+# Usage: fleet_ssh_opts <username> <host> [port]; ssh "${FLEET_SSH_OPTS[@]}" ...
+fleet_ssh_opts() {
+  local username="$1"
+  local host="$2"
+  local port="${3:-22}"
+  
+  if [[ ! -d "$SSH_CONTROL_DIR" ]]; then
+    mkdir -p "$SSH_CONTROL_DIR"
+    chmod 700 "$SSH_CONTROL_DIR"
+  fi
+  
+  FLEET_SSH_OPTS=(
+    -o "ControlMaster=auto"
+    -o "ControlPath=$(fleet_control_path "$username" "$host" "$port")"
+    -o "ControlPersist=${SSH_CONTROL_PERSIST}"
+  )
+}
+
+# Check whether the parallel fleet executor can be used
+fleet_exec_available() {
+  command -v python3 &>/dev/null && [[ -f "${FLEET_PYTHON_UI_DIR}/utils/fleet_exec.py" ]]
+}
+
+# Run a command or deploy on many nodes in parallel, streaming node-tagged output
+# Usage: fleet_exec "<node> <node>..." exec <command>
+#        fleet_exec "<node> <node>..." deploy <src> <dest>
+# An empty node list targets every registered node.
+fleet_exec() {
+  local nodes="$1"
+  shift
+  
+  local args=(
+    --nodes-db "$(fleet_nodes_source)"
+    --key "$KEY_FILE"
+    --control-dir "$SSH_CONTROL_DIR"
+    --width "$FLEET_EXEC_WIDTH"
+    --canary "$FLEET_CANARY"
+  )
+  [[ -n "$FLEET_BATCH_SIZE" ]] && args+=(--batch "$FLEET_BATCH_SIZE")
+  [[ -n "$FLEET_MAX_FAILURES" ]] && args+=(--max-failures "$FLEET_MAX_FAILURES")
+  [[ -n "$FLEET_NODE_TIMEOUT" ]] && args+=(--timeout "$FLEET_NODE_TIMEOUT")
+  
+  local node
+  for node in $nodes; do
+    args+=(--node "$node")
+  done
+  
+  (cd "$FLEET_PYTHON_UI_DIR" && python3 -m utils.fleet_exec "${args[@]}" "$@")
+}
+
 # Generate a new SSH key for fleet management
 generate_ssh_key() {
   # Check if key already exists
@@ -82,7 +154,8 @@ test_ssh_connection() {
   local port="${3:-22}"
   
   echo -e "Testing SSH connection to ${username}@${node_ip}:${port}..."
-  if ssh -i "$KEY_FILE" -o "StrictHostKeyChecking=no" -p "$port" "${username}@${node_ip}" exit 2>/dev/null; then
+  fleet_ssh_opts "$username" "$node_ip" "$port"
+  if ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -o "StrictHostKeyChecking=no" -p "$port" "${username}@${node_ip}" exit 2>/dev/null; then
     echo -e "${GREEN}Connection successful!${NC}"
     return 0
   else
@@ -147,7 +220,8 @@ list_nodes() {
   
   while IFS=: read -r name ip username port; do
     # Test connection and get status
-    if ssh -i "$KEY_FILE" -o "StrictHostKeyChecking=no" -o "ConnectTimeout=2" -p "$port" "${username}@${ip}" exit 2>/dev/null; then
+    fleet_ssh_opts "$username" "$ip" "${port:-22}"
+    if ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -o "StrictHostKeyChecking=no" -o "ConnectTimeout=2" -p "${port:-22}" "${username}@${ip}" exit 2>/dev/null; then
       status="${GREEN}Connected${NC}"
     else
       status="${RED}Disconnected${NC}"
@@ -174,7 +248,8 @@ execute_command() {
   IFS=: read -r name ip username port <<< "$node_details"
   
   echo -e "Executing command on $name (${username}@${ip}:${port:-22})..."
-  ssh -i "$KEY_FILE" -o "StrictHostKeyChecking=no" -p "${port:-22}" "${username}@${ip}" "$command"
+  fleet_ssh_opts "$username" "$ip" "${port:-22}"
+  ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -o "StrictHostKeyChecking=no" -p "${port:-22}" "${username}@${ip}" "$command"
   
   return $?
 }
@@ -193,7 +268,8 @@ execute_command_all() {
     echo -e "${CYAN}     EXECUTING ON: $name (${username}@${ip})${NC}"
     echo -e "${CYAN}==================================================${NC}"
     
-    ssh -i "$KEY_FILE" -o "StrictHostKeyChecking=no" -p "${port:-22}" "${username}@${ip}" "$command" || \
+    fleet_ssh_opts "$username" "$ip" "${port:-22}"
+    ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -o "StrictHostKeyChecking=no" -p "${port:-22}" "${username}@${ip}" "$command" || \
       echo -e "${RED}Command failed on $name.${NC}"
   done < "$CONFIG_FILE"
   
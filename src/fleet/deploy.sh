@@ -56,7 +56,8 @@ deploy_to_node() {
   
   # Transfer the file
   echo -e "${YELLOW}Copying:${NC} $src_file -> $dest_path"
-  scp -i "$KEY_FILE" -P "$port" "$src_file" "$username@$host:$dest_path"
+  fleet_ssh_opts "$username" "$host" "$port"
+  scp -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -P "$port" "$src_file" "$username@$host:$dest_path"
   local status=$?
   
   if [[ $status -eq 0 ]]; then
@@ -149,10 +150,18 @@ deploy_folder() {
   # Transfer the folder using rsync if available, otherwise use scp -r
   echo -e "${YELLOW}Copying folder:${NC} $src_folder -> $dest_path"
   
+  fleet_ssh_opts "$username" "$host" "$port"
+  
   if command -v rsync &>/dev/null; then
-    rsync -avz -e "ssh -i '$KEY_FILE' -p $port" "$src_folder" "$username@$host:$dest_path"
+    # rsync splits -e itself, honouring quotes but not backslashes, so each
+    # word is single-quoted with any ' inside it doubled
+    local rsh="" word
+    for word in ssh -i "$KEY_FILE" -p "$port" "${FLEET_SSH_OPTS[@]}"; do
+      rsh+="'${word//\'/\'\'}' "
+    done
+    rsync -avz -e "$rsh" "$src_folder" "$username@$host:$dest_path"
   else
-    scp -i "$KEY_FILE" -P "$port" -r "$src_folder" "$username@$host:$dest_path"
+    scp -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -P "$port" -r "$src_folder" "$username@$host:$dest_path"
   fi
   
   local status=$?
@@ -216,6 +225,23 @@ deploy_command() {
   shift 2
   local target_nodes=("$@")
   
+  # Upload once per node, in parallel (rolling batches via FLEET_BATCH_SIZE,
+  # FLEET_CANARY and FLEET_MAX_FAILURES); an empty target list means all nodes
+  if [[ -e "$src_path" ]] && fleet_exec_available; then
+    echo -e "${CYAN}=== DEPLOYMENT TO MULTIPLE NODES ===${NC}"
+    echo -e "Source: $src_path"
+    echo -e "Destination: $dest_path"
+    echo -e "Target nodes: ${target_nodes[*]:-all}"
+    echo
+    # fleet_exec runs from the Python UI directory, so pass an absolute
+    # path, keeping a trailing slash (deploy the folder's contents)
+    local abs_src
+    abs_src=$(realpath -- "$src_path") || return 1
+    [[ "$src_path" == */ && "$abs_src" != */ ]] && abs_src+="/"
+    fleet_exec "${target_nodes[*]}" deploy "$abs_src" "$dest_path"
+    return $?
+  fi
+  
   # Check if source is a file or directory
   if [[ -f "$src_path" ]]; then
     deploy_file "$src_path" "$dest_path" "${target_nodes[@]}"
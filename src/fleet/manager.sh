@@ -62,12 +62,12 @@ init_fleet() {
   create_ssh_directories
   generate_ssh_key
   
-  # Initialize node database
-  init_node_db
-  
   # Initialize groups if needed
   init_groups
   
+  # Initialize node database (imports existing nodes and groups into the registry)
+  init_node_db
+  
   echo -e "\n${GREEN}Fleet Management System initialized successfully.${NC}"
   echo -e "${YELLOW}Next steps:${NC}"
   echo -e "1. Register nodes using: pop --fleet register <name> <ip> <username> [port]"
@@ -111,6 +111,11 @@ create_group() {
   
   mv "${GROUPS_FILE}.tmp" "$GROUPS_FILE"
   
+  # Keep the node registry's group index in step
+  if using_registry; then
+    node_registry group create "$group_name" "$description"
+  fi
+  
   echo -e "${GREEN}Group '$group_name' created successfully.${NC}"
   return 0
 }
@@ -135,6 +140,10 @@ delete_group() {
   jq --arg name "$group_name" '.groups |= map(select(.name != $name))' "$GROUPS_FILE" > "${GROUPS_FILE}.tmp"
   mv "${GROUPS_FILE}.tmp" "$GROUPS_FILE"
   
+  if using_registry; then
+    node_registry group delete "$group_name"
+  fi
+  
   echo -e "${GREEN}Group '$group_name' deleted successfully.${NC}"
   return 0
 }
@@ -175,6 +184,11 @@ add_node_to_group() {
   
   mv "${GROUPS_FILE}.tmp" "$GROUPS_FILE"
   
+  if using_registry; then
+    node_registry group create "$group_name"
+    node_registry group add "$group_name" "$node_name"
+  fi
+  
   echo -e "${GREEN}Added node '$node_name' to group '$group_name'.${NC}"
   return 0
 }
@@ -209,6 +223,10 @@ remove_node_from_group() {
   
   mv "${GROUPS_FILE}.tmp" "$GROUPS_FILE"
   
+  if using_registry; then
+    node_registry group remove "$group_name" "$node_name"
+  fi
+  
   echo -e "${GREEN}Removed node '$node_name' from group '$group_name'.${NC}"
   return 0
 }
@@ -316,14 +334,17 @@ get_group_nodes() {
   fi
   
   # Check if group exists
-  if ! jq -e ".groups[] | select(.name == \"$group_name\")" "$GROUPS_FILE" &>/dev/null; then
+  if ! jq -e --arg name "$group_name" '.groups[] | select(.name == $name)' "$GROUPS_FILE" &>/dev/null; then
     echo -e "${RED}Error: Group '$group_name' does not exist.${NC}" >&2
     return 1
   fi
   
   # Get nodes in group
-  jq -r ".groups[] | select(.name == \"$group_name\") | .nodes[]" "$GROUPS_FILE"
-  return 0
+  if using_registry; then
+    node_registry group nodes "$group_name"
+  else
+    jq -r --arg name "$group_name" '.groups[] | select(.name == $name) | .nodes[]' "$GROUPS_FILE"
+  fi
 }
 
 # Print usage information
@@ -340,6 +361,7 @@ print_usage() {
   echo -e "  ${YELLOW}exec-all${NC} <cmd>      Execute command on all nodes"
   echo -e "  ${YELLOW}deploy${NC} <file> [nodes]  Deploy file to nodes"
   echo -e "  ${YELLOW}status${NC}              Show fleet status summary"
+  echo -e "  ${YELLOW}migrate${NC} [groups]    Import nodes.json and groups into the node registry"
   echo -e "  ${YELLOW}group${NC} <subcmd>      Manage node groups (see below)"
   echo -e "  ${YELLOW}help${NC}                Show this help message"
   echo
@@ -365,6 +387,9 @@ fleet_command() {
     init)
       init_fleet
       ;;
+    migrate)
+      migrate_node_registry "${1:-$GROUPS_FILE}"
+      ;;
     register)
       if [[ $# -lt 3 ]]; then
         echo -e "${RED}Error: Missing arguments${NC}"
@@ -513,6 +538,13 @@ fleet_command() {
 
 # Summarize fleet status
 summarize_fleet_status() {
+  # Online counts, percentiles and stale nodes come straight from the node registry
+  if using_registry; then
+    echo -e "\n${CYAN}=== FLEET STATUS SUMMARY ===${NC}"
+    (cd "$REGISTRY_UI_DIR" && python3 -m utils.fleet_summary --db "$NODES_REGISTRY")
+    return $?
+  fi
+  
   local nodes_count=$(count_nodes)
   local online_count=$(count_online_nodes)
   
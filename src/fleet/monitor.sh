@@ -59,18 +59,20 @@ collect_node_metrics() {
   local timestamp=$(date +"%Y%m%d_%H%M%S")
   local metrics_file="${node_metrics_dir}/metrics_${timestamp}.json"
   
-  # Test connection first
-  ssh -i "$KEY_FILE" -p "$port" -o ConnectTimeout=5 -o BatchMode=yes "$username@$host" exit &>/dev/null
-  if [[ $? -ne 0 ]]; then
+  # Get metrics via SSH over the node's shared master connection
+  fleet_ssh_opts "$username" "$host" "$port"
+  ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -p "$port" -o ConnectTimeout=5 -o BatchMode=yes \
+    "$username@$host" "~/tools/pop --pulse --export json" > "$metrics_file"
+  local status=$?
+  
+  if [[ $status -eq 255 ]]; then
     echo -e "${RED}Error: Cannot connect to node $node_name.${NC}"
     mark_node_offline "$node_name"
+    rm -f "$metrics_file"
     return 1
   fi
   
-  # Get metrics via SSH
-  ssh -i "$KEY_FILE" -p "$port" "$username@$host" "~/tools/pop --pulse --export json" > "$metrics_file"
-  
-  if [[ $? -eq 0 && -s "$metrics_file" ]]; then
+  if [[ $status -eq 0 && -s "$metrics_file" ]]; then
     echo -e "${GREEN}Metrics collected successfully.${NC}"
     mark_node_online "$node_name"
     
@@ -89,8 +91,33 @@ collect_node_metrics() {
   fi
 }
 
-# Collect metrics from all nodes
+# Fleet collector settings
+COLLECT_CONCURRENCY="${COLLECT_CONCURRENCY:-16}"  # Nodes collected at once
+COLLECT_TIMEOUT="${COLLECT_TIMEOUT:-20}"          # Deadline per node in seconds
+PYTHON_UI_DIR="${ROOT_DIR}/src/python_ui"
+
+# Collect metrics from all nodes in parallel with the Python collector
+# Falls back to serial collection when python3 is not available
 collect_all_metrics() {
+  if ! command -v python3 &>/dev/null || [[ ! -f "${PYTHON_UI_DIR}/utils/fleet_collector.py" ]]; then
+    collect_all_metrics_serial
+    return $?
+  fi
+  
+  echo -e "${CYAN}=== COLLECTING METRICS FROM ALL NODES ===${NC}"
+  
+  (cd "$PYTHON_UI_DIR" && python3 -m utils.fleet_collector \
+    --nodes-db "$(fleet_nodes_source)" \
+    --metrics-dir "$METRICS_DIR" \
+    --data-dir "$DATA_DIR" \
+    --key "$KEY_FILE" \
+    --control-dir "$SSH_CONTROL_DIR" \
+    --concurrency "$COLLECT_CONCURRENCY" \
+    --timeout "$COLLECT_TIMEOUT" "$@")
+}
+
+# Collect metrics from all nodes one at a time
+collect_all_metrics_serial() {
   local nodes=($(list_node_names))
   
   if [[ ${#nodes[@]} -eq 0 ]]; then
@@ -156,6 +183,30 @@ display_metrics_dashboard() {
   printf "%-20s %-10s %-10s %-10s %-10s %-15s\n" "NODE" "STATUS" "CPU%" "MEM%" "DISK%" "UPTIME"
   echo "----------------------------------------------------------------------"
   
+  # The registry holds each node's latest metrics, so one query fills the table
+  if using_registry; then
+    node_registry list --format json | jq -r '.nodes[] | [
+        .name,
+        (if (.metrics // {}) == {} then "Offline" else (.metrics.status // "Unknown") end),
+        (if .metrics.cpu_usage then "\(.metrics.cpu_usage)%" else "--" end),
+        (if .metrics.memory_usage then "\(.metrics.memory_usage)%" else "--" end),
+        (if .metrics.disk_usage then "\(.metrics.disk_usage)%" else "--" end),
+        (.metrics.uptime // "--")
+      ] | @tsv' | \
+    while IFS=$'\t' read -r node status cpu mem disk uptime; do
+      local status_colored="$status"
+      if [[ "$status" == "Running" ]]; then
+        status_colored="${GREEN}Running${NC}"
+      elif [[ "$status" == "Offline" ]]; then
+        status_colored="${RED}Offline${NC}"
+      elif [[ "$status" == "Starting" ]]; then
+        status_colored="${YELLOW}Starting${NC}"
+      fi
+      printf "%-20s %-25s %-10s %-10s %-10s %-15s\n" "$node" "$status_colored" "$cpu" "$mem" "$disk" "$uptime"
+    done
+    nodes=()
+  fi
+  
   # Data for each node
   for node in "${nodes[@]}"; do
     local status="Unknown"
@@ -219,6 +270,11 @@ update_node_last_metrics() {
   local node_name="$1"
   local timestamp="$2"
   
+  if using_registry; then
+    node_registry last-metrics "$node_name" "$timestamp"
+    return
+  fi
+  
   # Update the node data
   local temp_file=$(mktemp)
   jq --arg name "$node_name" --arg ts "$timestamp" '
@@ -23,6 +23,7 @@ CONFIG_DIR="${ROOT_DIR}/config/fleet"
 NODE_DB="${CONFIG_DIR}/nodes.json"
 SSH_DIR="${CONFIG_DIR}/ssh"
 KEY_FILE="${SSH_DIR}/fleet_rsa"
+PYTHON_UI_DIR="${ROOT_DIR}/src/python_ui"
 
 # Source required modules
 source "${FLEET_DIR}/core/ssh.sh"
@@ -49,20 +50,26 @@ execute_node_command() {
   echo -e "${BLUE}Executing command on node:${NC} $node_name ($username@$host:$port)"
   echo -e "${YELLOW}Command:${NC} $command"
   
-  # Test connection first
-  ssh -i "$KEY_FILE" -p "$port" -o ConnectTimeout=5 -o BatchMode=yes "$username@$host" exit &>/dev/null
-  if [[ $? -ne 0 ]]; then
+  # Execute the command over the node's pooled master connection; the pool
+  # records handshakes and reuse for 'pop --fleet ssh pool stats'
+  echo -e "${CYAN}=== COMMAND OUTPUT ===${NC}"
+  local status
+  if command -v python3 &>/dev/null && [[ -f "${PYTHON_UI_DIR}/utils/fleet_ssh.py" ]]; then
+    (cd "$PYTHON_UI_DIR" && python3 -m utils.fleet_ssh \
+      --control-dir "$SSH_CONTROL_DIR" --nodes-db "$(fleet_nodes_source)" --key "$KEY_FILE" \
+      run "$node_name" "$command")
+    status=$?
+  else
+    fleet_ssh_opts "$username" "$host" "$port"
+    ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -p "$port" -o ConnectTimeout=5 -o BatchMode=yes "$username@$host" "$command"
+    status=$?
+  fi
+  
+  if [[ $status -eq 255 ]]; then
     echo -e "${RED}Error: Cannot connect to node $node_name.${NC}"
     mark_node_offline "$node_name"
     return 1
-  fi
-  
-  # Execute the command
-  echo -e "${CYAN}=== COMMAND OUTPUT ===${NC}"
-  ssh -i "$KEY_FILE" -p "$port" "$username@$host" "$command"
-  local status=$?
-  
-  if [[ $status -eq 0 ]]; then
+  elif [[ $status -eq 0 ]]; then
     echo -e "${GREEN}Command executed successfully.${NC}"
     mark_node_online "$node_name"
   else
@@ -89,6 +96,12 @@ execute_all_nodes() {
   echo -e "${YELLOW}Command:${NC} $command"
   echo
   
+  # Run on all nodes in parallel when the executor is available
+  if fleet_exec_available; then
+    fleet_exec "" exec "$command"
+    return $?
+  fi
+  
   # Execute on each node
   for node in "${nodes[@]}"; do
     echo -e "${CYAN}Node: $node${NC}"
@@ -150,6 +163,11 @@ execute_group_command() {
   echo -e "${BLUE}Target nodes:${NC} ${nodes[*]}"
   echo
   
+  if fleet_exec_available; then
+    fleet_exec "${nodes[*]}" exec "$command"
+    return $?
+  fi
+  
   # Execute on each node in the group
   for node in "${nodes[@]}"; do
     echo -e "${CYAN}Node: $node${NC}"
@@ -219,7 +237,8 @@ execute_node_script() {
   
   # Copy script to remote node
   local remote_script="/tmp/${script_name}"
-  scp -i "$KEY_FILE" -P "$port" "$local_script" "$username@$host:$remote_script" &>/dev/null
+  fleet_ssh_opts "$username" "$host" "$port"
+  scp -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -P "$port" "$local_script" "$username@$host:$remote_script" &>/dev/null
   
   if [[ $? -ne 0 ]]; then
     echo -e "${RED}Error: Failed to copy script to node $node_name.${NC}"
@@ -229,7 +248,7 @@ execute_node_script() {
   
   # Execute the script
   echo -e "${CYAN}=== SCRIPT OUTPUT ===${NC}"
-  ssh -i "$KEY_FILE" -p "$port" "$username@$host" "chmod +x $remote_script && $remote_script; rm -f $remote_script"
+  ssh -i "$KEY_FILE" "${FLEET_SSH_OPTS[@]}" -p "$port" "$username@$host" "chmod +x $remote_script && $remote_script; rm -f $remote_script"
   local status=$?
   
   # Clean up local temp files
@@ -331,6 +350,20 @@ ssh_command() {
       fi
       connect_to_node "$1"
       ;;
+    pool)
+      local pool_cmd="${1:-stats}"
+      case "$pool_cmd" in
+        stats|check|close)
+          (cd "$PYTHON_UI_DIR" && python3 -m utils.fleet_ssh \
+            --control-dir "$SSH_CONTROL_DIR" --nodes-db "$(fleet_nodes_source)" --key "$KEY_FILE" "$pool_cmd")
+          ;;
+        *)
+          echo -e "${RED}Unknown pool command: $pool_cmd${NC}"
+          echo -e "Available commands: stats, check, close"
+          return 1
+          ;;
+      esac
+      ;;
     *)
       echo -e "${RED}Unknown SSH command: $cmd${NC}"
       echo -e "Available commands:"
@@ -339,6 +372,7 @@ ssh_command() {
       echo -e "  exec-group <group> <cmd>    Execute command on all nodes in a group"
       echo -e "  script <node> <script>      Execute a script on a node"
       echo -e "  connect <node>              Start interactive SSH session"
+      echo -e "  pool [stats|check|close]    Show or manage pooled master connections"
       return 1
       ;;
   esac
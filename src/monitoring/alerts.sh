@@ -262,6 +262,13 @@ send_notification() {
   # Check if alerts are enabled
   alerts_enabled || return 0
   
+  # Queue through the notification dispatcher, which retries, rate limits and
+  # delivers email in the background
+  if alert_engine_available; then
+    (cd "$ALERTS_UI_DIR" && python3 -m utils.notify --config "$(alert_engine_config)" send "$level" "$subject" "$message")
+    return $?
+  fi
+  
   # Format the notification
   local formatted_subject="Pipe Network Node Alert: $subject"
   local timestamp=$(date "+%Y-%m-%d %H:%M:%S")
@@ -849,9 +856,10 @@ show_alerts_log() {
 # Reset alerts (clear cooldown)
 reset_alerts() {
   local cooldown_file=$(get_alerts_cooldown_file)
+  local state_file="$(get_alerts_dir)/alert-state.json"
   
-  if [[ -f "$cooldown_file" ]]; then
-    rm -f "$cooldown_file"
+  if [[ -f "$cooldown_file" || -f "$state_file" ]]; then
+    rm -f "$cooldown_file" "$state_file"
     echo "Alerts reset: cooldown cleared"
   else
     echo "No alert cooldowns to reset"
@@ -886,6 +894,49 @@ test_alert() {
   return 0
 }
 
+# =====================
+# Alert Engine
+# =====================
+
+# Python alert engine directory
+ALERTS_UI_DIR="${SRC_DIR}/python_ui"
+
+# Check if the Python alert engine can be used
+alert_engine_available() {
+  command -v python3 &>/dev/null && [[ -f "${ALERTS_UI_DIR}/utils/alerts.py" ]]
+}
+
+# Alerts configuration used by the alert engine and notification dispatcher
+alert_engine_config() {
+  local config_file="$(get_alerts_dir)/alerts.json"
+  [[ ! -f "$config_file" && -f "$ALERTS_CONFIG" ]] && config_file="$ALERTS_CONFIG"
+  echo "$config_file"
+}
+
+# Run an alert engine command
+run_alert_engine() {
+  local command="$1"
+  shift
+  
+  local engine_args=(--config "$(alert_engine_config)")
+  
+  local history_dir="${METRICS_DIR:-${INSTALL_DIR}/metrics}/history"
+  [[ "$(type -t get_history_dir)" == "function" ]] && history_dir=$(get_history_dir)
+  [[ -d "$history_dir" ]] && engine_args+=(--history-dir "$history_dir")
+  
+  # Fleet nodes are evaluated as their metrics arrive in the registry
+  local nodes_db="${INSTALL_DIR:-/opt/pipe-pop}/fleet/db/nodes.db"
+  [[ -f "$nodes_db" ]] && engine_args+=(--nodes-db "$nodes_db")
+  
+  # Alerts go through the notification dispatcher's queue
+  (cd "$ALERTS_UI_DIR" && python3 -m utils.alerts "${engine_args[@]}" "$command" "$@")
+}
+
+# Show or manage the notification queue
+run_notification_queue() {
+  (cd "$ALERTS_UI_DIR" && python3 -m utils.notify --config "$(alert_engine_config)" "$@")
+}
+
 # =====================
 # Alert Command Functions
 # =====================
@@ -897,6 +948,13 @@ run_alert_daemon() {
   # Ensure alerts directory and config exist
   ensure_alerts_dir
   
+  # Rules are evaluated on every sample, not once per check interval
+  if alert_engine_available; then
+    echo "Starting alert engine, press Ctrl+C to stop"
+    run_alert_engine daemon
+    return $?
+  fi
+  
   # Get check interval
   local config_file=$(get_alerts_config)
   local check_interval=60  # Default 60 minutes
@@ -936,6 +994,9 @@ show_alerts_help() {
   echo -e "  ${CYAN}status${NC}                      Show alert system status and configuration"
   echo -e "  ${CYAN}check${NC}                       Run a one-time check against alert thresholds"
   echo -e "  ${CYAN}daemon${NC}                      Run alert system in daemon mode (continuous monitoring)"
+  echo -e "  ${CYAN}rules${NC}                       List the alert rules in effect"
+  echo -e "  ${CYAN}active${NC}                      List alerts that are currently firing"
+  echo -e "  ${CYAN}queue [status|flush|purge]${NC}  Show, deliver or purge queued notifications"
   echo -e "  ${CYAN}log [N]${NC}                     Show last N alert log entries (default: 20)"
   echo -e "  ${CYAN}test [LEVEL]${NC}                Test alert system with specified level (info|warning|critical)"
   echo -e "  ${CYAN}reset${NC}                       Reset alert system (clear cooldown periods)"
@@ -986,11 +1047,29 @@ run_alerts() {
       fi
       ;;
     "check")
-      check_alert_thresholds
+      if alert_engine_available; then
+        run_alert_engine check
+      else
+        check_alert_thresholds
+      fi
       ;;
     "daemon"|"monitor"|"start")
       run_alert_daemon
       ;;
+    "queue")
+      if ! alert_engine_available; then
+        log_error "The notification queue requires python3"
+        return 1
+      fi
+      run_notification_queue "${1:-status}"
+      ;;
+    "rules"|"active")
+      if ! alert_engine_available; then
+        log_error "The alert engine requires python3"
+        return 1
+      fi
+      run_alert_engine "$command"
+      ;;
     "log"|"logs"|"history")
       show_alerts_log "$1"
       ;;
@@ -1066,4 +1145,5 @@ EOF
   "last_check": "$(date +%s)",
   "config_path": "$ALERTS_CONFIG"
 }
-EOF 
\ No newline at end of file
+EOF
+}
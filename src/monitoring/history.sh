@@ -301,6 +301,69 @@ get_metric_trend() {
   fi
 }
 
+# Import history files newer than the store's latest sample
+# The store is shared with the Web UI and locked while this writes
+# Returns non-zero when python3 or the store is unavailable
+import_history_fast() {
+  local ui_dir="${SRC_DIR}/python_ui"
+  
+  if ! command -v python3 &>/dev/null || [[ ! -f "${ui_dir}/utils/tsdb.py" ]]; then
+    return 1
+  fi
+  
+  (cd "$ui_dir" && python3 -m utils.tsdb import --new-only "$(get_history_dir)" >/dev/null 2>&1)
+}
+
+# Summarize several metrics in one pass with the Python aggregator
+# Reads the store only; run import_history_fast first to include new files
+# Prints one tab-separated line per metric:
+#   metric count first_ts last_ts avg min max p50 p95 p99 trend
+# Returns non-zero when python3 or the aggregator is unavailable
+get_history_summary_fast() {
+  local period="$1"
+  local metrics="$2"
+  local ui_dir="${SRC_DIR}/python_ui"
+  
+  if ! command -v python3 &>/dev/null || [[ ! -f "${ui_dir}/utils/aggregate.py" ]]; then
+    return 1
+  fi
+  
+  (cd "$ui_dir" && python3 -m utils.aggregate \
+    --period "$period" \
+    --metrics "$metrics" \
+    --format tsv 2>/dev/null)
+}
+
+# Get at most N downsampled points of a metric for charting
+# Prints one tab-separated line per bucket: start min max avg count
+# Returns non-zero when python3 or the store is unavailable
+get_chart_series_fast() {
+  local period="$1"
+  local metric="$2"
+  local points="$3"
+  local ui_dir="${SRC_DIR}/python_ui"
+  local now=$(date +%s)
+  local range=()
+  
+  if ! command -v python3 &>/dev/null || [[ ! -f "${ui_dir}/utils/tsdb.py" ]]; then
+    return 1
+  fi
+  
+  case "$period" in
+    "1d") range=(--from $((now - 86400))) ;;
+    "3d") range=(--from $((now - 259200))) ;;
+    "7d") range=(--from $((now - 604800))) ;;
+    "14d") range=(--from $((now - 1209600))) ;;
+    "30d") range=(--from $((now - 2592000))) ;;
+    "90d") range=(--from $((now - 7776000))) ;;
+    "all") range=() ;;
+    *) return 1 ;;
+  esac
+  
+  import_history_fast || return 1
+  (cd "$ui_dir" && python3 -m utils.tsdb downsample "$metric" "${range[@]}" --points "$points" 2>/dev/null)
+}
+
 # =====================
 # Visualization
 # =====================
@@ -315,39 +378,57 @@ generate_ascii_chart() {
   [[ -z "$chart_width" ]] && chart_width=$CHART_WIDTH
   [[ -z "$chart_title" ]] && chart_title="$metric"
   
-  local files=$(get_history_files_for_period "$period")
-  local file_count=$(echo "$files" | wc -l)
-  
-  # Need at least 2 data points for a chart
-  if [[ $file_count -lt 2 ]]; then
-    echo "Not enough data points to generate chart"
-    return 1
-  fi
-  
   # Collect values and timestamps
   local values=()
   local timestamps=()
   local max_value=0
   local min_value=999999999
   
-  for file in $files; do
-    local value=$(extract_metric "$file" "$metric" "0")
-    local timestamp=$(extract_timestamp "$file")
-    
-    # Skip non-numeric values
-    if [[ "$value" =~ ^[0-9]+(\.[0-9]+)?$ ]]; then
-      timestamps+=("$timestamp")
-      values+=("$value")
+  # Fast path: already downsampled to the chart width from the rollup tiers
+  local series=$(get_chart_series_fast "$period" "$metric" "$chart_width")
+  
+  if [[ -n "$series" ]]; then
+    local ts low high avg count
+    while IFS=$'\t' read -r ts low high avg count; do
+      timestamps+=("$ts")
+      values+=("$avg")
       
       # Update min/max
-      if [[ $(echo "$value > $max_value" | bc -l 2>/dev/null) -eq 1 ]]; then
-        max_value="$value"
+      if [[ $(echo "$avg > $max_value" | bc -l 2>/dev/null) -eq 1 ]]; then
+        max_value="$avg"
       fi
-      if [[ $(echo "$value < $min_value" | bc -l 2>/dev/null) -eq 1 ]]; then
-        min_value="$value"
+      if [[ $(echo "$avg < $min_value" | bc -l 2>/dev/null) -eq 1 ]]; then
+        min_value="$avg"
       fi
-    fi
-  done
+    done <<< "$series"
+  else
+    local files=$(get_history_files_for_period "$period")
+    
+    for file in $files; do
+      local value=$(extract_metric "$file" "$metric" "0")
+      local timestamp=$(extract_timestamp "$file")
+      
+      # Skip non-numeric values
+      if [[ "$value" =~ ^[0-9]+(\.[0-9]+)?$ ]]; then
+        timestamps+=("$timestamp")
+        values+=("$value")
+        
+        # Update min/max
+        if [[ $(echo "$value > $max_value" | bc -l 2>/dev/null) -eq 1 ]]; then
+          max_value="$value"
+        fi
+        if [[ $(echo "$value < $min_value" | bc -l 2>/dev/null) -eq 1 ]]; then
+          min_value="$value"
+        fi
+      fi
+    done
+  fi
+  
+  # Need at least 2 data points for a chart
+  if [[ ${#values[@]} -lt 2 ]]; then
+    echo "Not enough data points to generate chart"
+    return 1
+  fi
   
   # Ensure min and max are different to avoid division by zero
   if [[ $(echo "$max_value - $min_value < 0.01" | bc -l 2>/dev/null) -eq 1 ]]; then
@@ -428,13 +509,25 @@ generate_ascii_chart() {
   echo
   
   # Print statistics
+  local stat_min stat_max stat_avg trend
+  local summary=""
+  [[ -n "$series" ]] && summary=$(get_history_summary_fast "$period" "$metric")
+  
+  if [[ -n "$summary" ]]; then
+    IFS=$'\t' read -r _ _ _ _ stat_avg stat_min stat_max _ _ _ trend <<< "$summary"
+  else
+    stat_min=$(get_metric_min "$period" "$metric" "N/A")
+    stat_max=$(get_metric_max "$period" "$metric" "N/A")
+    stat_avg=$(get_metric_average "$period" "$metric" "N/A")
+    trend=$(get_metric_trend "$period" "$metric")
+  fi
+  
   echo
-  echo -e "Min: ${CYAN}$(get_metric_min "$period" "$metric" "N/A")${NC}  |  "
-  echo -e "Max: ${CYAN}$(get_metric_max "$period" "$metric" "N/A")${NC}  |  "
-  echo -e "Avg: ${CYAN}$(get_metric_average "$period" "$metric" "N/A")${NC}  |  "
+  echo -e "Min: ${CYAN}$stat_min${NC}  |  "
+  echo -e "Max: ${CYAN}$stat_max${NC}  |  "
+  echo -e "Avg: ${CYAN}$stat_avg${NC}  |  "
   
   # Show trend
-  local trend=$(get_metric_trend "$period" "$metric")
   case "$trend" in
     "up") echo -e "Trend: ${GREEN}↑ Increasing${NC}" ;;
     "down") echo -e "Trend: ${RED}↓ Decreasing${NC}" ;;
@@ -456,6 +549,18 @@ show_history_summary() {
   
   print_header "HISTORY SUMMARY ($period)"
   
+  local metrics=("reputation" "points" "uptime_score" "historical_score" "egress_score")
+  local labels=("Reputation" "Points" "Uptime Score" "Historical Score" "Egress Score")
+  
+  # Fast path: aggregate every metric in a single pass over the store
+  import_history_fast
+  local summary=$(get_history_summary_fast "$period" "$(IFS=,; echo "${metrics[*]}")")
+  if [[ -n "$summary" ]]; then
+    show_history_summary_from "$summary" metrics labels || return 1
+    generate_ascii_chart "$period" "reputation" "$CHART_WIDTH" "Reputation"
+    return 0
+  fi
+  
   # Check if we have enough data
   local files=$(get_history_files_for_period "$period")
   local file_count=$(echo "$files" | wc -l)
@@ -482,9 +587,6 @@ show_history_summary() {
   # Performance metrics summary
   echo -e "${CYAN}Performance Metrics:${NC}"
   
-  local metrics=("reputation" "points" "uptime_score" "historical_score" "egress_score")
-  local labels=("Reputation" "Points" "Uptime Score" "Historical Score" "Egress Score")
-  
   for ((i=0; i<${#metrics[@]}; i++)); do
     local metric="${metrics[$i]}"
     local label="${labels[$i]}"
@@ -520,6 +622,59 @@ show_history_summary() {
   return 0
 }
 
+# Print a history summary from get_history_summary_fast output
+show_history_summary_from() {
+  local summary="$1"
+  local -n summary_metrics="$2"
+  local -n summary_labels="$3"
+  
+  local count first_ts last_ts
+  IFS=$'\t' read -r _ count first_ts last_ts _ <<< "$(echo "$summary" | head -n 1)"
+  
+  if [[ ! "$count" =~ ^[0-9]+$ ]] || [[ $count -lt 2 ]]; then
+    echo -e "${YELLOW}Not enough data points for history. Run 'pop pulse' regularly to collect data.${NC}"
+    return 1
+  fi
+  
+  local first_date=$(date -d "@$first_ts" "+%Y-%m-%d %H:%M:%S" 2>/dev/null)
+  local last_date=$(date -d "@$last_ts" "+%Y-%m-%d %H:%M:%S" 2>/dev/null)
+  
+  echo -e "Data from: ${CYAN}$first_date${NC} to ${CYAN}$last_date${NC}"
+  echo -e "Data points: ${CYAN}$count${NC}"
+  echo
+  
+  echo -e "${CYAN}Performance Metrics:${NC}"
+  
+  for ((i=0; i<${#summary_metrics[@]}; i++)); do
+    local metric="${summary_metrics[$i]}"
+    local label="${summary_labels[$i]}"
+    local name n fts lts avg min max p50 p95 p99 trend
+    IFS=$'\t' read -r name n fts lts avg min max p50 p95 p99 trend <<< "$(echo "$summary" | grep -m1 "^${metric}"$'\t')"
+    
+    [[ -z "$avg" ]] && avg="N/A" && min="N/A" && max="N/A" && p95="N/A"
+    
+    # Add percentage sign back if needed
+    local unit=""
+    [[ "$metric" == *"score" ]] && unit="%"
+    if [[ "$avg" != "N/A" ]]; then
+      avg="${avg}${unit}"; min="${min}${unit}"; max="${max}${unit}"; p95="${p95}${unit}"
+    fi
+    
+    local trend_indicator=""
+    case "$trend" in
+      "up") trend_indicator="${GREEN}↑${NC}" ;;
+      "down") trend_indicator="${RED}↓${NC}" ;;
+      "stable") trend_indicator="${YELLOW}→${NC}" ;;
+      *) trend_indicator="${YELLOW}?${NC}" ;;
+    esac
+    
+    echo -e "  $label: Avg ${CYAN}$avg${NC} (Min: $min, Max: $max, P95: $p95) $trend_indicator"
+  done
+  echo
+  
+  return 0
+}
+
 # Show detailed history for a specific metric
 show_metric_history() {
   local metric="$1"
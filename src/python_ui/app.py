@@ -3,22 +3,25 @@
 """
 Pipe Network PoP Web UI - Flask Application
 A lightweight web interface for managing Pipe Network PoP nodes
+
+Importing this module has no side effects: create_app() loads the
+configuration and builds the background services, and main() parses the
+command line, configures logging and serves the app (or the fallback page
+when Flask is missing and --fallback is given). Modules only needed by one
+of those paths are imported where they are used, so restarts stay fast.
 """
 
 import os
+import re
 import json
 import logging
-import secrets
-import subprocess
 import time
 import sys
-import argparse
+import itertools
+import threading
+from collections import Counter
 from datetime import datetime
 from functools import wraps
-import http.server
-import socketserver
-import threading
-import webbrowser
 
 # Pre-define core functions that may be needed for debugging/error messages
 def print_error(msg, exit_code=1):
@@ -44,163 +47,86 @@ def setup_basic_logging():
     )
     return logging.getLogger("pipe-ui")
 
-# Initialize argument parser before any imports
-parser = argparse.ArgumentParser(description='Pipe Network PoP Web UI')
-parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
-parser.add_argument('--port', type=int, default=8585, help='Port to listen on')
-parser.add_argument('--debug', action='store_true', help='Enable debug mode')
-parser.add_argument('--fallback', action='store_true', help='Use fallback simple HTTP server if Flask fails')
-
-# Parse arguments early to check for fallback option
-args, remaining_args = parser.parse_known_args()
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Pipe Network PoP Web UI')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
+    parser.add_argument('--port', type=int, default=8585, help='Port to listen on')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--fallback', action='store_true', help='Use fallback simple HTTP server if Flask fails')
+    parser.add_argument('--production', action='store_true', help='Serve with a thread pool, keep-alive and graceful shutdown')
+    parser.add_argument('--threads', type=int, help='Worker threads in production mode')
+    parser.add_argument('--connection-limit', type=int, help='Maximum simultaneous connections in production mode')
+    parser.add_argument('--channel-timeout', type=float, help='Seconds before idle connections are closed in production mode')
+    parser.add_argument('--no-browser', action='store_true', help='Do not open a browser for the fallback page')
+    return parser.parse_args(argv)
 
-# Configure logging
-logger = setup_basic_logging()
+logger = logging.getLogger("pipe-ui")
 
-# Default configuration
+# Default configuration, auth_token is generated when the config file is created
 DEFAULT_CONFIG = {
-    "port": args.port or 8585,
-    "host": args.host or "127.0.0.1",
+    "port": 8585,
+    "host": "127.0.0.1",
     "pop_command": "pop",
     "auth_enabled": True,
-    "auth_token": secrets.token_hex(16),
-    "debug": args.debug or False
+    "auth_token": None,
+    "debug": False,
+    "node_ports": [8003],
+    "sample_interval": 1,
+    "sample_ttls": {
+        "metrics": 2,
+        "node_status": 10,
+        "logs": 5
+    },
+    "stream_max_subscribers": 100,
+    "stream_heartbeat": 15,
+    "log_file": "/opt/pipe-pop/logs/pipe-pop.log",
+    "log_index_bucket_seconds": 300,
+    "command_workers": 4,
+    "command_timeout": 30,
+    "job_timeout": 300,
+    "server_mode": "dev",
+    "server_threads": 8,
+    "server_connection_limit": 100,
+    "server_channel_timeout": 15,
+    "server_backlog": 128,
+    "shutdown_timeout": 4,
+    "history_dir": "/opt/pipe-pop/metrics/history",
+    "history_interval": 60,
+    "history_retention_days": 90,
+    "fleet_registry": "/opt/pipe-pop/fleet/db/nodes.db",
+    "fleet_summary_interval": 5,
+    "fleet_stale_after": 900,
+    "fleet_worst_nodes": 5,
+    "alerts_config": "/opt/pipe-pop/config/alerts/alerts.json",
+    "system_check_urls": ["https://www.google.com", "https://www.cloudflare.com"],
+    "system_check_ip_url": "https://api.ipify.org?format=json",
+    "system_check_ports": [4500, 8585],
+    "system_check_timeout": 5,
+    "system_check_deadline": 8,
+    "system_check_ttl": 300,
+    "metrics_cache_ttl": 5,
+    "perf_enabled": True,
+    "profiler_interval": 0.01,
+    "compression_enabled": True,
+    "compression_min_size": 1024
 }
 
-# Global flag for Flask availability
-FLASK_AVAILABLE = False
-
-# Function to launch browser
-def launch_browser(url, delay=1.5):
-    """Launch browser after a short delay"""
-    def _open_browser():
-        time.sleep(delay)
-        webbrowser.open(url)
-    
-    browser_thread = threading.Thread(target=_open_browser)
-    browser_thread.daemon = True
-    browser_thread.start()
-
-# Fallback simple HTTP server if Flask is not available
-class FallbackHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        self.directory = os.path.join(os.path.dirname(__file__), 'static')
-        super().__init__(*args, directory=self.directory, **kwargs)
-    
-    def do_GET(self):
-        if self.path == '/' or self.path == '':
-            self.path = '/fallback.html'
-        return super().do_GET()
-    
-    def log_message(self, format, *args):
-        logger.info(format % args)
-
-def create_fallback_page():
-    """Create a fallback HTML page if Flask is not available"""
-    static_dir = os.path.join(os.path.dirname(__file__), 'static')
-    os.makedirs(static_dir, exist_ok=True)
-    
-    fallback_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Pipe Network PoP UI - Installation Required</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; color: #333; }}
-        .container {{ max-width: 800px; margin: 0 auto; background: #f9f9f9; padding: 20px; border-radius: 5px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        h1 {{ color: #e74c3c; }}
-        h2 {{ color: #3498db; }}
-        pre {{ background: #f1f1f1; padding: 10px; border-radius: 3px; overflow-x: auto; }}
-        .btn {{ display: inline-block; background: #3498db; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; margin-top: 20px; }}
-        .btn:hover {{ background: #2980b9; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Pipe Network PoP UI - Flask Installation Required</h1>
-        
-        <p>The Pipe Network PoP UI requires Flask to run properly. This is a fallback page shown because Flask is not currently installed.</p>
-        
-        <h2>Installation Options:</h2>
-        <ol>
-            <li>
-                <strong>System package (recommended):</strong>
-                <pre>sudo apt-get update && sudo apt-get install -y python3-flask</pre>
-            </li>
-            <li>
-                <strong>Using pip:</strong>
-                <pre>python3 -m pip install flask</pre>
-            </li>
-            <li>
-                <strong>Using the provided installer:</strong>
-                <pre>tools/pop-ui-python install</pre>
-            </li>
-        </ol>
-        
-        <h2>After Installing:</h2>
-        <p>After installing Flask, restart the UI server:</p>
-        <pre>tools/pop-ui-python stop
-tools/pop-ui-python start</pre>
-        
-        <p>Python version: {sys.version}</p>
-        <p>Server running on: http://{args.host}:{args.port}/</p>
-        
-        <a href="/" class="btn">Refresh after installation</a>
-    </div>
-</body>
-</html>
-"""
-    
-    with open(os.path.join(static_dir, 'fallback.html'), 'w') as f:
-        f.write(fallback_html)
-
-def run_fallback_server():
-    """Run a simple HTTP server as fallback"""
-    create_fallback_page()
-    
-    try:
-        handler = FallbackHTTPRequestHandler
-        httpd = socketserver.TCPServer((args.host, args.port), handler)
-        
-        logger.info(f"Fallback server running at http://{args.host}:{args.port}/")
-        print(f"Fallback server running at http://{args.host}:{args.port}/")
-        print("Install Flask to enable full UI functionality")
-        
-        # Launch browser if needed
-        launch_browser(f"http://{args.host}:{args.port}/")
-        
-        # Serve until process is killed
-        httpd.serve_forever()
-    except Exception as e:
-        logger.error(f"Error in fallback server: {e}")
-        print(f"Error: {e}")
-        sys.exit(1)
-
-# Try to import Flask - use fallback if not available
+# Try to import Flask - main() falls back to a static page if not available
 try:
     from flask import (
-        Flask, render_template, request, jsonify, redirect,
-        url_for, session, send_from_directory, abort
+        Flask, Response, render_template, request, jsonify, redirect,
+        url_for, session, send_from_directory, abort, g
     )
-    logger.info("Flask imported successfully")
     FLASK_AVAILABLE = True
+    FLASK_IMPORT_ERROR = None
 except ImportError as e:
-    error_message = f"""
-Flask import failed: {e}
+    FLASK_AVAILABLE = False
+    FLASK_IMPORT_ERROR = e
 
-The Pipe Network PoP UI requires Flask to run with full functionality.
-"""
-    logger.error(error_message)
-    print(error_message)
-    
-    if args.fallback:
-        print("Starting fallback server mode...")
-        run_fallback_server()
-        # This will run forever or exit on error
-        sys.exit(0)
-    else:
-        installation_guide = """
+INSTALLATION_GUIDE = """
 You can install Flask using one of these methods:
 
 1. System package (recommended):
@@ -216,48 +142,106 @@ After installing Flask, try running this command again.
 Or use --fallback option to use a simple HTTP server.
 
 If you continue to have issues, please check:
-- Python version (3.6+ required): {sys.version}
+- Python version (3.6+ required): {version}
 - Installation logs for errors
 
 For more help, see the documentation in src/python_ui/README.md
 """
-        print(installation_guide)
-        sys.exit(1)
 
-# From here, Flask is available
-# Load configuration
 CONFIG_FILE = os.path.expanduser("~/.local/share/pipe-pop/ui-config.json")
 CONFIG_DIR = os.path.dirname(CONFIG_FILE)
 
-def load_config():
-    """Load configuration from file or create default if not exists"""
-    if not os.path.exists(CONFIG_DIR):
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-    
-    if not os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(DEFAULT_CONFIG, f, indent=2)
-        return DEFAULT_CONFIG
-    
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
-            # Update with any missing default keys
-            for key, value in DEFAULT_CONFIG.items():
-                if key not in config:
-                    config[key] = value
-            return config
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return DEFAULT_CONFIG
-
-CONFIG = load_config()
-
-# Initialize Flask app
-app = Flask(__name__)
-app.secret_key = os.environ.get('PIPE_UI_SECRET_KEY', secrets.token_hex(16))
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['TEMPLATES_AUTO_RELOAD'] = True
+def _port(value):
+    return None if isinstance(value, int) and 0 < value < 65536 else "must be a port number (1-65535)"
+
+def _ports(value):
+    return None if all(_port(p) is None for p in value) else "must be a list of port numbers (1-65535)"
+
+def _positive(value):
+    return None if value > 0 else "must be greater than 0"
+
+def _non_negative(value):
+    return None if value >= 0 else "must not be negative"
+
+# Checks beyond the type of the default value, see utils.config.validate()
+CONFIG_CHECKS = {
+    "port": _port,
+    "node_ports": _ports,
+    "system_check_ports": _ports,
+    "pop_command": lambda value: None if value.strip() else "must not be empty",
+    "server_mode": lambda value: None if value in ("dev", "production") else "must be 'dev' or 'production'",
+    "sample_interval": _positive,
+    "command_workers": _positive,
+    "command_timeout": _positive,
+    "job_timeout": _positive,
+    "server_threads": _positive,
+    "history_interval": _positive,
+    "history_retention_days": _non_negative,
+    "stream_heartbeat": _positive,
+    "log_index_bucket_seconds": _positive,
+    "metrics_cache_ttl": _positive,
+    "fleet_summary_interval": _positive,
+    "fleet_stale_after": _positive,
+    "system_check_timeout": _positive,
+    "system_check_deadline": _positive,
+    "system_check_ttl": _positive,
+    "profiler_interval": _positive,
+    "compression_min_size": _non_negative
+}
+
+# Settings that only take effect when the UI is restarted, all others apply on reload
+RESTART_SETTINGS = {
+    "host", "port", "debug", "server_mode", "server_threads", "server_connection_limit",
+    "server_channel_timeout", "server_backlog", "shutdown_timeout", "command_workers",
+    "sample_ttls", "stream_max_subscribers", "log_file", "log_index_bucket_seconds",
+    "fleet_registry", "fleet_summary_interval", "alerts_config"
+}
+
+# Set by create_app(), CONFIG is replaced (never modified) when the file changes
+CONFIG = {}
+config_store = None
+app = None
+
+# Routes are collected here and registered on the app by create_app()
+ROUTES = []
+
+def route(rule, **options):
+    """Like Flask's app.route, for views registered by create_app()"""
+    def decorator(f):
+        ROUTES.append((rule, f, options))
+        return f
+    return decorator
+
+# Helpers used by the views; the classes behind the services are imported in init_services()
+from utils.stream import diff_dict, format_sse, new_lines
+from utils.aggregate import summarize, period_range
+from utils.alerts import LOCAL, LOW_METRICS
+from utils.config import ConfigError
+from utils.openmetrics import (
+    OPENMETRICS_CONTENT_TYPE, TEXT_CONTENT_TYPE, Exposition, accepts_openmetrics
+)
+from utils.httpcache import ENCODINGS, IMMUTABLE, choose_encoding, compressible, content_hash
+
+# Background services, built from CONFIG by init_services()
+metrics_engine = None
+command_runner = None
+sampler = None
+log_tailer = None
+log_search = None
+broadcaster = None
+history_store = None
+fleet_registry = None
+fleet_summary = None
+alerts_config = {}
+alert_engine = None
+system_checker = None
+metrics_exposition = None
+perf_recorder = None
+profiler = None
+static_assets = None
+compression_cache = None
+HISTORY_METRICS = ('cpu', 'memory', 'disk', 'network', 'peers')
+history_interval = DEFAULT_CONFIG['history_interval']
 
 # Authentication decorator
 def require_auth(f):
@@ -285,37 +269,25 @@ def require_auth(f):
     return decorated
 
 # Command execution
-def run_command(command, shell=False):
+def publish_job_update(job):
+    """Push job progress to stream subscribers and refresh status when done"""
+    if job.done:
+        sampler.invalidate('node_status')
+    broadcaster.publish('job', job.to_dict(since=max(0, len(job.output) - 1)))
+
+def submit_command(command, shell=False, timeout=None):
+    """Schedule a system command, returning a Future for its result"""
+    started = time.perf_counter()
+    future = command_runner.submit(command, shell=shell, timeout=timeout)
+    if CONFIG['perf_enabled']:
+        future.add_done_callback(lambda f: perf_recorder.observe_command(
+            command, time.perf_counter() - started,
+            None if f.cancelled() or f.exception() else f.result()))
+    return future
+
+def run_command(command, shell=False, timeout=None):
     """Execute system command and return result"""
-    try:
-        if not shell and isinstance(command, str):
-            command = command.split()
-        
-        logger.info(f"Running command: {command}")
-        result = subprocess.run(
-            command,
-            shell=shell,
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
-        
-        return {
-            'success': result.returncode == 0,
-            'stdout': result.stdout,
-            'stderr': result.stderr,
-            'returncode': result.returncode
-        }
-    except Exception as e:
-        logger.error(f"Command execution error: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'stdout': '',
-            'stderr': str(e),
-            'returncode': -1
-        }
+    return submit_command(command, shell, timeout).result()
 
 def get_node_status():
     """Get the status of the Pipe Network node"""
@@ -337,56 +309,222 @@ def get_node_status():
 
 def get_system_metrics():
     """Get system metrics"""
-    metrics = {
-        'cpu': 0,
-        'memory': 0,
-        'disk': 0,
-        'network': 0,
-        'uptime': "00:00:00",
-        'peers': 0
-    }
-    
-    # CPU usage
-    cpu_cmd = run_command("top -bn1 | grep 'Cpu(s)' | awk '{print $2 + $4}'")
-    if cpu_cmd['success']:
+    return metrics_engine.sample()
+
+# Node log file reader, used instead of `pop logs` when the file is readable
+def get_recent_logs(limit=50):
+    """Get the last lines of the node logs"""
+    if log_tailer.available():
         try:
-            metrics['cpu'] = float(cpu_cmd['stdout'].strip())
-        except (ValueError, TypeError):
-            pass
+            return log_tailer.tail(limit)[0]
+        except OSError as e:
+            logger.error(f"Error reading log file: {e}")
     
-    # Memory usage
-    mem_cmd = run_command("free -m | awk 'NR==2{printf \"%.1f\", $3*100/$2}'")
-    if mem_cmd['success']:
-        try:
-            metrics['memory'] = float(mem_cmd['stdout'].strip())
-        except (ValueError, TypeError):
-            pass
+    result = run_command(f"{CONFIG['pop_command']} logs --tail {limit}")
+    return result['stdout'].splitlines() if result['success'] else []
+
+# Live event stream, fed from sampler snapshots
+def publish_snapshot_changes(previous, current):
+    """Publish what changed between two sampler snapshots to stream subscribers"""
+    changed = diff_dict(previous.data.get('metrics', {}), current.data.get('metrics', {}))
+    if changed:
+        broadcaster.publish('metrics', changed, current.version)
+    
+    if previous.data.get('node_status') != current.data.get('node_status'):
+        broadcaster.publish('status', current.data.get('node_status'), current.version)
+    
+    lines = new_lines(previous.data.get('logs', []), current.data.get('logs', []))
+    if lines:
+        broadcaster.publish('logs', {'lines': lines}, current.version)
+
+# Metrics history, recorded by the UI and imported from history.sh files
+def record_history(previous, current):
+    """Append system metrics to the history store at most once per interval"""
+    ts = current.updated.get('metrics')
+    if not ts or ts == previous.updated.get('metrics'):
+        return
+    metrics = current.data['metrics']
+    # Samples are paced by the cpu series, so skip one without a CPU reading
+    if not isinstance(metrics.get('cpu'), (int, float)):
+        return
+    last = history_store.last('cpu')
+    if last and ts - last[0] < history_interval:
+        return
+    history_store.append_many(ts, {name: metrics.get(name) for name in HISTORY_METRICS})
+
+def import_history():
+    """Import new history.sh JSON files and apply retention"""
+    last = history_store.last('reputation')
+    imported = history_store.import_json_history(
+        CONFIG.get('history_dir', DEFAULT_CONFIG['history_dir']),
+        since=last[0] if last else None
+    )
+    history_store.compact()
+    return imported
+
+# Alert rules, evaluated on every new sample of the local node and fleet nodes
+def publish_alert(event):
+    """Log a firing alert and push it to stream subscribers"""
+    logger.warning(f"Alert: {event['message']}")
+    broadcaster.publish('alert', event)
+
+def evaluate_alerts(previous, current):
+    """Evaluate alert rules against new system metrics and imported scores"""
+    if alerts_config.get('enabled') is False:
+        return
+    ts = current.updated.get('metrics')
+    if ts and ts != previous.updated.get('metrics'):
+        alert_engine.evaluate(LOCAL, current.data['metrics'], ts)
     
-    # Disk usage
-    disk_cmd = run_command("df -h / | awk 'NR==2{print $5}' | sed 's/%//'")
-    if disk_cmd['success']:
+    if current.updated.get('history_import') != previous.updated.get('history_import'):
+        # Each score is evaluated at the time it was recorded
+        for metric in LOW_METRICS:
+            last = history_store.last(metric)
+            if last:
+                alert_engine.evaluate(LOCAL, {metric: last[1]}, last[0])
+
+def evaluate_fleet_alerts(record):
+    """Evaluate alert rules against a fleet node's latest metrics"""
+    if record.get('metrics') and alerts_config.get('enabled') is not False:
+        alert_engine.evaluate(record['name'], record['metrics'])
+
+# Scores recorded by history.sh, exported on /metrics
+SCORE_METRICS = ('reputation', 'points', 'uptime_score', 'historical_score', 'egress_score')
+
+def get_scores():
+    """Latest (timestamp, value) of each score in the history store"""
+    scores = {}
+    for metric in SCORE_METRICS:
+        last = history_store.last(metric)
+        if last:
+            scores[metric] = last
+    return scores
+
+started_at = time.time()
+
+# Request timing middleware, recorded by route so URLs with IDs share a histogram
+def start_request_timer():
+    g.perf_started = time.perf_counter()
+
+def record_request(response):
+    started = g.get('perf_started')
+    if started is not None and CONFIG['perf_enabled']:
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        perf_recorder.observe_request(rule, request.method, response.status_code,
+                                      time.perf_counter() - started)
+    return response
+
+# Conditional GETs and compression for generated responses, see static_file() for assets
+def cache_response(response):
+    if (request.method not in ('GET', 'HEAD') or response.status_code != 200
+            or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    if response.mimetype == 'application/json':
+        if not response.get_etag()[0]:
+            response.set_etag(content_hash(response.get_data()), weak=True)
+        response.headers.setdefault('Cache-Control', 'private, no-cache')
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    if CONFIG['compression_enabled'] and compressible(response.mimetype):
+        body = response.get_data()
+        if len(body) >= CONFIG['compression_min_size']:
+            response.vary.add('Accept-Encoding')
+            encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+            if encoding:
+                response.set_data(compression_cache.get(body, encoding))
+                response.headers['Content-Encoding'] = encoding
+    return response
+
+def asset_url(filename):
+    """Fingerprinted URL of a static file, for templates"""
+    return url_for('static', filename=static_assets.url_path(filename))
+
+def template_context():
+    return {'current_year': datetime.now().year}
+
+def compile_templates():
+    """Compile every template now, so the first visit to each page doesn't pay for it"""
+    compiled = 0
+    for name in app.jinja_env.list_templates(extensions=('html',)):
         try:
-            metrics['disk'] = float(disk_cmd['stdout'].strip())
-        except (ValueError, TypeError):
-            pass
+            app.jinja_env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            logger.error(f"Error compiling template {name}: {e}")
+    return compiled
+
+def build_metrics():
+    """Collect /metrics from the sampler snapshot and in-memory counters"""
+    snapshot = sampler.snapshot()
+    now = time.time()
+    out = Exposition()
+    
+    status = snapshot.data.get('node_status') or {}
+    if status:
+        state = status.get('status', 'unknown')
+        out.add('pipe_pop_node_status', 'gauge', 'Node state from `pop status` (1 for the current state)',
+                [({'state': name}, int(name == state)) for name in ('running', 'stopped', 'unknown')])
+        out.gauge('pipe_pop_node_up', 'Whether the node is running', int(state == 'running'))
     
-    # Uptime
-    uptime_cmd = run_command("uptime -p")
-    if uptime_cmd['success']:
-        metrics['uptime'] = uptime_cmd['stdout'].strip()
+    metrics = snapshot.data.get('metrics') or {}
+    for key, name, help_text, unit in (
+            ('cpu', 'pipe_pop_cpu_usage_percent', 'CPU usage', 'percent'),
+            ('memory', 'pipe_pop_memory_usage_percent', 'Memory usage', 'percent'),
+            ('disk', 'pipe_pop_disk_usage_percent', 'Disk usage', 'percent'),
+            ('rx_bytes_per_sec', 'pipe_pop_network_receive_bytes_per_second', 'Network receive rate', None),
+            ('tx_bytes_per_sec', 'pipe_pop_network_transmit_bytes_per_second', 'Network transmit rate', None),
+            ('peers', 'pipe_pop_peers', 'Established connections on the node ports', None),
+            ('uptime_seconds', 'pipe_pop_host_uptime_seconds', 'Host uptime', 'seconds')):
+        if isinstance(metrics.get(key), (int, float)):
+            out.gauge(name, help_text, metrics[key], unit=unit)
     
-    # For other metrics, we would need to call pop-specific commands
-    # Here we're using placeholders
-    node_status = get_node_status()
-    if node_status['status'] == 'running':
-        # This would be replaced with actual metrics gathering
-        metrics['peers'] = 5  # Placeholder
-        metrics['network'] = 1.5  # Placeholder in MB/s
+    for metric, (ts, value) in (snapshot.data.get('scores') or {}).items():
+        out.gauge(f"pipe_pop_{metric}", f"Latest {metric.replace('_', ' ')} recorded by history.sh", value)
+    out.add('pipe_pop_score_timestamp_seconds', 'gauge', 'When each score was recorded',
+            [({'score': metric}, ts) for metric, (ts, _) in (snapshot.data.get('scores') or {}).items()],
+            unit='seconds')
     
-    return metrics
+    out.add('pipe_pop_sample_age_seconds', 'gauge', 'Age of the cached value from each sampler source',
+            [({'source': name}, round(max(0.0, now - ts), 3)) for name, ts in sorted(snapshot.updated.items())],
+            unit='seconds')
+    
+    out.counter('pipe_pop_ui_requests', 'HTTP requests served by the UI',
+                [({'route': rule, 'method': method, 'status': code}, count)
+                 for (rule, method, code), count in perf_recorder.request_counts()])
+    out.histogram('pipe_pop_ui_request_duration_seconds', 'Time spent handling HTTP requests',
+                  [({'route': rule, 'method': method}, h.cumulative(), h.sum, h.count)
+                   for (rule, method), h in perf_recorder.request_histograms()], unit='seconds')
+    out.histogram('pipe_pop_ui_command_duration_seconds', 'Time callers waited for commands, including queueing',
+                  [({'command': name}, h.cumulative(), h.sum, h.count)
+                   for name, h in perf_recorder.command_histograms()], unit='seconds')
+    out.counter('pipe_pop_ui_commands', 'Commands run by the UI, by outcome',
+                [({'outcome': key}, value) for key, value in sorted(command_runner.stats.items())])
+    out.gauge('pipe_pop_ui_stream_subscribers', 'Open /api/stream connections', broadcaster.subscriber_count)
+    levels = Counter(alert['level'] for alert in alert_engine.active())
+    out.add('pipe_pop_alerts_firing', 'gauge', 'Alerts currently firing, by level',
+            [({'level': level}, levels.get(level, 0)) for level in ('warning', 'critical')])
+    out.gauge('pipe_pop_ui_start_time_seconds', 'When the UI server started', started_at, unit='seconds')
+    return out
+
+def get_status_snapshot():
+    """Get node status and metrics from the latest sampler snapshot"""
+    snapshot = sampler.snapshot()
+    now = time.time()
+    return {
+        'node_status': snapshot.data.get('node_status', {}),
+        'metrics': snapshot.data.get('metrics', {}),
+        'version': snapshot.version,
+        'age': {name: round(max(0.0, now - ts), 3)
+                for name, ts in snapshot.updated.items()},
+        'timestamp': datetime.fromtimestamp(snapshot.timestamp).isoformat()
+    }
 
 # Routes
-@app.route('/login', methods=['GET', 'POST'])
+@route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         token = request.form.get('token')
@@ -397,87 +535,362 @@ def login():
         return render_template('login.html', error="Invalid token")
     return render_template('login.html')
 
-@app.route('/')
+@route('/')
 @require_auth
 def index():
-    node_status = get_node_status()
-    metrics = get_system_metrics()
+    status = get_status_snapshot()
     return render_template('dashboard/index.html', 
-                         node_status=node_status, 
-                         metrics=metrics)
+                         node_status=status['node_status'], 
+                         metrics=status['metrics'])
 
-@app.route('/config')
+@route('/config')
 @require_auth
 def config():
     return render_template('config/index.html')
 
-@app.route('/logs')
+@route('/logs')
 @require_auth
 def logs():
     # This would display node logs
     return render_template('logs.html')
 
 # API Routes
-@app.route('/api/status')
+@route('/api/status')
 @require_auth
 def api_status():
-    node_status = get_node_status()
-    metrics = get_system_metrics()
+    status = get_status_snapshot()
     return jsonify({
         'success': True,
-        'node_status': node_status,
-        'metrics': metrics,
-        'timestamp': datetime.now().isoformat()
+        'node_status': status['node_status'],
+        'metrics': status['metrics'],
+        'version': status['version'],
+        'age': status['age'],
+        'timestamp': status['timestamp']
     })
 
-@app.route('/api/node/start', methods=['POST'])
+@route('/api/stream')
+@require_auth
+def api_stream():
+    """Stream status, metric deltas and new log lines as Server-Sent Events"""
+    sub = broadcaster.subscribe()
+    if sub is None:
+        return jsonify({
+            'success': False,
+            'error': 'Too many stream subscribers'
+        }), 503
+    
+    # New subscribers start from the full current state
+    sampler.start()
+    sampler.invalidate('logs')
+    snapshot = sampler.snapshot()
+    initial = [
+        format_sse('status', snapshot.data.get('node_status', {}), snapshot.version),
+        format_sse('metrics', snapshot.data.get('metrics', {}), snapshot.version)
+    ]
+    
+    return Response(broadcaster.stream(sub, initial),
+                    mimetype='text/event-stream',
+                    headers={
+                        'Cache-Control': 'no-cache',
+                        'X-Accel-Buffering': 'no'
+                    })
+
+def start_node_job(action):
+    """Start a pop node operation in the background and return its job"""
+    job = command_runner.start_job(action, f"{CONFIG['pop_command']} {action}")
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'job': job.to_dict()
+    }), 202
+
+@route('/api/node/start', methods=['POST'])
 @require_auth
 def api_node_start():
-    result = run_command(f"{CONFIG['pop_command']} start")
+    return start_node_job('start')
+
+@route('/api/node/stop', methods=['POST'])
+@require_auth
+def api_node_stop():
+    return start_node_job('stop')
+
+@route('/api/node/restart', methods=['POST'])
+@require_auth
+def api_node_restart():
+    return start_node_job('restart')
+
+@route('/api/jobs', methods=['GET'])
+@require_auth
+def api_jobs():
     return jsonify({
-        'success': result['success'],
-        'output': result['stdout'],
-        'error': result['stderr']
+        'success': True,
+        'jobs': [job.to_dict() for job in command_runner.list_jobs()]
     })
 
-@app.route('/api/node/stop', methods=['POST'])
+@route('/api/jobs/<job_id>', methods=['GET'])
 @require_auth
-def api_node_stop():
-    result = run_command(f"{CONFIG['pop_command']} stop")
+def api_job(job_id):
+    """Get job state and any output after the `since` line index"""
+    job = command_runner.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
     return jsonify({
+        'success': True,
+        'job': job.to_dict(since=request.args.get('since', 0, type=int))
+    })
+
+def logs_command(limit):
+    return f"{CONFIG['pop_command']} logs --tail {limit}"
+
+def read_logs(limit, cursor=None, pending=None):
+    """
+    Read the latest log lines for /api/logs and /api/batch.
+    
+    Args:
+        limit: Maximum lines returned
+        cursor: Cursor from a previous response, to only get newer lines
+        pending: Future from submit_command(logs_command(limit)), when
+            the caller already started `pop logs`
+    
+    Returns:
+        Tuple of the response body and HTTP status
+    """
+    # Read the log file directly when possible, only returning new lines
+    # if the client passes the cursor from its previous response
+    if log_tailer.available():
+        reset = False
+        try:
+            if cursor:
+                log_lines, cursor, reset = log_tailer.read_since(cursor, limit)
+            else:
+                log_lines, cursor = log_tailer.tail(limit)
+        except ValueError:
+            return {'success': False, 'error': 'Invalid cursor'}, 400
+        except OSError as e:
+            logger.error(f"Error reading log file: {e}")
+            return {'success': False, 'error': str(e)}, 500
+        
+        return {
+            'success': True,
+            'logs': log_lines,
+            'count': len(log_lines),
+            'cursor': cursor,
+            'reset': reset
+        }, 200
+    
+    result = (pending or submit_command(logs_command(limit))).result()
+    log_lines = result['stdout'].splitlines() if result['success'] else []
+    return {
         'success': result['success'],
-        'output': result['stdout'],
-        'error': result['stderr']
+        'logs': log_lines,
+        'count': len(log_lines),
+        'cursor': None
+    }, 200
+
+@route('/api/logs', methods=['GET'])
+@require_auth
+def api_logs():
+    limit = max(1, min(request.args.get('limit', 100, type=int), 5000))
+    body, code = read_logs(limit, request.args.get('cursor'))
+    return jsonify(body), code
+
+def parse_time_arg(value):
+    """Parse a unix timestamp or 'YYYY-MM-DD[ T]HH:MM:SS' query argument"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return int(time.mktime(datetime.strptime(value, fmt).timetuple()))
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time: {value}")
+
+@route('/api/logs/search', methods=['GET'])
+@require_auth
+def api_logs_search():
+    """Search node logs by level, time range, substring and regex"""
+    if not log_tailer.available():
+        return jsonify({'success': False, 'error': 'Log file not available'}), 404
+    
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    try:
+        results = log_search.search(
+            level=request.args.get('level'),
+            start=parse_time_arg(request.args.get('from')),
+            end=parse_time_arg(request.args.get('to')),
+            text=request.args.get('q'),
+            pattern=request.args.get('regex'),
+            cursor=request.args.get('cursor', 0, type=int)
+        )
+        # Generators are lazy, pull the first match to surface bad arguments now
+        first = next(results, None)
+    except (ValueError, re.error) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if first is not None:
+        results = itertools.chain([first], results)
+    
+    # Newline-delimited JSON is streamed without a page limit
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            for match in results:
+                yield json.dumps(match) + "\n"
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    page = list(itertools.islice(results, limit + 1))
+    next_cursor = page[limit - 1]['next'] if len(page) > limit else None
+    page = page[:limit]
+    return jsonify({
+        'success': True,
+        'results': page,
+        'count': len(page),
+        'next_cursor': next_cursor
     })
 
-@app.route('/api/node/restart', methods=['POST'])
+@route('/api/history', methods=['GET'])
 @require_auth
-def api_node_restart():
-    result = run_command(f"{CONFIG['pop_command']} restart")
+def api_history():
+    """Get stored samples of a metric, or the list of metrics"""
+    metric = request.args.get('metric')
+    if not metric:
+        return jsonify({'success': True, 'metrics': history_store.metrics()})
+    
+    try:
+        start = parse_time_arg(request.args.get('from'))
+        end = parse_time_arg(request.args.get('to'))
+        points = request.args.get('points', type=int)
+        if points:
+            # Downsampled from the rollup tiers, e.g. for charts
+            result = history_store.downsample(metric, start=start, end=end, points=min(points, 10000))
+            return jsonify({
+                'success': True,
+                'metric': metric,
+                'resolution': result['resolution'],
+                'buckets': result['buckets'],
+                'count': len(result['buckets'])
+            })
+        timestamps, values = history_store.query(metric, start=start, end=end)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     return jsonify({
-        'success': result['success'],
-        'output': result['stdout'],
-        'error': result['stderr']
+        'success': True,
+        'metric': metric,
+        'points': [[ts, value] for ts, value in zip(timestamps, values)],
+        'count': len(timestamps)
     })
 
-@app.route('/api/logs', methods=['GET'])
+@route('/api/history/summary', methods=['GET'])
 @require_auth
-def api_logs():
-    limit = request.args.get('limit', 100, type=int)
-    # This would return the last N lines of logs
-    result = run_command(f"{CONFIG['pop_command']} logs --tail {limit}")
-    log_lines = result['stdout'].splitlines() if result['success'] else []
+def api_history_summary():
+    """Get avg/min/max/percentiles/trend for one or more metrics"""
+    metrics = [m for m in request.args.get('metric', '').split(',') if m] or list(HISTORY_METRICS)
+
+    try:
+        if request.args.get('period'):
+            start, end = period_range(request.args['period'])
+        else:
+            start = parse_time_arg(request.args.get('from'))
+            end = parse_time_arg(request.args.get('to'))
+
+        summaries = {}
+        for metric in metrics:
+            timestamps, values = history_store.query(metric, start=start, end=end)
+            summaries[metric] = summarize(timestamps, values)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     return jsonify({
-        'success': result['success'],
-        'logs': log_lines,
-        'count': len(log_lines)
+        'success': True,
+        'from': start,
+        'to': end,
+        'summary': summaries
     })
 
-@app.route('/api/config', methods=['GET'])
+@route('/api/fleet/nodes', methods=['GET'])
 @require_auth
-def api_config_get():
-    # This would get the node configuration
-    result = run_command(f"{CONFIG['pop_command']} config show")
+def api_fleet_nodes():
+    """List registered fleet nodes, filtered by group, status or search text"""
+    if not fleet_registry.exists_on_disk():
+        return jsonify({'success': False, 'error': "Fleet registry not initialized, run 'pop --fleet init'"}), 404
+    
+    filters = {
+        'group': request.args.get('group'),
+        'status': request.args.get('status'),
+        'search': request.args.get('q')
+    }
+    limit = max(1, min(request.args.get('limit', 500, type=int), 5000))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    nodes = fleet_registry.list(limit=limit, offset=offset, **filters)
+    return jsonify({
+        'success': True,
+        'total': fleet_registry.count(**filters),
+        'count': len(nodes),
+        'nodes': nodes,
+        'status_counts': fleet_registry.status_counts()
+    })
+
+@route('/api/fleet/nodes/<name>', methods=['GET'])
+@require_auth
+def api_fleet_node(name):
+    """Get one registered fleet node"""
+    node = fleet_registry.get(name) if fleet_registry.exists_on_disk() else None
+    if node is None:
+        return jsonify({'success': False, 'error': f"Node '{name}' not found"}), 404
+    return jsonify({'success': True, 'node': node})
+
+@route('/api/fleet/summary', methods=['GET'])
+@require_auth
+def api_fleet_summary():
+    """Fleet-wide and per-group aggregates, precomputed by the sampler"""
+    summary = fleet_summary.summary() or fleet_summary.refresh()
+    if summary is None:
+        return jsonify({'success': False, 'error': "Fleet registry not initialized, run 'pop --fleet init'"}), 404
+    
+    group = request.args.get('group')
+    if group:
+        if group not in summary['groups']:
+            return jsonify({'success': False, 'error': f"Group '{group}' not found"}), 404
+        return jsonify({
+            'success': True,
+            'version': summary['version'],
+            'generated': summary['generated'],
+            'group': group,
+            'summary': summary['groups'][group]
+        })
+    
+    return jsonify(dict(summary, success=True))
+
+@route('/api/alerts', methods=['GET'])
+@require_auth
+def api_alerts():
+    """Firing alerts and recent alert events"""
+    return jsonify({
+        'success': True,
+        'enabled': alerts_config.get('enabled') is not False,
+        'rules': len(alert_engine.rules),
+        'active': alert_engine.active(),
+        'recent': alert_engine.recent()
+    })
+
+@route('/api/fleet/groups', methods=['GET'])
+@require_auth
+def api_fleet_groups():
+    """List fleet groups and their members"""
+    if not fleet_registry.exists_on_disk():
+        return jsonify({'success': True, 'groups': []})
+    return jsonify({'success': True, 'groups': fleet_registry.groups()})
+
+def public_config():
+    """The UI configuration without the auth token"""
+    return {key: value for key, value in CONFIG.items() if key != 'auth_token'}
+
+def parse_node_config(result):
+    """The node configuration from a `pop config show` result"""
     try:
         if result['success'] and result['stdout']:
             # Try to parse as JSON first
@@ -488,39 +901,201 @@ def api_config_get():
     except json.JSONDecodeError:
         # If not valid JSON, return as raw text
         config_data = result['stdout']
-    
+    return config_data
+
+@route('/api/config', methods=['GET'])
+@require_auth
+def api_config_get():
+    # This would get the node configuration
+    result = run_command(f"{CONFIG['pop_command']} config show")
     return jsonify({
         'success': result['success'],
-        'config': config_data
+        'config': parse_node_config(result),
+        'ui': public_config()
     })
 
-@app.route('/api/config', methods=['POST'])
+@route('/api/config', methods=['POST'])
 @require_auth
 def api_config_update():
-    # This would update the node configuration
-    config_data = request.json
+    """Update UI settings, saved to ui-config.json and applied without a restart where possible"""
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({
+            'success': False,
+            'error': 'Expected a JSON object of settings'
+        }), 400
     
-    # In a real implementation, we would validate and write the config
-    # For now, we'll just pretend we did
+    try:
+        config_store.update(changes)
+    except ConfigError as e:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid configuration: {e}",
+            'errors': e.errors
+        }), 400
+    
+    restart = sorted(set(changes) & RESTART_SETTINGS)
     return jsonify({
         'success': True,
-        'message': 'Configuration updated successfully'
+        'message': 'Configuration updated successfully',
+        'restart_required': bool(restart),
+        'restart_settings': restart,
+        'config': public_config()
     })
 
+# Resources /api/batch can return, each shaped like its own endpoint's response
+BATCH_PARTS = ('status', 'metrics', 'logs', 'config')
+
+@route('/api/batch', methods=['GET'])
+@require_auth
+def api_batch():
+    """Status, metrics, a log tail and config in one response, with one run of each command"""
+    parts = [part.strip() for part in request.args.get('include', ','.join(BATCH_PARTS)).split(',')
+             if part.strip()]
+    unknown = sorted(set(parts) - set(BATCH_PARTS))
+    if unknown or not parts:
+        return jsonify({
+            'success': False,
+            'error': f"include must list some of: {', '.join(BATCH_PARTS)}",
+            'unknown': unknown
+        }), 400
+    limit = max(1, min(request.args.get('logs_limit', 100, type=int), 5000))
+
+    # Start the commands first so they run side by side; identical commands
+    # from other requests in flight are shared by the command runner
+    pending_logs = None
+    if 'logs' in parts and not log_tailer.available():
+        pending_logs = submit_command(logs_command(limit))
+    pending_config = None
+    if 'config' in parts:
+        pending_config = submit_command(f"{CONFIG['pop_command']} config show")
+
+    body = {}
+    if 'status' in parts or 'metrics' in parts:
+        status = get_status_snapshot()
+        if 'status' in parts:
+            body['status'] = {
+                'success': True,
+                'node_status': status['node_status'],
+                'version': status['version'],
+                'age': status['age'],
+                'timestamp': status['timestamp']
+            }
+        if 'metrics' in parts:
+            body['metrics'] = status['metrics']
+    if 'logs' in parts:
+        body['logs'], _ = read_logs(limit, request.args.get('logs_cursor'), pending_logs)
+    if pending_config is not None:
+        result = pending_config.result()
+        body['config'] = {
+            'success': result['success'],
+            'config': parse_node_config(result),
+            'ui': public_config()
+        }
+
+    body['success'] = all(body[part].get('success', True) for part in ('status', 'logs', 'config')
+                          if part in body)
+    return jsonify(body)
+
+@route('/metrics')
+def metrics():
+    """Node and UI metrics in OpenMetrics (or Prometheus text) format, from cached samples"""
+    if CONFIG['auth_enabled']:
+        header = request.headers.get('Authorization', '')
+        token = header[7:] if header.startswith('Bearer ') else request.args.get('token')
+        if token != CONFIG['auth_token']:
+            return Response('Unauthorized\n', status=401, mimetype='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer'})
+    
+    sampler.start()
+    openmetrics = accepts_openmetrics(request.headers.get('Accept'))
+    return Response(metrics_exposition.render(openmetrics),
+                    content_type=OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE)
+
+@route('/api/debug/perf', methods=['GET'])
+@require_auth
+def api_debug_perf():
+    """Latency by route and command, sampler source timings and profiler state"""
+    if request.args.get('format') == 'collapsed':
+        limit = request.args.get('limit', type=int)
+        return Response(profiler.collapsed(limit), mimetype='text/plain')
+
+    return jsonify({
+        'success': True,
+        'enabled': CONFIG['perf_enabled'],
+        **perf_recorder.snapshot(),
+        'sources': {name: round(seconds * 1000, 3) for name, seconds in sorted(sampler.durations.items())},
+        'command_runner': dict(command_runner.stats),
+        'profiler': profiler.status()
+    })
+
+@route('/api/debug/perf', methods=['POST'])
+@require_auth
+def api_debug_perf_control():
+    """Start or stop the sampling profiler, or reset the recorded timings"""
+    data = request.get_json(silent=True) or {}
+    action = data.get('profiler')
+    if action == 'start':
+        duration = data.get('duration')
+        interval = data.get('interval')
+        for key, value in (('duration', duration), ('interval', interval)):
+            if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+                return jsonify({'success': False, 'error': f"{key} must be a positive number"}), 400
+        if not profiler.start(duration=duration, interval=interval):
+            return jsonify({'success': False, 'error': 'Profiler is already running'}), 409
+    elif action == 'stop':
+        profiler.stop()
+    elif action is not None:
+        return jsonify({'success': False, 'error': "profiler must be 'start' or 'stop'"}), 400
+
+    if data.get('reset'):
+        perf_recorder.reset()
+    elif action is None:
+        return jsonify({'success': False, 'error': "Expected 'profiler' or 'reset'"}), 400
+
+    return jsonify({'success': True, 'profiler': profiler.status()})
+
 # Installation Wizard
-@app.route('/wizard')
+def system_check_response(results):
+    from utils.system_check import get_installation_recommendations
+    return jsonify({
+        'success': True,
+        'results': results,
+        'recommendations': get_installation_recommendations(results)
+    })
+
+@route('/wizard')
 def wizard():
     """Installation wizard for first-time setup"""
     # Generate a unique wizard token if not exists
     if 'wizard_token' not in session:
+        import secrets
         session['wizard_token'] = secrets.token_hex(8)
         session['wizard_step'] = 1
     
+    system_checks = system_checker.cached() or {}
     return render_template('wizard/index.html', 
                         step=session.get('wizard_step', 1),
-                        token=session.get('wizard_token'))
+                        token=session.get('wizard_token'),
+                        system_checks=system_checks,
+                        system_checks_started=bool(system_checks),
+                        system_checks_error=bool(system_checks) and not system_checks['all_checks_passed'])
+
+@route('/wizard/system-check', methods=['POST'])
+def wizard_system_check():
+    """Run the system compatibility check, reusing recent results"""
+    if 'wizard_token' not in session:
+        return jsonify({'success': False, 'error': 'Wizard session not found'})
+    
+    return system_check_response(system_checker.run(refresh=request.args.get('refresh') == '1'))
+
+@route('/api/system/check', methods=['GET'])
+@require_auth
+def api_system_check():
+    """System compatibility check, cached for system_check_ttl seconds"""
+    return system_check_response(system_checker.run(refresh=request.args.get('refresh') == '1'))
 
-@app.route('/wizard/next', methods=['POST'])
+@route('/wizard/next', methods=['POST'])
 def wizard_next():
     """Advance to the next wizard step"""
     if 'wizard_token' not in session:
@@ -534,7 +1109,7 @@ def wizard_next():
         'step': session['wizard_step']
     })
 
-@app.route('/wizard/complete', methods=['POST'])
+@route('/wizard/complete', methods=['POST'])
 def wizard_complete():
     """Complete the installation wizard"""
     if 'wizard_token' not in session:
@@ -556,27 +1131,323 @@ def wizard_complete():
     })
 
 # Static files
-@app.route('/favicon.ico')
+@route('/favicon.ico')
 def favicon():
     return send_from_directory(os.path.join(app.root_path, 'static', 'images'),
                               'favicon.ico', mimetype='image/vnd.microsoft.icon')
 
-def start_server(host=None, port=None, debug=None):
+@route('/static/<path:filename>', endpoint='static')
+def static_file(filename):
+    """Static files from memory, precompressed, and cached forever under fingerprinted URLs"""
+    asset, fingerprinted = static_assets.resolve(filename)
+    if asset is None:
+        abort(404)
+    
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'),
+                               [name for name in ENCODINGS if name in asset.variants])
+    response = Response(asset.variants[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset.variants:
+        response.vary.add('Accept-Encoding')
+    response.set_etag(f"{asset.hash}-{encoding}" if encoding else asset.hash)
+    # Unfingerprinted and outdated URLs are revalidated on every use
+    response.headers['Cache-Control'] = IMMUTABLE if fingerprinted else 'no-cache'
+    return response.make_conditional(request)
+
+def apply_config(previous, current, changed):
+    """Point the views at a reloaded config and push live settings into the services"""
+    global CONFIG, history_interval
+    CONFIG = current
+    
+    if 'pop_command' in changed:
+        sampler.invalidate('node_status')
+    if 'node_ports' in changed:
+        metrics_engine.node_ports = list(current['node_ports'])
+    if 'command_timeout' in changed:
+        command_runner.default_timeout = current['command_timeout']
+    if 'job_timeout' in changed:
+        command_runner.job_timeout = current['job_timeout']
+    if 'sample_interval' in changed:
+        sampler.interval = current['sample_interval']
+    if 'stream_heartbeat' in changed:
+        broadcaster.heartbeat = current['stream_heartbeat']
+    if 'history_interval' in changed:
+        history_interval = current['history_interval']
+    if 'history_retention_days' in changed:
+        history_store.retention_days = current['history_retention_days']
+    if 'fleet_stale_after' in changed:
+        fleet_summary.stale_after = current['fleet_stale_after']
+    if 'fleet_worst_nodes' in changed:
+        fleet_summary.worst_n = current['fleet_worst_nodes']
+    if 'metrics_cache_ttl' in changed:
+        metrics_exposition.ttl = current['metrics_cache_ttl']
+    if 'profiler_interval' in changed:
+        profiler.interval = current['profiler_interval']
+    system_check = {attribute: current[key] for key, attribute in (
+        ('system_check_urls', 'probe_urls'), ('system_check_ip_url', 'ip_lookup_url'),
+        ('system_check_ports', 'ports'), ('system_check_timeout', 'timeout'),
+        ('system_check_deadline', 'deadline'), ('system_check_ttl', 'ttl')) if key in changed}
+    if system_check:
+        system_checker.configure(**system_check)
+    
+    restart = sorted(changed & RESTART_SETTINGS)
+    logger.info(f"Configuration changed: {', '.join(sorted(changed))}")
+    if restart:
+        logger.warning(f"Restart the UI to apply: {', '.join(restart)}")
+
+def init_services(config):
+    """Build the background services behind the views from `config`"""
+    global metrics_engine, command_runner, sampler, log_tailer, log_search, broadcaster
+    global history_store, history_interval, fleet_registry, fleet_summary
+    global alerts_config, alert_engine, system_checker, metrics_exposition
+    global perf_recorder, profiler
+    
+    from utils.metrics import MetricsEngine
+    from utils.commands import CommandRunner
+    from utils.sampler import Sampler
+    from utils.logtail import LogTailer
+    from utils.logsearch import LogIndex, LogSearch
+    from utils.stream import Broadcaster
+    from utils.tsdb import TimeSeriesStore
+    from utils.fleet_registry import NodeRegistry
+    from utils.fleet_summary import FleetSummary
+    from utils.alerts import AlertEngine, load_alerts_config, rules_from_config
+    from utils.system_check import SystemChecker
+    from utils.openmetrics import CachedExposition
+    from utils.perf import PerfRecorder, SamplingProfiler
+    
+    def setting(key):
+        return config.get(key, DEFAULT_CONFIG[key])
+    
+    # Request and command timings are always recorded, the profiler only runs when asked
+    perf_recorder = PerfRecorder()
+    profiler = SamplingProfiler(interval=setting('profiler_interval'))
+    
+    # Metrics engine keeps counters between samples for CPU and network rates
+    metrics_engine = MetricsEngine(node_ports=config.get('node_ports', []))
+    
+    command_runner = CommandRunner(
+        max_workers=setting('command_workers'),
+        default_timeout=setting('command_timeout'),
+        job_timeout=setting('job_timeout'),
+        on_job_update=publish_job_update
+    )
+    
+    # Background sampler shared by all request handlers; sources that run
+    # commands or do bulk I/O are refreshed off the sampler thread
+    sample_ttls = dict(DEFAULT_CONFIG['sample_ttls'], **config.get('sample_ttls', {}))
+    sampler = Sampler(interval=setting('sample_interval'))
+    sampler.add_source('metrics', get_system_metrics, sample_ttls['metrics'])
+    sampler.add_source('node_status', get_node_status, sample_ttls['node_status'], background=True)
+    
+    log_tailer = LogTailer(setting('log_file'))
+    
+    # Time/level index over the node log for /api/logs/search
+    log_search = LogSearch(LogIndex(
+        log_tailer.path,
+        os.path.join(CONFIG_DIR, 'log-index', os.path.basename(log_tailer.path) + '.idx'),
+        bucket_seconds=setting('log_index_bucket_seconds')
+    ))
+    
+    broadcaster = Broadcaster(
+        max_subscribers=setting('stream_max_subscribers'),
+        heartbeat=setting('stream_heartbeat')
+    )
+    
+    # Logs are only polled while someone is watching the stream
+    sampler.add_source('logs', get_recent_logs, sample_ttls['logs'],
+                       when=lambda: broadcaster.subscriber_count > 0, background=True)
+    sampler.add_listener(publish_snapshot_changes)
+    
+    history_store = TimeSeriesStore(
+        os.path.join(CONFIG_DIR, 'tsdb'),
+        retention_days=setting('history_retention_days')
+    )
+    history_interval = setting('history_interval')
+    sampler.add_listener(record_history)
+    sampler.add_source('history_import', import_history, 300, background=True)
+    sampler.add_source('scores', get_scores, 60)
+    
+    # Fleet node registry, shared with the fleet shell scripts and collector
+    fleet_registry = NodeRegistry(setting('fleet_registry'))
+    
+    # Fleet and group aggregates, updated from registry changes by the sampler
+    fleet_summary = FleetSummary(
+        fleet_registry,
+        stale_after=setting('fleet_stale_after'),
+        worst_n=setting('fleet_worst_nodes')
+    )
+    sampler.add_source('fleet_summary', fleet_summary.refresh, setting('fleet_summary_interval'),
+                       background=True)
+    
+    alerts_config = load_alerts_config(setting('alerts_config'))
+    try:
+        alert_rules = rules_from_config(alerts_config)
+    except ValueError as e:
+        logger.error(f"Invalid alert rule, using default rules: {e}")
+        alert_rules = rules_from_config({})
+    alert_engine = AlertEngine(
+        alert_rules,
+        notify=publish_alert,
+        cooldown=float(alerts_config.get('alert_cooldown_hours', 12)) * 3600,
+        # Shared with `pop alerts daemon` and cleared by `pop alerts reset`
+        state_path=os.path.join(os.path.dirname(os.path.abspath(setting('alerts_config'))), 'alert-state.json')
+    )
+    sampler.add_listener(evaluate_alerts)
+    fleet_summary.add_listener(evaluate_fleet_alerts)
+    
+    # Scrapes share one render per metrics_cache_ttl seconds
+    metrics_exposition = CachedExposition(build_metrics, ttl=setting('metrics_cache_ttl'))
+    
+    # System checks run concurrently and are cached, so wizard visits don't re-probe
+    system_checker = SystemChecker(
+        probe_urls=setting('system_check_urls'),
+        ip_lookup_url=setting('system_check_ip_url'),
+        ports=setting('system_check_ports'),
+        timeout=setting('system_check_timeout'),
+        deadline=setting('system_check_deadline'),
+        ttl=setting('system_check_ttl')
+    )
+
+def create_app(config_file=None):
+    """
+    Create the Flask app and its background services.
+    
+    Args:
+        config_file: UI configuration file, CONFIG_FILE when not given
+    
+    Returns:
+        Flask: The application, also available as the module's `app`
+    """
+    global CONFIG, config_store, app, static_assets, compression_cache
+    if not FLASK_AVAILABLE:
+        raise RuntimeError(f"Flask import failed: {FLASK_IMPORT_ERROR}")
+    
+    import secrets
+    from utils.config import ConfigStore
+    from utils.httpcache import CompressionCache, StaticAssets
+    
+    # A new auth token is saved with a new config file, and used without
+    # being saved if an existing file has none
+    defaults = dict(DEFAULT_CONFIG, auth_token=secrets.token_hex(16))
+    config_store = ConfigStore(config_file or CONFIG_FILE, defaults,
+                               checks=CONFIG_CHECKS, create=lambda: dict(defaults))
+    CONFIG = config_store.load()
+    init_services(CONFIG)
+    config_store.add_listener(apply_config)
+    config_store.start()
+    
+    # Static files are served by static_file(), not Flask's static route
+    app = Flask(__name__, static_folder=None)
+    app.secret_key = os.environ.get('PIPE_UI_SECRET_KEY', secrets.token_hex(16))
+    app.config['SESSION_TYPE'] = 'filesystem'
+    # Templates and static files are re-read when they change, until start_server() runs in production mode
+    app.config['TEMPLATES_AUTO_RELOAD'] = True
+    static_assets = StaticAssets(os.path.join(app.root_path, 'static'), auto_reload=True)
+    compression_cache = CompressionCache()
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.context_processor(template_context)
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    app.before_request(start_request_timer)
+    # after_request functions run in reverse, so requests are timed including compression
+    app.after_request(record_request)
+    app.after_request(cache_response)
+    return app
+
+def shutdown_background():
+    """Stop background work so in-flight requests can finish during shutdown"""
+    broadcaster.close_all()
+    profiler.stop()
+    sampler.stop(timeout=1)
+
+def shutdown_services():
+    """Stop the command runner and save state, once requests have drained"""
+    command_runner.shutdown()
+    alert_engine.persist(force=True)
+    config_store.stop()
+
+def start_server(host=None, port=None, debug=None, production=None,
+                 threads=None, connection_limit=None, channel_timeout=None):
     """Start the Flask server with configuration from arguments or config file"""
     host = host or CONFIG.get('host', DEFAULT_CONFIG['host'])
     port = port or CONFIG.get('port', DEFAULT_CONFIG['port'])
     debug = debug if debug is not None else CONFIG.get('debug', DEFAULT_CONFIG['debug'])
+    production = production or CONFIG.get('server_mode', DEFAULT_CONFIG['server_mode']) == 'production'
+    
+    sampler.start()
+    
+    if production and not debug:
+        from utils.serving import serve
+        threads = threads or CONFIG.get('server_threads', DEFAULT_CONFIG['server_threads'])
+        
+        # Compile templates and compress static files once, and stop checking them for changes
+        app.config['TEMPLATES_AUTO_RELOAD'] = False
+        app.jinja_env.auto_reload = False
+        static_assets.auto_reload = False
+        logger.info(f"Compiled {compile_templates()} templates, loaded {static_assets.preload()} static files")
+        
+        # Every open event stream holds a worker thread, keep half for requests
+        broadcaster.max_subscribers = min(broadcaster.max_subscribers, max(1, threads // 2))
+        
+        logger.info(f"Starting production server on {host}:{port}")
+        serve(
+            app, host, int(port),
+            threads=threads,
+            connection_limit=connection_limit or CONFIG.get('server_connection_limit', DEFAULT_CONFIG['server_connection_limit']),
+            channel_timeout=channel_timeout or CONFIG.get('server_channel_timeout', DEFAULT_CONFIG['server_channel_timeout']),
+            backlog=CONFIG.get('server_backlog', DEFAULT_CONFIG['server_backlog']),
+            shutdown_timeout=CONFIG.get('shutdown_timeout', DEFAULT_CONFIG['shutdown_timeout']),
+            on_shutdown=shutdown_background,
+            after_shutdown=shutdown_services
+        )
+        return
     
     logger.info(f"Starting server on {host}:{port}, debug={debug}")
-    app.run(host=host, port=int(port), debug=debug)
+    app.run(host=host, port=int(port), debug=debug, threaded=True)
 
-if __name__ == "__main__":
-    # Parse command line arguments
-    args = parser.parse_args()
+def open_browser(url):
+    """Open `url` in a browser without holding up the server"""
+    from utils.browser import launch_browser
+    threading.Thread(target=launch_browser, args=(url,), daemon=True).start()
+
+def main(argv=None):
+    """Parse arguments and serve the UI, or the fallback page without Flask"""
+    args = parse_args(argv)
+    setup_basic_logging()
+    
+    if not FLASK_AVAILABLE:
+        error_message = f"""
+Flask import failed: {FLASK_IMPORT_ERROR}
+
+The Pipe Network PoP UI requires Flask to run with full functionality.
+"""
+        logger.error(error_message)
+        print(error_message)
+        
+        if not args.fallback:
+            print(INSTALLATION_GUIDE.format(version=sys.version))
+            sys.exit(1)
+        
+        print("Starting fallback server mode...")
+        from utils.fallback import run_fallback_server
+        run_fallback_server(args.host, args.port,
+                            on_ready=None if args.no_browser else open_browser)
+        return
+    
+    create_app()
     
     # Start the server with command line arguments
     start_server(
         host=args.host,
         port=args.port,
-        debug=args.debug
-    ) 
\ No newline at end of file
+        debug=args.debug,
+        production=args.production,
+        threads=args.threads,
+        connection_limit=args.connection_limit,
+        channel_timeout=args.channel_timeout
+    )
+
+if __name__ == "__main__":
+    main()
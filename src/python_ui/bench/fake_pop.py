@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the pop binary, for benchmarking the UI without a node.
+Set it as the UI's pop_command (`python3 bench/fake_pop.py`). Behaviour is
+controlled with environment variables:
+
+    FAKE_POP_LATENCY       seconds to sleep before answering (default 0.05)
+    FAKE_POP_OUTPUT_BYTES  size of the `status` output (default 512)
+    FAKE_POP_LINE_BYTES    length of each `logs` line (default 120)
+    FAKE_POP_CALLS         file that gets one line per invocation, so the
+                           caller can count process spawns
+
+Commands:
+
+    status              "Status: running" followed by padding
+    logs --tail N       N generated log lines
+    config show         a JSON configuration
+    start|stop|restart  a short progress message
+    other               echoed back
+"""
+
+import os
+import sys
+import json
+import time
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def record_call(argv) -> None:
+    path = os.environ.get('FAKE_POP_CALLS')
+    if not path:
+        return
+    # One short O_APPEND write per call stays intact with concurrent callers
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (' '.join(argv[:1]) + '\n').encode())
+    finally:
+        os.close(fd)
+
+
+def status(size: int) -> str:
+    lines = ['Status: running', 'Node ID: bench-node', 'Uptime: 3d 4h 12m']
+    text = '\n'.join(lines) + '\n'
+    filler = 'Detail: ' + 'x' * 72 + '\n'
+    while len(text) < size:
+        text += filler
+    return text[:max(size, len(lines[0]) + 1)]
+
+
+def logs(count: int, width: int) -> str:
+    now = time.time()
+    out = []
+    for i in range(count):
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now - (count - i)))
+        line = f"{stamp} INFO served request {i}: "
+        out.append(line + 'x' * max(0, width - len(line)))
+    return '\n'.join(out) + '\n' if out else ''
+
+
+def tail_count(args) -> int:
+    if '--tail' in args:
+        index = args.index('--tail')
+        if index + 1 < len(args) and args[index + 1].isdigit():
+            return int(args[index + 1])
+    return 100
+
+
+def main(argv) -> int:
+    record_call(argv)
+    time.sleep(max(0.0, env_float('FAKE_POP_LATENCY', 0.05)))
+
+    command = argv[0] if argv else ''
+    if command == 'status':
+        sys.stdout.write(status(int(env_float('FAKE_POP_OUTPUT_BYTES', 512))))
+    elif command == 'logs':
+        sys.stdout.write(logs(tail_count(argv[1:]), int(env_float('FAKE_POP_LINE_BYTES', 120))))
+    elif argv[:2] == ['config', 'show']:
+        json.dump({'node_id': 'bench-node', 'ports': [8003], 'cache_size_mb': 1024}, sys.stdout)
+        sys.stdout.write('\n')
+    elif command in ('start', 'stop', 'restart'):
+        print(f"Node {command} requested")
+        print(f"Node {command} complete")
+    else:
+        print(' '.join(argv))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for an SMTP server, for exercising alert notifications
+without a real mail server. Accepts any sender, recipient and AUTH
+credentials and writes each message to --out as NNNN.eml (or prints a
+one-line summary when --out is not given).
+
+    --delay SECONDS   wait before answering each command (a slow server)
+    --fail N          answer the first N messages with 451 (a temporary
+                      failure the dispatcher should retry)
+
+Usage:
+
+    python3 bench/fake_smtp.py --port 2525 --out /tmp/mail
+    pop alerts config email.server 127.0.0.1   # smtp_port 2525 in alerts.json
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import socketserver
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 fake-smtp ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self.wfile.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n")
+                self.reply("250 8BITMIME")
+            elif verb == 'HELO':
+                self.reply("250 fake-smtp")
+            elif verb == 'AUTH':
+                parts = command.split()
+                if len(parts) > 1 and parts[1].upper() == 'LOGIN':
+                    for prompt in ("334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"):
+                        self.reply(prompt)
+                        self.rfile.readline()
+                elif len(parts) == 2:
+                    self.reply("334 ")
+                    self.rfile.readline()
+                self.reply("235 Authentication successful")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                self.reply(self.server.deliver(b"".join(data)))
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            else:
+                self.reply("502 Command not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, out=None, delay=0.0, fail=0):
+        super().__init__(address, SMTPHandler)
+        self.out = out
+        self.delay = delay
+        self.fail = fail
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def deliver(self, message: bytes) -> str:
+        with self._lock:
+            if self.fail > 0:
+                self.fail -= 1
+                return "451 Temporary failure, try again later"
+            self.received += 1
+            number = self.received
+        if self.out:
+            os.makedirs(self.out, exist_ok=True)
+            with open(os.path.join(self.out, f"{number:04d}.eml"), 'wb') as f:
+                f.write(message)
+        else:
+            subject = next((line for line in message.decode(errors='replace').splitlines()
+                            if line.lower().startswith('subject:')), 'Subject: (none)')
+            print(f"{time.strftime('%H:%M:%S')} message {number}: {subject[8:].strip()}", flush=True)
+        return "250 OK: queued"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP stand-in for testing alert delivery')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--out', help='Directory to write received messages to')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before each reply')
+    parser.add_argument('--fail', type=int, default=0, help='Reject the first N messages with 451')
+    args = parser.parse_args()
+
+    server = FakeSMTPServer((args.host, args.port), out=args.out, delay=args.delay, fail=args.fail)
+    print(f"Fake SMTP server listening on {args.host}:{args.port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
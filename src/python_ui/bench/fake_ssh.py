@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for ssh, for exercising fleet operations without real nodes.
+Accepts the ssh command line used by the fleet tools and answers from the
+local machine. Behaviour is chosen by host name:
+
+    down-*   connection refused (exit 255)
+    slow-*   sleeps FAKE_SSH_SLOW seconds (default 30) before answering
+    fail-*   the remote command exits 1
+    other    answers after FAKE_SSH_LATENCY seconds (default 0.05)
+
+New connections first pay FAKE_SSH_HANDSHAKE seconds (default 0.15).
+Connection multiplexing is emulated: `-M` creates the ControlPath file,
+`-O check` / `-O exit` inspect and remove it, and commands sent through a
+live control path skip the handshake. Masters expire after ControlPersist
+seconds without use.
+
+`pop --pulse --export json` returns generated metrics. Uploads (commands
+reading stdin through `tar x` or `cat >`/`gzip -dc >`) are discarded and
+the byte count is reported. Other commands are echoed back. Usage:
+
+    python3 -m utils.fleet_collector --ssh bench/fake_ssh.py ...
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+
+# ssh options that take a value
+OPTIONS_WITH_VALUE = set('BbcDEeFIiJLlmOopQRSWw')
+
+
+def parse_args(argv):
+    """Split an ssh command line into (options, destination, command)"""
+    options = {}
+    i = 0
+    while i < len(argv) and argv[i].startswith('-'):
+        flag = argv[i][1:]
+        if flag and flag[0] in OPTIONS_WITH_VALUE:
+            if len(flag) > 1:
+                value = flag[1:]
+            else:
+                i += 1
+                value = argv[i] if i < len(argv) else ''
+            options.setdefault(flag[0], []).append(value)
+        else:
+            for char in flag:
+                options.setdefault(char, []).append(True)
+        i += 1
+    destination = argv[i] if i < len(argv) else ''
+    return options, destination, ' '.join(argv[i + 1:])
+
+
+def ssh_options(options):
+    """-o Key=Value options as a dict with lower-case keys"""
+    result = {}
+    for value in options.get('o', []):
+        key, _, val = value.partition('=')
+        result[key.lower()] = val
+    return result
+
+
+def control_path(template, user, host, port):
+    if not template or template.lower() == 'none':
+        return None
+    digest = hashlib.sha1(f"{host}{port}{user}".encode()).hexdigest()[:16]
+    return template.replace('%C', digest).replace('%h', host).replace('%p', port).replace('%r', user)
+
+
+def master_alive(path, persist):
+    try:
+        return time.time() - os.path.getmtime(path) < persist
+    except OSError:
+        return False
+
+
+def pulse(host):
+    rng = random.Random(f"{host}{int(time.time() // 60)}")
+    return {
+        'status': 'Running',
+        'node_id': f"node-{host}",
+        'cpu_usage': round(rng.uniform(5, 90), 1),
+        'memory_usage': round(rng.uniform(20, 80), 1),
+        'disk_usage': round(rng.uniform(10, 70), 1),
+        'uptime': f"{rng.randint(1, 30)} days",
+        'reputation': round(rng.uniform(60, 100), 1),
+        'points': rng.randint(100, 5000),
+        'uptime_score': round(rng.uniform(80, 100), 1),
+        'egress_score': round(rng.uniform(50, 100), 1),
+        'timestamp': int(time.time())
+    }
+
+
+def main():
+    options, destination, command = parse_args(sys.argv[1:])
+    user, _, host = destination.rpartition('@')
+    port = options.get('p', ['22'])[-1]
+    config = ssh_options(options)
+    path = control_path(config.get('controlpath'), user, host, port)
+    persist = float(config.get('controlpersist', '300').rstrip('s') or 300)
+    mode = config.get('controlmaster', 'no').lower()
+
+    if 'O' in options:
+        operation = options['O'][-1]
+        if not path or not master_alive(path, persist):
+            sys.stderr.write("Control socket connect: No such file or directory\n")
+            return 255
+        if operation == 'exit':
+            os.remove(path)
+        return 0
+
+    multiplexed = bool(path) and master_alive(path, persist)
+    if not multiplexed:
+        if host.startswith('down'):
+            sys.stderr.write(f"ssh: connect to host {host} port {port}: Connection refused\n")
+            return 255
+        time.sleep(float(os.environ.get('FAKE_SSH_HANDSHAKE', 0.15)))
+        if path and ('M' in options or mode in ('auto', 'yes')):
+            with open(path, 'w') as f:
+                f.write(str(os.getpid()))
+    else:
+        os.utime(path)
+
+    if 'M' in options:
+        return 0
+
+    time.sleep(float(os.environ.get('FAKE_SSH_SLOW', 30)) if host.startswith('slow')
+               else float(os.environ.get('FAKE_SSH_LATENCY', 0.05)))
+
+    if host.startswith('fail'):
+        sys.stderr.write(f"{command}: command failed\n")
+        return 1
+
+    if '--pulse' in command:
+        print(json.dumps(pulse(host)))
+    elif 'tar x' in command or ' >' in command:
+        received = len(sys.stdin.buffer.read())
+        print(f"[{host}] received {received} bytes")
+    elif command:
+        print(f"[{host}] {command}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load benchmark for Pipe Network PoP Web UI serving modes.
+Starts app.py in each requested mode against a throwaway config, drives
+concurrent keep-alive GET requests at one route and reports requests/sec
+and latency percentiles.
+
+Usage:
+    python3 bench/load.py --modes dev,production --concurrency 16 --duration 10
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from typing import Any, Dict, List
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODE_FLAGS = {
+    'dev': [],
+    'production': ['--production']
+}
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def write_config(home: str, token: str, overrides: Dict[str, Any]) -> None:
+    """Write a UI config that does not depend on a real pop installation"""
+    config_dir = os.path.join(home, '.local', 'share', 'pipe-pop')
+    os.makedirs(config_dir, exist_ok=True)
+    config = {
+        'auth_enabled': True,
+        'auth_token': token,
+        'pop_command': 'true',
+        'log_file': os.path.join(home, 'missing.log')
+    }
+    config.update(overrides)
+    with open(os.path.join(config_dir, 'ui-config.json'), 'w') as f:
+        json.dump(config, f)
+
+
+def wait_for_port(port: int, timeout: float = 15.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def drive(port: int, path: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """
+    Send requests from `concurrency` threads for `duration` seconds.
+
+    Returns:
+        Dict[str, Any]: Request count, errors, requests/sec and latencies in ms
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+                    continue
+                local.append((time.perf_counter() - start) * 1000.0)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0
+    }
+
+
+def run_mode(mode: str, route: str, concurrency: int, duration: float,
+             warmup: float) -> Dict[str, Any]:
+    """Start the UI in one serving mode and benchmark it"""
+    home = tempfile.mkdtemp(prefix='pipe-ui-bench-')
+    token = 'bench'
+    port = free_port()
+    write_config(home, token, {})
+
+    env = dict(os.environ, HOME=home)
+    command = [sys.executable, 'app.py', '--port', str(port)] + MODE_FLAGS[mode]
+    process = subprocess.Popen(command, cwd=UI_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError(f"UI did not start in {mode} mode")
+
+        separator = '&' if '?' in route else '?'
+        path = f"{route}{separator}token={token}"
+        if warmup:
+            drive(port, path, concurrency, warmup)
+        result = drive(port, path, concurrency, duration)
+        result['mode'] = mode
+        return result
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Pipe Network PoP Web UI serving modes')
+    parser.add_argument('--modes', default='dev,production', help='Comma-separated modes to compare')
+    parser.add_argument('--route', default='/api/status', help='Route to request')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to measure per mode')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of unmeasured load first')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes.split(','):
+        if mode not in MODE_FLAGS:
+            parser.error(f"Unknown mode: {mode}")
+        results.append(run_mode(mode, args.route, args.concurrency, args.duration, args.warmup))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.route}, {args.concurrency} connections, {args.duration:g}s per mode\n")
+    print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark for Pipe Network PoP Web UI.
+Measures how long app.py takes from process start until it answers its
+first HTTP request, against a throwaway config:
+
+    import      python3 -c "import app" (no server)
+    dev         app.py
+    production  app.py --production
+    fallback    app.py --fallback with Flask made unimportable
+    restart     SIGTERM to a running server until its replacement answers
+
+Exits non-zero when the median of any mode exceeds --budget seconds.
+
+Usage:
+    python3 bench/startup.py --modes dev,fallback,restart --runs 5 --budget 1.0
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import http.client
+from typing import Any, Dict, List
+
+from load import UI_DIR, free_port, percentile, write_config
+
+# Runs app.py as __main__ with every flask import failing
+NO_FLASK = ("import runpy, sys; sys.modules['flask'] = None; "
+            "sys.argv = ['app.py'] + sys.argv[1:]; runpy.run_path('app.py', run_name='__main__')")
+
+MODES = ('import', 'dev', 'production', 'fallback', 'restart')
+
+
+def server_command(mode: str, port: int) -> List[str]:
+    args = ['--port', str(port)]
+    if mode == 'production':
+        return [sys.executable, 'app.py', '--production'] + args
+    if mode == 'fallback':
+        return [sys.executable, '-c', NO_FLASK, '--fallback', '--no-browser'] + args
+    return [sys.executable, 'app.py'] + args
+
+
+def wait_until_serving(port: int, path: str, process: subprocess.Popen, timeout: float = 15.0) -> bool:
+    """Poll until `path` gets an HTTP response, or the process exits"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline and process.poll() is None:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+        try:
+            conn.request('GET', path)
+            conn.getresponse().read()
+            return True
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.005)
+        finally:
+            conn.close()
+    return False
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def time_start(mode: str, env: Dict[str, str], port: int) -> float:
+    """Seconds from spawning the server until it answers"""
+    started = time.perf_counter()
+    process = subprocess.Popen(server_command(mode, port), cwd=UI_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_serving(port, '/' if mode == 'fallback' else '/login', process):
+            raise RuntimeError(f"UI did not start in {mode} mode")
+        return time.perf_counter() - started
+    finally:
+        stop(process)
+
+
+def time_import(env: Dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=UI_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def time_restarts(env: Dict[str, str], port: int, runs: int) -> List[float]:
+    """Seconds from stopping a running server until a new one answers"""
+    process = subprocess.Popen(server_command('dev', port), cwd=UI_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = []
+    try:
+        if not wait_until_serving(port, '/login', process):
+            raise RuntimeError("UI did not start")
+        for _ in range(runs):
+            started = time.perf_counter()
+            stop(process)
+            process = subprocess.Popen(server_command('dev', port), cwd=UI_DIR, env=env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not wait_until_serving(port, '/login', process):
+                raise RuntimeError("UI did not come back after a restart")
+            timings.append(time.perf_counter() - started)
+    finally:
+        stop(process)
+    return timings
+
+
+def run_mode(mode: str, runs: int) -> Dict[str, Any]:
+    home = tempfile.mkdtemp(prefix='pipe-ui-startup-')
+    write_config(home, 'bench', {
+        'history_dir': os.path.join(home, 'history'),
+        'fleet_registry': os.path.join(home, 'nodes.db'),
+        'alerts_config': os.path.join(home, 'alerts.json'),
+        'system_check_urls': [],
+        'system_check_ip_url': ''
+    })
+    env = dict(os.environ, HOME=home)
+    try:
+        if mode == 'import':
+            timings = [time_import(env) for _ in range(runs)]
+        elif mode == 'restart':
+            timings = time_restarts(env, free_port(), runs)
+        else:
+            timings = [time_start(mode, env, free_port()) for _ in range(runs)]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    timings.sort()
+    return {
+        'mode': mode,
+        'runs': len(timings),
+        'min_s': round(timings[0], 3),
+        'median_s': round(percentile(timings, 50), 3),
+        'max_s': round(timings[-1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Pipe Network PoP Web UI startup time')
+    parser.add_argument('--modes', default='import,dev,fallback,restart',
+                        help=f"Comma-separated modes to measure ({', '.join(MODES)})")
+    parser.add_argument('--runs', type=int, default=5, help='Measurements per mode')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Fail if any median exceeds this many seconds')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes.split(','):
+        if mode not in MODES:
+            parser.error(f"Unknown mode: {mode}")
+        results.append(run_mode(mode, args.runs))
+
+    over = [r['mode'] for r in results if r['median_s'] > args.budget]
+    if args.json:
+        print(json.dumps({'budget_s': args.budget, 'results': results, 'over_budget': over}, indent=2))
+    else:
+        print(f"{args.runs} runs per mode, budget {args.budget:g}s\n")
+        print(f"{'mode':<12}{'min s':>8}{'median s':>10}{'max s':>8}")
+        for r in results:
+            print(f"{r['mode']:<12}{r['min_s']:>8}{r['median_s']:>10}{r['max_s']:>8}")
+        if over:
+            print(f"\nOver budget: {', '.join(over)}")
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
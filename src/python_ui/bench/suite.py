@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the Pipe Network PoP Web UI API.
+Runs app.py against bench/fake_pop.py (a pop stand-in with configurable
+latency and output size) and a throwaway config, then measures:
+
+    cold start     seconds from spawning app.py until /api/status answers
+    per route      requests/sec and p50/p95/p99 latency under concurrent
+                   keep-alive load, pop processes spawned per request and
+                   resident memory afterwards
+    peak RSS       high-water mark of the server process (Linux)
+
+Spawns per request include the background sampler's own `pop status`
+calls, which is what a node sees under that load.
+
+The report is written as JSON. With --compare, routes and cold start are
+checked against an earlier report and the exit status is non-zero when
+throughput drops or p95 latency rises by more than --tolerance percent.
+
+Usage:
+    python3 bench/suite.py --out before.json
+    python3 bench/suite.py --out after.json --compare before.json --tolerance 20
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from load import MODE_FLAGS, UI_DIR, drive, free_port, percentile, write_config
+from startup import stop, wait_until_serving
+
+FAKE_POP = os.path.join(UI_DIR, 'bench', 'fake_pop.py')
+
+DEFAULT_ROUTES = '/api/status,/api/logs?limit=100,/api/config,/api/batch?logs_limit=20,/metrics'
+
+REPORT_VERSION = 1
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=UI_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def memory_kb(pid: int) -> Dict[str, Optional[int]]:
+    """Current (VmRSS) and peak (VmHWM) resident memory of a process"""
+    values = {'rss_kb': None, 'peak_rss_kb': None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    values['rss_kb'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    values['peak_rss_kb'] = int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def count_calls(path: str) -> int:
+    try:
+        with open(path, 'rb') as f:
+            return f.read().count(b'\n')
+    except OSError:
+        return 0
+
+
+def with_token(route: str, token: str) -> str:
+    return f"{route}{'&' if '?' in route else '?'}token={token}"
+
+
+class Environment:
+    """A throwaway HOME with a UI config that runs fake_pop.py as pop"""
+
+    def __init__(self, args):
+        self.token = 'bench'
+        self.home = tempfile.mkdtemp(prefix='pipe-ui-suite-')
+        self.calls = os.path.join(self.home, 'pop-calls')
+        write_config(self.home, self.token, {
+            'pop_command': f"{sys.executable} {FAKE_POP}",
+            'history_dir': os.path.join(self.home, 'history'),
+            'fleet_registry': os.path.join(self.home, 'nodes.db'),
+            'alerts_config': os.path.join(self.home, 'alerts.json'),
+            'system_check_urls': [],
+            'system_check_ip_url': ''
+        })
+        self.env = dict(os.environ, HOME=self.home, FAKE_POP_CALLS=self.calls,
+                        FAKE_POP_LATENCY=str(args.latency),
+                        FAKE_POP_OUTPUT_BYTES=str(args.output_bytes),
+                        FAKE_POP_LINE_BYTES=str(args.line_bytes))
+        self.command = [sys.executable, 'app.py'] + MODE_FLAGS[args.mode]
+
+    def spawn(self, port: int) -> subprocess.Popen:
+        return subprocess.Popen(self.command + ['--port', str(port)], cwd=UI_DIR, env=self.env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.home, ignore_errors=True)
+
+
+def measure_cold_start(environment: Environment, runs: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(runs):
+        port = free_port()
+        started = time.perf_counter()
+        process = environment.spawn(port)
+        try:
+            if not wait_until_serving(port, with_token('/api/status', environment.token), process):
+                raise RuntimeError("UI did not start")
+            timings.append(time.perf_counter() - started)
+        finally:
+            stop(process)
+    timings.sort()
+    return {
+        'runs': len(timings),
+        'min_s': round(timings[0], 3) if timings else None,
+        'median_s': round(percentile(timings, 50), 3) if timings else None,
+        'max_s': round(timings[-1], 3) if timings else None
+    }
+
+
+def measure_routes(environment: Environment, routes: List[str], args) -> Dict[str, Any]:
+    port = free_port()
+    process = environment.spawn(port)
+    results = []
+    try:
+        if not wait_until_serving(port, '/login', process):
+            raise RuntimeError("UI did not start")
+        for route in routes:
+            path = with_token(route, environment.token)
+            if args.warmup:
+                drive(port, path, args.concurrency, args.warmup)
+            calls = count_calls(environment.calls)
+            result = drive(port, path, args.concurrency, args.duration)
+            spawned = count_calls(environment.calls) - calls
+            result.update(
+                route=route,
+                pop_spawns=spawned,
+                spawns_per_request=round(spawned / result['requests'], 4) if result['requests'] else None,
+                rss_kb=memory_kb(process.pid)['rss_kb']
+            )
+            results.append(result)
+        peak = memory_kb(process.pid)['peak_rss_kb']
+    finally:
+        stop(process)
+    return {'routes': results, 'peak_rss_kb': peak}
+
+
+def change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not old or new is None:
+        return None
+    return round((new - old) / old * 100.0, 1)
+
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Per-route and cold start changes against `baseline`, in percent.
+
+    A route regresses when its throughput drops, or its p95 latency rises,
+    by more than `tolerance` percent; cold start when its median rises.
+    """
+    before = {r['route']: r for r in baseline.get('routes', [])}
+    rows = []
+    for result in report['routes']:
+        old = before.get(result['route'])
+        if not old:
+            continue
+        rps = change(old['rps'], result['rps'])
+        p95 = change(old['p95_ms'], result['p95_ms'])
+        rows.append({
+            'name': result['route'],
+            'rps_change_pct': rps,
+            'p95_change_pct': p95,
+            'regressed': (rps is not None and rps < -tolerance) or (p95 is not None and p95 > tolerance)
+        })
+    cold = change((baseline.get('cold_start') or {}).get('median_s'), report['cold_start']['median_s'])
+    if cold is not None:
+        rows.append({'name': 'cold start', 'rps_change_pct': None, 'p95_change_pct': None,
+                     'median_change_pct': cold, 'regressed': cold > tolerance})
+    return rows
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]]) -> None:
+    p = report['parameters']
+    print(f"{p['mode']} mode, {p['concurrency']} connections, {p['duration']:g}s per route, "
+          f"pop latency {p['latency']:g}s\n")
+    print(f"{'route':<32}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'spawns/req':>12}{'errors':>8}")
+    for r in report['routes']:
+        print(f"{r['route'][:31]:<32}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{r['spawns_per_request'] if r['spawns_per_request'] is not None else '-':>12}{r['errors']:>8}")
+    cold = report['cold_start']
+    print(f"\ncold start: median {cold['median_s']}s (min {cold['min_s']}s, max {cold['max_s']}s, {cold['runs']} runs)")
+    if report['peak_rss_kb']:
+        print(f"peak RSS: {report['peak_rss_kb'] / 1024:.1f} MiB")
+    if comparison:
+        print(f"\nAgainst {report['compared_to']}:")
+        for row in comparison:
+            if 'median_change_pct' in row:
+                detail = f"median {row['median_change_pct']:+}%"
+            else:
+                detail = ', '.join(f"{label} {value:+}%" for label, value in
+                                   (('req/s', row['rps_change_pct']), ('p95', row['p95_change_pct']))
+                                   if value is not None)
+            print(f"  {row['name']:<30} {detail}{'  REGRESSED' if row['regressed'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Pipe Network PoP Web UI API against a fake pop')
+    parser.add_argument('--routes', default=DEFAULT_ROUTES, help='Comma-separated routes to load')
+    parser.add_argument('--mode', choices=sorted(MODE_FLAGS), default='production', help='Serving mode')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds to measure per route')
+    parser.add_argument('--warmup', type=float, default=1, help='Seconds of unmeasured load per route first')
+    parser.add_argument('--cold-starts', type=int, default=3, help='Cold start measurements')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds each fake pop call takes')
+    parser.add_argument('--output-bytes', type=int, default=512, help='Size of the fake `pop status` output')
+    parser.add_argument('--line-bytes', type=int, default=120, help='Length of each fake `pop logs` line')
+    parser.add_argument('--out', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Earlier report to compare against')
+    parser.add_argument('--tolerance', type=float, default=20, help='Allowed regression in percent')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    environment = Environment(args)
+    try:
+        cold_start = measure_cold_start(environment, args.cold_starts)
+        measured = measure_routes(environment, [r for r in args.routes.split(',') if r], args)
+    finally:
+        environment.cleanup()
+
+    report = {
+        'version': REPORT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parameters': {
+            'mode': args.mode,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'latency': args.latency,
+            'output_bytes': args.output_bytes,
+            'line_bytes': args.line_bytes
+        },
+        'cold_start': cold_start,
+        **measured
+    }
+
+    comparison = None
+    if baseline is not None:
+        comparison = compare(baseline, report, args.tolerance)
+        report['compared_to'] = baseline.get('commit') or args.compare
+        report['comparison'] = comparison
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, comparison)
+    return 1 if comparison and any(row['regressed'] for row in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Utility modules for the Pipe Network PoP Web UI
+"""
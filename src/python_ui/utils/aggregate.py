@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+History aggregation for Pipe Network PoP Web UI.
+Computes count, average, min, max, percentiles and a least-squares trend
+for a metric in one pass over its samples. Uses NumPy when available and
+falls back to the standard library otherwise.
+"""
+
+import os
+import sys
+import math
+import time
+from array import array
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+# Relative change over the period, in percent, before a trend is reported
+TREND_THRESHOLD = 5.0
+
+PERIODS = {
+    '1d': 86400,
+    '3d': 3 * 86400,
+    '7d': 7 * 86400,
+    '14d': 14 * 86400,
+    '30d': 30 * 86400,
+    '90d': 90 * 86400,
+    'all': None
+}
+
+
+def percentile_sorted(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolation percentile of sorted values (NumPy's default)"""
+    if len(values) == 1:
+        return values[0]
+    rank = pct / 100.0 * (len(values) - 1)
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def _trend(slope: float, intercept: float, t0: float, t1: float) -> str:
+    """Classify the fitted line by its relative change over the period"""
+    start = intercept + slope * t0
+    end = intercept + slope * t1
+    if start == 0:
+        return 'stable' if end == 0 else ('up' if end > 0 else 'down')
+    change = (end - start) / abs(start) * 100.0
+    if change > TREND_THRESHOLD:
+        return 'up'
+    if change < -TREND_THRESHOLD:
+        return 'down'
+    return 'stable'
+
+
+def _as_ndarray(values):
+    # array('d') from TimeSeriesStore.query can be wrapped without copying
+    if isinstance(values, array) and values.typecode == 'd':
+        return np.frombuffer(values, dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _summarize_numpy(ts, vals, percentiles):
+    t = _as_ndarray(ts)
+    v = _as_ndarray(vals)
+    # Centre time to keep the regression numerically stable
+    tc = t - t[0]
+    t_mean = tc.mean()
+    v_mean = v.mean()
+    var = ((tc - t_mean) ** 2).sum()
+    slope = float(((tc - t_mean) * (v - v_mean)).sum() / var) if var else 0.0
+    pct_values = np.percentile(v, percentiles) if percentiles else []
+    return {
+        'avg': float(v_mean),
+        'min': float(v.min()),
+        'max': float(v.max()),
+        'percentiles': [float(p) for p in pct_values],
+        'slope': slope,
+        'intercept': float(v_mean - slope * t_mean),
+        'span': float(tc[-1])
+    }
+
+
+def _summarize_python(ts, vals, percentiles):
+    n = len(vals)
+    t0 = ts[0]
+    sum_t = sum_v = sum_tt = sum_tv = 0.0
+    low = high = vals[0]
+    for t, v in zip(ts, vals):
+        t -= t0
+        sum_t += t
+        sum_v += v
+        sum_tt += t * t
+        sum_tv += t * v
+        if v < low:
+            low = v
+        elif v > high:
+            high = v
+    t_mean = sum_t / n
+    v_mean = sum_v / n
+    var = sum_tt - n * t_mean * t_mean
+    slope = (sum_tv - n * t_mean * v_mean) / var if var > 0 else 0.0
+    ordered = sorted(vals) if percentiles else []
+    return {
+        'avg': v_mean,
+        'min': low,
+        'max': high,
+        'percentiles': [percentile_sorted(ordered, p) for p in percentiles],
+        'slope': slope,
+        'intercept': v_mean - slope * t_mean,
+        'span': ts[-1] - t0
+    }
+
+
+def summarize(timestamps: Sequence[float], values: Sequence[float],
+              percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """
+    Compute summary statistics for a series of samples.
+
+    Args:
+        timestamps (Sequence[float]): Sample times, ascending
+        values (Sequence[float]): Sample values
+        percentiles (Iterable[float]): Percentiles to compute, 0-100
+
+    Returns:
+        Dict[str, Any]: count, first/last timestamp and value, avg, min, max,
+        p<N> for each percentile, slope per day and trend ("up", "down",
+        "stable" or "unknown" with fewer than two samples)
+    """
+    percentiles = list(percentiles)
+    count = len(values)
+    if count == 0:
+        return {'count': 0, 'trend': 'unknown'}
+
+    stats = (_summarize_numpy if np is not None else _summarize_python)(timestamps, values, percentiles)
+
+    result = {
+        'count': count,
+        'first_timestamp': timestamps[0],
+        'last_timestamp': timestamps[-1],
+        'first': values[0],
+        'last': values[-1],
+        'avg': round(stats['avg'], 4),
+        'min': stats['min'],
+        'max': stats['max'],
+        'slope_per_day': round(stats['slope'] * 86400, 6),
+        'trend': 'unknown' if count < 2 else _trend(stats['slope'], stats['intercept'], 0.0, stats['span'])
+    }
+    for pct, value in zip(percentiles, stats['percentiles']):
+        result[f"p{pct:g}"] = round(value, 4)
+    return result
+
+
+def period_range(period: str, now: Optional[float] = None):
+    """
+    Convert a history.sh period such as "7d" to a (start, end) range.
+
+    Raises:
+        ValueError: If the period is unknown
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Invalid period: {period}")
+    now = now if now is not None else time.time()
+    seconds = PERIODS[period]
+    return (now - seconds if seconds else None), now
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import json
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.tsdb import TimeSeriesStore
+
+    parser = argparse.ArgumentParser(description='Summarize Pipe Network PoP metrics history')
+    parser.add_argument('--store', default=os.path.expanduser('~/.local/share/pipe-pop/tsdb'),
+                        help='Time-series store directory')
+    parser.add_argument('--import-dir', help='Import new history.sh JSON files from this directory first')
+    parser.add_argument('--period', default='7d', help=f"One of {', '.join(PERIODS)}")
+    parser.add_argument('--metrics', default='reputation,points,uptime_score,historical_score,egress_score',
+                        help='Comma-separated metric names')
+    parser.add_argument('--format', choices=('json', 'tsv'), default='json',
+                        help='tsv prints one line per metric for shell scripts')
+    args = parser.parse_args(argv)
+
+    try:
+        start, end = period_range(args.period)
+    except ValueError as e:
+        parser.error(str(e))
+
+    store = TimeSeriesStore(args.store)
+    if args.import_dir:
+        # history.sh files always carry reputation; the UI's own metrics do not
+        last = store.last('reputation')
+        store.import_json_history(args.import_dir, since=last[0] if last else None)
+
+    summaries = {}
+    for metric in args.metrics.split(','):
+        timestamps, values = store.query(metric, start, end)
+        summaries[metric] = summarize(timestamps, values)
+
+    if args.format == 'json':
+        print(json.dumps(summaries, indent=2))
+        return
+
+    # metric count first_ts last_ts avg min max p50 p95 p99 trend
+    for metric, s in summaries.items():
+        if not s['count']:
+            print(f"{metric}\t0\t0\t0\tN/A\tN/A\tN/A\tN/A\tN/A\tN/A\tunknown")
+            continue
+        print("\t".join([
+            metric, str(s['count']),
+            f"{s['first_timestamp']:.0f}", f"{s['last_timestamp']:.0f}",
+            f"{s['avg']:.2f}", f"{s['min']:g}", f"{s['max']:g}",
+            f"{s['p50']:.2f}", f"{s['p95']:.2f}", f"{s['p99']:.2f}",
+            s['trend']
+        ]))
+
+
+if __name__ == '__main__':
+    main()
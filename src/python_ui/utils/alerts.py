@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming alert engine for Pipe Network PoP.
+Evaluates threshold, rate-of-change and sustained-for-duration rules
+against every metrics sample as it arrives, for the local node and for
+fleet nodes. Rules are indexed by metric so a sample only touches the
+rules that watch it. Rule state and cooldowns are kept in memory and
+written to disk periodically.
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import logging
+import operator
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utils.tsdb import HISTORY_FILE_RE, to_float
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ('info', 'warning', 'critical')
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+RULE_KINDS = ('threshold', 'rate')
+
+# Source name of the node the engine runs on
+LOCAL = 'local'
+
+# Web UI metric names and the names used by alerts.sh and fleet metrics
+METRIC_ALIASES = {
+    'cpu': 'cpu_usage',
+    'memory': 'memory_usage',
+    'disk': 'disk_usage'
+}
+
+# Defaults shown by `pop alerts status`. Scores alert when they drop below
+# the threshold, resource usage when it rises above it.
+DEFAULT_THRESHOLDS = {
+    'reputation': {'min': 70, 'critical': 50},
+    'uptime_score': {'min': 90, 'critical': 80},
+    'historical_score': {'min': 85, 'critical': 75},
+    'egress_score': {'min': 80, 'critical': 60},
+    'cpu_usage': {'max': 80, 'critical': 95},
+    'memory_usage': {'max': 85, 'critical': 95},
+    'disk_usage': {'max': 85, 'critical': 95}
+}
+LOW_METRICS = ('reputation', 'uptime_score', 'historical_score', 'egress_score')
+
+# CPU spikes are normal, only alert when usage stays high
+DEFAULT_DURATIONS = {'cpu_usage': 120}
+
+# Catch a disk filling up long before it crosses the usage thresholds
+DEFAULT_RULES = [
+    {
+        'name': 'disk_usage_rising',
+        'metric': 'disk_usage',
+        'kind': 'rate',
+        'op': '>',
+        'value': 1,
+        'window': 600,
+        'level': 'warning'
+    }
+]
+
+DEFAULT_COOLDOWN_HOURS = 12
+STATE_VERSION = 1
+
+
+class Rule:
+    """
+    One alert rule.
+
+    A threshold rule compares each sample with `value`. A rate rule
+    compares the change per minute over the last `window` seconds. Either
+    kind only fires once its condition has held for `duration` seconds.
+    """
+
+    __slots__ = ('name', 'metric', 'kind', 'op', 'value', 'window', 'duration',
+                 'level', 'cooldown', 'nodes', 'message', '_compare')
+
+    def __init__(self, name: str, metric: str, value: float, op: str = '>', kind: str = 'threshold',
+                 window: float = 300, duration: float = 0, level: str = 'warning',
+                 cooldown: Optional[float] = None, nodes: Optional[Iterable[str]] = None,
+                 message: Optional[str] = None):
+        if not name or not metric:
+            raise ValueError("Alert rules need a name and a metric")
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Rule '{name}': unknown kind '{kind}', expected one of {', '.join(RULE_KINDS)}")
+        if op not in OPERATORS:
+            raise ValueError(f"Rule '{name}': unknown operator '{op}'")
+        if level not in LEVELS:
+            raise ValueError(f"Rule '{name}': unknown level '{level}'")
+        try:
+            value = float(value)
+            window = float(window)
+            duration = float(duration)
+            cooldown = float(cooldown) if cooldown is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"Rule '{name}': value, window, duration and cooldown must be numbers")
+        if kind == 'rate' and window <= 0:
+            raise ValueError(f"Rule '{name}': rate rules need a positive window")
+
+        self.name = name
+        self.metric = METRIC_ALIASES.get(metric, metric)
+        self.kind = kind
+        self.op = op
+        self.value = value
+        self.window = window
+        self.duration = max(0.0, duration)
+        self.level = level
+        self.cooldown = cooldown
+        self.nodes = tuple(nodes) if nodes else None
+        self.message = message
+        self._compare = OPERATORS[op]
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'Rule':
+        """
+        Build a rule from its JSON form.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        if not isinstance(data, Mapping):
+            raise ValueError("Alert rules must be objects")
+        fields = dict(data)
+        if 'for' in fields:
+            fields['duration'] = fields.pop('for')
+        unknown = set(fields) - set(cls.__slots__)
+        if unknown or 'value' not in fields:
+            raise ValueError(f"Rule '{fields.get('name')}': "
+                             + (f"unknown fields {', '.join(sorted(unknown))}" if unknown else "missing value"))
+        return cls(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {slot: getattr(self, slot) for slot in self.__slots__ if not slot.startswith('_')}
+        data['for'] = data.pop('duration')
+        return {k: v for k, v in data.items() if v is not None}
+
+    def applies_to(self, source: str) -> bool:
+        return self.nodes is None or any(fnmatch.fnmatchcase(source, p) for p in self.nodes)
+
+    def describe(self, source: str, measured: float) -> str:
+        """Human readable alert message, in the style of alerts.sh"""
+        if self.message:
+            return self.message.format(source=source, metric=self.metric, value=measured,
+                                       threshold=self.value, level=self.level)
+        label = self.metric.replace('_', ' ').capitalize()
+        unit = '%' if self.metric.endswith('_usage') else ''
+        rising = self.op in ('>', '>=')
+        if self.kind == 'rate':
+            text = (f"{label} is {'rising' if rising else 'falling'} by {abs(measured):.2f}{unit}/min "
+                    f"over {self.window:.0f}s (threshold: {self.value:g}{unit}/min)")
+        else:
+            severity = 'critically ' if self.level == 'critical' else ''
+            text = (f"{label} is {severity}{'high' if rising else 'low'}: "
+                    f"{round(measured, 2):g}{unit} (threshold: {self.value:g}{unit})")
+        if self.duration:
+            text += f" for {self.duration:.0f}s"
+        return text if source == LOCAL else f"[{source}] {text}"
+
+
+class _RuleState:
+    __slots__ = ('pending_since', 'firing_since', 'notified', 'measured', 'samples')
+
+    def __init__(self):
+        self.pending_since = None
+        self.firing_since = None
+        self.notified = None
+        self.measured = None
+        self.samples = None
+
+
+def rules_from_config(config: Mapping[str, Any]) -> List[Rule]:
+    """
+    Build rules from an alerts.json configuration.
+
+    Thresholds in `alert_thresholds` (the format `pop alerts config`
+    writes) and the older `thresholds` section become threshold rules
+    named `<metric>_warning` and `<metric>_critical`. Extra rules,
+    including rate and sustained rules, are listed under `rules`; a rule
+    with the same name as a default replaces it.
+
+    Raises:
+        ValueError: If a rule is invalid
+    """
+    thresholds = {metric: dict(values) for metric, values in DEFAULT_THRESHOLDS.items()}
+    for metric, values in (config.get('thresholds') or {}).items():
+        metric = METRIC_ALIASES.get(metric, metric)
+        if metric in thresholds and isinstance(values, Mapping):
+            warning_key = 'min' if metric in LOW_METRICS else 'max'
+            if 'warning' in values:
+                thresholds[metric][warning_key] = values['warning']
+            if 'critical' in values:
+                thresholds[metric]['critical'] = values['critical']
+    for metric, values in (config.get('alert_thresholds') or {}).items():
+        if isinstance(values, Mapping):
+            thresholds.setdefault(metric, {}).update(values)
+
+    rules = {}
+    for metric, values in thresholds.items():
+        low = metric in LOW_METRICS or ('min' in values and 'max' not in values)
+        op = '<' if low else '>'
+        warning = values.get('min' if low else 'max')
+        for level, value in (('warning', warning), ('critical', values.get('critical'))):
+            if value is None:
+                continue
+            name = f"{metric}_{level}"
+            rules[name] = Rule(name, metric, value, op=op, level=level,
+                               duration=DEFAULT_DURATIONS.get(metric, 0))
+
+    for data in list(DEFAULT_RULES) + list(config.get('rules') or []):
+        rule = Rule.from_dict(data)
+        rules[rule.name] = rule
+    return list(rules.values())
+
+
+def load_alerts_config(path: str) -> Dict[str, Any]:
+    """Read alerts.json, returning an empty configuration if it is missing"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (IOError, OSError, ValueError) as e:
+        logger.error(f"Error reading alerts configuration {path}: {e}")
+        return {}
+
+
+class AlertEngine:
+    """
+    Evaluate alert rules against samples as they arrive.
+
+    evaluate() is called with each new sample of a source (the local node
+    or a fleet node). Only rules watching the metrics in the sample run,
+    so the cost per sample does not grow with the number of unrelated
+    rules. Firing alerts are passed to `notify(event)` unless the rule is
+    in its cooldown, or a more severe rule on the same metric is already
+    firing for that source.
+
+    Several engines (the UI and `pop alerts daemon`) may share a state
+    file. Each re-reads it when another process rewrites it, keeping the
+    latest notification time of every rule so cooldowns are shared, and
+    drops its state when the file is removed by `pop alerts reset`.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = (), notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cooldown: float = DEFAULT_COOLDOWN_HOURS * 3600, state_path: Optional[str] = None,
+                 persist_interval: float = 60, sync_interval: float = 5, history: int = 100):
+        self.notify = notify
+        self.cooldown = cooldown
+        self.state_path = state_path
+        self.persist_interval = persist_interval
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._states: Dict[Tuple[str, str], _RuleState] = {}
+        self._recent = deque(maxlen=history)
+        self._dirty = False
+        self._saved = time.monotonic()
+        self._synced = time.monotonic()
+        self._signature = None
+        self.evaluations = 0
+        self.set_rules(rules)
+        if state_path:
+            self._signature = self._state_signature()
+            self.load_state()
+
+    def set_rules(self, rules: Iterable[Rule]) -> None:
+        """Replace the rules; state of rules that keep their name is kept"""
+        by_metric: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            by_metric.setdefault(rule.metric, []).append(rule)
+        # Most severe first, so lower levels can defer to a firing one
+        for metric_rules in by_metric.values():
+            metric_rules.sort(key=lambda r: LEVELS.index(r.level), reverse=True)
+        with self._lock:
+            self._by_metric = by_metric
+            names = {rule.name for rules in by_metric.values() for rule in rules}
+            self._states = {key: state for key, state in self._states.items() if key[0] in names}
+
+    @property
+    def rules(self) -> List[Rule]:
+        return [rule for rules in self._by_metric.values() for rule in rules]
+
+    def evaluate(self, source: str, sample: Mapping[str, Any], ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate one sample of a source.
+
+        Args:
+            source (str): LOCAL or a fleet node name
+            sample (Mapping): Metric name to value, such as a metrics
+                sample, a history.sh record or a fleet node's metrics
+            ts (float, optional): Sample time, defaults to now
+
+        Returns:
+            List[Dict[str, Any]]: Alerts that fired or resolved
+        """
+        ts = time.time() if ts is None else ts
+        events = []
+        self._sync_state()
+        with self._lock:
+            for metric, raw in sample.items():
+                rules = self._by_metric.get(METRIC_ALIASES.get(metric, metric))
+                if not rules:
+                    continue
+                value = to_float(raw)
+                if value is None:
+                    continue
+                self.evaluations += 1
+                # Kinds with a more severe rule firing for this source
+                escalated = set()
+                for rule in rules:
+                    if not rule.applies_to(source):
+                        continue
+                    event = self._evaluate_rule(rule, source, ts, value, (rule.kind, rule.op) in escalated)
+                    if event:
+                        events.append(event)
+                    if self._states[(rule.name, source)].firing_since is not None:
+                        escalated.add((rule.kind, rule.op))
+        for event in events:
+            self._recent.append(event)
+            if self.notify and event['state'] == 'firing':
+                try:
+                    self.notify(event)
+                except Exception as e:
+                    logger.error(f"Alert notification failed: {e}")
+        self.persist()
+        return events
+
+    def _evaluate_rule(self, rule: Rule, source: str, ts: float, value: float,
+                       suppressed: bool) -> Optional[Dict[str, Any]]:
+        key = (rule.name, source)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _RuleState()
+
+        if rule.kind == 'rate':
+            if state.samples is None:
+                state.samples = deque()
+            samples = state.samples
+            samples.append((ts, value))
+            while len(samples) > 2 and samples[1][0] <= ts - rule.window:
+                samples.popleft()
+            first_ts, first_value = samples[0]
+            # Wait for most of a window before judging the trend
+            if ts - first_ts < rule.window / 2:
+                return None
+            measured = (value - first_value) * 60.0 / (ts - first_ts)
+        else:
+            measured = value
+        state.measured = measured
+
+        if not rule._compare(measured, rule.value):
+            state.pending_since = None
+            if state.firing_since is None:
+                return None
+            state.firing_since = None
+            self._dirty = True
+            return self._event(rule, source, ts, measured, 'resolved')
+
+        if state.pending_since is None:
+            state.pending_since = ts
+            self._dirty = True
+        if ts - state.pending_since < rule.duration:
+            return None
+
+        if state.firing_since is None:
+            state.firing_since = ts
+            self._dirty = True
+        cooldown = self.cooldown if rule.cooldown is None else rule.cooldown
+        if suppressed or (state.notified is not None and ts - state.notified < cooldown):
+            return None
+        state.notified = ts
+        self._dirty = True
+        return self._event(rule, source, ts, measured, 'firing')
+
+    def _event(self, rule: Rule, source: str, ts: float, measured: float, state: str) -> Dict[str, Any]:
+        message = rule.describe(source, measured)
+        return {
+            'rule': rule.name,
+            'source': source,
+            'metric': rule.metric,
+            'level': rule.level if state == 'firing' else 'info',
+            'state': state,
+            'value': round(measured, 3),
+            'threshold': rule.value,
+            'timestamp': ts,
+            'subject': f"{rule.level.capitalize()}: {rule.metric.replace('_', ' ').capitalize()}",
+            'message': message if state == 'firing' else f"Resolved: {message}"
+        }
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Alerts currently firing, most severe first"""
+        with self._lock:
+            rules = {rule.name: rule for rule in self.rules}
+            active = [{'rule': name, 'source': source, 'metric': rules[name].metric,
+                       'level': rules[name].level, 'since': state.firing_since,
+                       'value': state.measured, 'threshold': rules[name].value}
+                      for (name, source), state in self._states.items()
+                      if state.firing_since is not None and name in rules]
+        active.sort(key=lambda a: (-LEVELS.index(a['level']), a['since']))
+        return active
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Latest fired and resolved alerts, newest last"""
+        return list(self._recent)
+
+    def reset(self) -> None:
+        """Forget all rule state and cooldowns"""
+        with self._lock:
+            self._states = {}
+            self._recent.clear()
+            self._dirty = True
+            # Overwrite the file rather than merging its cooldowns back in
+            self._signature = self._state_signature()
+        self.persist(force=True)
+
+    def persist(self, force: bool = False) -> bool:
+        """
+        Write cooldowns and firing state if they changed and the persist
+        interval has passed (or `force` is set).
+
+        Returns:
+            bool: True if the state file was written
+        """
+        if not self.state_path or not self._dirty:
+            return False
+        if not force and time.monotonic() - self._saved < self.persist_interval:
+            return False
+        self._sync_state(force=True)
+        with self._lock:
+            state = {
+                'version': STATE_VERSION,
+                'saved': time.time(),
+                'rules': {f"{name}|{source}": {'pending_since': s.pending_since,
+                                               'firing_since': s.firing_since,
+                                               'notified': s.notified,
+                                               'measured': s.measured}
+                          for (name, source), s in self._states.items()
+                          if s.pending_since is not None or s.firing_since is not None or s.notified is not None}
+            }
+            self._dirty = False
+            self._saved = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+            self._signature = self._state_signature()
+            return True
+        except (IOError, OSError) as e:
+            logger.error(f"Error saving alert state: {e}")
+            self._dirty = True
+            return False
+
+    def _state_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.state_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _sync_state(self, force: bool = False) -> None:
+        """Pick up the state file if another process changed or removed it"""
+        if not self.state_path:
+            return
+        if not force and time.monotonic() - self._synced < self.sync_interval:
+            return
+        self._synced = time.monotonic()
+        signature = self._state_signature()
+        if signature == self._signature:
+            return
+        previous, self._signature = self._signature, signature
+        if signature is not None:
+            self.load_state()
+        elif previous is not None:
+            logger.info(f"Alert state {self.state_path} was removed, resetting cooldowns")
+            with self._lock:
+                self._states = {}
+                self._dirty = False
+
+    def load_state(self) -> None:
+        """
+        Restore rule state written by persist(), merging it into the
+        current state: a rule keeps the later of both notification times,
+        and its pending and firing state once this engine has seen it.
+        Cooldowns recorded by the shell implementation (cooldown.json next
+        to the state file, keyed `<metric>_<level>`) are imported for the
+        local node.
+        """
+        entries = {}
+        try:
+            with open(self.state_path, 'r') as f:
+                entries = json.load(f).get('rules', {})
+        except FileNotFoundError:
+            legacy = os.path.join(os.path.dirname(self.state_path), 'cooldown.json')
+            try:
+                with open(legacy, 'r') as f:
+                    entries = {f"{name}|{LOCAL}": {'notified': ts} for name, ts in json.load(f).items()}
+            except (IOError, OSError, ValueError, AttributeError):
+                pass
+        except (IOError, OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable alert state {self.state_path}: {e}")
+
+        with self._lock:
+            for key, data in entries.items():
+                name, _, source = key.partition('|')
+                if not source or not isinstance(data, Mapping):
+                    continue
+                state = self._states.get((name, source))
+                notified = to_float(data.get('notified'))
+                if state is None:
+                    state = _RuleState()
+                    state.pending_since = data.get('pending_since')
+                    state.firing_since = data.get('firing_since')
+                    state.notified = notified
+                    state.measured = data.get('measured')
+                    self._states[(name, source)] = state
+                elif notified is not None and (state.notified is None or notified > state.notified):
+                    state.notified = notified
+
+
+def latest_history_sample(directory: str) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Read the newest metrics_YYYYMMDD_HHMMSS.json file written by history.sh.
+
+    Returns:
+        Tuple[Optional[str], Dict[str, Any]]: File name and its contents
+    """
+    try:
+        names = [name for name in os.listdir(directory) if HISTORY_FILE_RE.match(name)]
+    except OSError:
+        return None, {}
+    if not names:
+        return None, {}
+    name = max(names)
+    try:
+        with open(os.path.join(directory, name), 'r') as f:
+            return name, json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        logger.debug(f"Unreadable history file {name}: {e}")
+        return name, {}
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import signal
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.metrics import MetricsEngine
+
+    parser = argparse.ArgumentParser(description='Pipe Network PoP alert engine')
+    parser.add_argument('--config', required=True, help='alerts.json')
+    parser.add_argument('--state', help='Rule state file (default: alert-state.json next to --config)')
+    parser.add_argument('--history-dir', help='history.sh directory, for reputation and scores')
+    parser.add_argument('--nodes-db', help='Fleet node registry, to alert on fleet node metrics')
+    parser.add_argument('--node-port', type=int, action='append', default=[],
+                        help='Node port counted for peers')
+    sub = parser.add_subparsers(dest='command')
+    p_daemon = sub.add_parser('daemon', help='Sample and evaluate continuously')
+    p_daemon.add_argument('--interval', type=float,
+                          help='Seconds between samples (default: sample_interval_seconds or 15)')
+    sub.add_parser('check', help='Evaluate one sample')
+    sub.add_parser('rules', help='Print the effective rules')
+    sub.add_parser('active', help='Print firing alerts')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    config = load_alerts_config(args.config)
+    try:
+        rules = rules_from_config(config)
+    except ValueError as e:
+        print(f"Invalid alert rule: {e}", file=sys.stderr)
+        return 1
+
+    if args.command == 'rules':
+        for rule in rules:
+            print(json.dumps(rule.to_dict()))
+        return 0
+
+    from utils.notify import deliver_queued, dispatcher_from_config
+    alerts_dir = os.path.dirname(os.path.abspath(args.config))
+    dispatcher = dispatcher_from_config(config, alerts_dir)
+
+    engine = AlertEngine(
+        rules,
+        notify=dispatcher.enqueue,
+        cooldown=float(config.get('alert_cooldown_hours', DEFAULT_COOLDOWN_HOURS)) * 3600,
+        state_path=args.state or os.path.join(alerts_dir, 'alert-state.json'),
+        persist_interval=float(config.get('state_persist_seconds', 60))
+    )
+
+    if args.command == 'active':
+        for alert in engine.active():
+            print(json.dumps(alert))
+        return 0
+
+    if config.get('enabled') is False:
+        print("Alerts are disabled", file=sys.stderr)
+        return 0
+
+    metrics_engine = MetricsEngine(node_ports=args.node_port or [8003])
+    registry = None
+    if args.nodes_db and os.path.exists(args.nodes_db):
+        from utils.fleet_registry import NodeRegistry
+        registry = NodeRegistry(args.nodes_db)
+    fleet_revision = [None]
+    last_history = [None]
+
+    def sample_all():
+        engine.evaluate(LOCAL, metrics_engine.sample())
+        if args.history_dir:
+            name, data = latest_history_sample(args.history_dir)
+            if name and name != last_history[0]:
+                last_history[0] = name
+                engine.evaluate(LOCAL, {k: v for k, v in data.items() if k in LOW_METRICS})
+        if registry is not None:
+            revision, _ = registry.revisions()
+            if revision != fleet_revision[0]:
+                records = registry.list() if fleet_revision[0] is None else registry.changed_since(fleet_revision[0])
+                for record in records:
+                    if record.get('metrics'):
+                        engine.evaluate(record['name'], record['metrics'])
+                fleet_revision[0] = revision
+
+    if args.command == 'check':
+        # CPU usage is measured between two samples
+        metrics_engine.sample()
+        time.sleep(1)
+        sample_all()
+        engine.persist(force=True)
+        deliver_queued(dispatcher, args.config)
+        return 0
+
+    if args.command != 'daemon':
+        parser.print_help()
+        return 1
+
+    interval = args.interval or float(config.get('sample_interval_seconds', 15))
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    logger.info(f"Alert engine evaluating {len(rules)} rules every {interval:g}s")
+    metrics_engine.sample()
+    # Alerts are queued by the engine and delivered by the dispatcher's threads
+    dispatcher.start()
+    try:
+        while not stop.wait(interval):
+            sample_all()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.persist(force=True)
+        dispatcher.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,8 @@ Browser detection and launching utility for Pipe Network PoP Web UI
 
 import os
 import sys
+import json
+import shutil
 import subprocess
 import logging
 import socket
@@ -14,14 +16,16 @@ from threading import Thread
 
 logger = logging.getLogger(__name__)
 
-def detect_browser():
-    """
-    Detect available browsers on the system
-    Returns the command to launch a browser, or None if no browser is found
-    """
-    # Common browser commands by platform
+# Result of the last detection, checked against PATH and the command on disk
+BROWSER_CACHE = os.path.expanduser("~/.cache/pipe-pop/browser.json")
+
+# Seconds before a "no browser found" result is checked again
+NEGATIVE_CACHE_TTL = 3600
+
+def _browser_candidates():
+    """Browser commands to try, in order of preference, for this platform"""
     browsers = []
-    
+
     if sys.platform.startswith('darwin'):  # macOS
         browsers = [
             ('open', ['-a', 'Safari']),
@@ -59,27 +63,63 @@ def detect_browser():
         ('python3', ['-m', 'webbrowser'])
     ])
     
-    for browser_cmd, args in browsers:
-        try:
-            # Check if the browser command exists
-            if os.path.isfile(browser_cmd):
-                return (browser_cmd, args)
-            else:
-                # Try to find the command in PATH
-                which_cmd = 'where' if sys.platform.startswith('win') else 'which'
-                result = subprocess.run(
-                    [which_cmd, browser_cmd],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True,
-                    shell=(sys.platform.startswith('win'))
-                )
-                if result.returncode == 0:
-                    return (browser_cmd, args)
-        except:
-            continue
-    
-    return None
+    return browsers
+
+def _resolve(browser_cmd):
+    """Path of a browser command, or None if it is not installed"""
+    if browser_cmd == 'start' and sys.platform.startswith('win'):
+        return browser_cmd  # cmd.exe builtin
+    if os.path.isfile(browser_cmd):
+        return browser_cmd
+    return shutil.which(browser_cmd)
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_cache(cache_path, entry):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not save browser cache: {e}")
+
+def detect_browser(cache_path=BROWSER_CACHE, refresh=False):
+    """
+    Detect available browsers on the system
+    Returns the command to launch a browser, or None if no browser is found
+
+    The result is kept in `cache_path` and reused while PATH is unchanged
+    and the detected command still exists, so repeated launches skip the
+    PATH search. Pass refresh=True to search again.
+    """
+    key = {'platform': sys.platform, 'path': os.environ.get('PATH', '')}
+
+    cached = None if refresh or not cache_path else _load_cache(cache_path)
+    if cached and cached.get('key') == key:
+        browser = cached.get('browser')
+        if browser is None:
+            if time.time() - cached.get('checked', 0) < NEGATIVE_CACHE_TTL:
+                return None
+        elif browser['path'] == 'start' or os.access(browser['path'], os.X_OK):
+            return (browser['command'], list(browser['args']))
+
+    found = None
+    for browser_cmd, args in _browser_candidates():
+        path = _resolve(browser_cmd)
+        if path:
+            found = {'command': browser_cmd, 'args': args, 'path': path}
+            break
+
+    if cache_path:
+        _save_cache(cache_path, {'key': key, 'browser': found, 'checked': time.time()})
+    return (found['command'], list(found['args'])) if found else None
 
 def launch_browser(url):
     """
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command execution for Pipe Network PoP Web UI.
+Runs external commands on a bounded worker pool with timeouts, coalesces
+identical commands that are already in flight, and tracks long-running
+operations as jobs that clients can poll or stream.
+"""
+
+import os
+import time
+import uuid
+import signal
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Command = Union[str, List[str]]
+
+# Commands taking longer than this are logged at INFO, others at DEBUG
+SLOW_COMMAND_SECONDS = 5
+
+
+def _normalize(command: Command, shell: bool) -> Command:
+    if not shell and isinstance(command, str):
+        return command.split()
+    return command
+
+
+def _key(command: Command, shell: bool) -> tuple:
+    return (shell, command if isinstance(command, str) else tuple(command))
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Kill a process started with start_new_session, and everything it spawned"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        # No process groups on this platform, or the group has already exited
+        process.kill()
+
+
+def execute(command: Command, shell: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Execute a command and return its result.
+
+    Args:
+        command (str or list): Command line, split on whitespace unless `shell`
+        shell (bool): Run through the shell
+        timeout (float, optional): Seconds before the process and any
+            children it started are killed
+
+    Returns:
+        Dict[str, Any]: success, stdout, stderr, returncode and duration
+        (seconds), plus error when the command could not be run and
+        timed_out when it was killed
+    """
+    command = _normalize(command, shell)
+    started = time.perf_counter()
+    try:
+        logger.debug(f"Running command: {command}")
+        # A session of its own, so a timeout can kill children that would
+        # otherwise hold the output pipes open
+        process = subprocess.Popen(
+            command,
+            shell=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            start_new_session=True
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            stdout, _ = process.communicate()
+            logger.error(f"Command timed out after {timeout}s: {command}")
+            outcome = {
+                'success': False,
+                'error': f"Timed out after {timeout}s",
+                'timed_out': True,
+                'stdout': stdout or '',
+                'stderr': f"Timed out after {timeout}s",
+                'returncode': -1
+            }
+        else:
+            outcome = {
+                'success': process.returncode == 0,
+                'stdout': stdout,
+                'stderr': stderr,
+                'returncode': process.returncode
+            }
+            elapsed = time.perf_counter() - started
+            # Routine polling such as `pop status` would otherwise log every few seconds
+            level = logging.INFO if process.returncode != 0 or elapsed >= SLOW_COMMAND_SECONDS else logging.DEBUG
+            logger.log(level, f"Command finished in {elapsed:.3f}s (exit {process.returncode}): {command}")
+    except Exception as e:
+        logger.error(f"Command execution error: {e}")
+        outcome = {
+            'success': False,
+            'error': str(e),
+            'stdout': '',
+            'stderr': str(e),
+            'returncode': -1
+        }
+    outcome['duration'] = round(time.perf_counter() - started, 6)
+    return outcome
+
+
+class Job:
+    """A long-running command whose output is collected as it is produced"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __init__(self, name: str, command: Command, shell: bool, timeout: Optional[float]):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.command = command
+        self.shell = shell
+        self.timeout = timeout
+        self.state = Job.QUEUED
+        self.output = []
+        self.returncode = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in (Job.SUCCEEDED, Job.FAILED)
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        """
+        Serialize the job.
+
+        Args:
+            since (int): Only include output lines from this index on
+
+        Returns:
+            Dict[str, Any]: Job state and output
+        """
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'done': self.done,
+            'success': self.state == Job.SUCCEEDED,
+            'returncode': self.returncode,
+            'error': self.error,
+            'output': self.output[since:],
+            'output_offset': since,
+            'output_count': len(self.output),
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished
+        }
+
+
+class CommandRunner:
+    """
+    Bounded, deduplicating command executor.
+
+    Short commands go through run(), which blocks the caller but shares a
+    single execution between concurrent identical calls. Long operations go
+    through start_job(), which returns immediately with a Job handle.
+    """
+
+    def __init__(self, max_workers: int = 4, max_jobs: int = 2,
+                 default_timeout: float = 30, job_timeout: float = 300,
+                 job_history: int = 50,
+                 on_job_update: Optional[Callable[[Job], None]] = None):
+        self.default_timeout = default_timeout
+        self.job_timeout = job_timeout
+        self.job_history = job_history
+        self.on_job_update = on_job_update
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipe-ui-cmd')
+        self._job_pool = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='pipe-ui-job')
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._jobs = OrderedDict()
+        self._closed = False
+        self.stats = {
+            'executed': 0,
+            'coalesced': 0,
+            'timeouts': 0
+        }
+
+    def submit(self, command: Command, shell: bool = False,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Schedule a command, joining an identical one if it is already running.
+
+        Returns:
+            Future: Resolves to the result dictionary from execute()
+        """
+        key = _key(_normalize(command, shell), shell)
+        timeout = self.default_timeout if timeout is None else timeout
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+
+            if self._closed:
+                # Requests still finishing during shutdown get an error result
+                future = Future()
+                future.set_result({
+                    'success': False,
+                    'error': 'Shutting down',
+                    'stdout': '',
+                    'stderr': 'Shutting down',
+                    'returncode': -1,
+                    'duration': 0.0
+                })
+                return future
+
+            future = self._pool.submit(self._execute, key, command, shell, timeout)
+            self._inflight[key] = future
+            return future
+
+    def _execute(self, key: tuple, command: Command, shell: bool, timeout: float) -> Dict[str, Any]:
+        result = None
+        try:
+            result = execute(command, shell=shell, timeout=timeout)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if result is not None:
+                    self.stats['executed'] += 1
+                    if result.get('timed_out'):
+                        self.stats['timeouts'] += 1
+
+    def run(self, command: Command, shell: bool = False,
+            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a command and wait for its result"""
+        return self.submit(command, shell, timeout).result()
+
+    def start_job(self, name: str, command: Command, shell: bool = False,
+                  timeout: Optional[float] = None) -> Job:
+        """
+        Start a long-running command in the background.
+
+        If an unfinished job with the same command exists, that job is
+        returned instead of starting another one.
+
+        Returns:
+            Job: Handle for polling progress
+        """
+        command = _normalize(command, shell)
+        timeout = self.job_timeout if timeout is None else timeout
+
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.done and job.command == command and job.shell == shell:
+                    return job
+
+            job = Job(name, command, shell, timeout)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.job_history:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.done:
+                    break
+                del self._jobs[oldest_id]
+
+        self._notify(job)
+        self._job_pool.submit(self._run_job, job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id"""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """All retained jobs, oldest first"""
+        return list(self._jobs.values())
+
+    def _notify(self, job: Job):
+        if self.on_job_update:
+            try:
+                self.on_job_update(job)
+            except Exception as e:
+                logger.error(f"Job update callback failed: {e}")
+
+    def _run_job(self, job: Job):
+        job.state = Job.RUNNING
+        job.started = time.time()
+        self._notify(job)
+        logger.info(f"Starting job {job.id} ({job.name}): {job.command}")
+
+        try:
+            process = subprocess.Popen(
+                job.command,
+                shell=job.shell,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                start_new_session=True
+            )
+        except Exception as e:
+            logger.error(f"Job {job.id} failed to start: {e}")
+            job.error = str(e)
+            job.returncode = -1
+            self._finish(job)
+            return
+
+        # Kill the process group if it outlives its deadline
+        timer = threading.Timer(job.timeout, self._timeout_job, (job, process))
+        timer.daemon = True
+        timer.start()
+
+        try:
+            for line in process.stdout:
+                job.output.append(line.rstrip('\n'))
+                self._notify(job)
+            job.returncode = process.wait()
+        finally:
+            timer.cancel()
+
+        self._finish(job)
+
+    def _timeout_job(self, job: Job, process: subprocess.Popen):
+        logger.error(f"Job {job.id} timed out after {job.timeout}s")
+        job.error = f"Timed out after {job.timeout}s"
+        with self._lock:
+            self.stats['timeouts'] += 1
+        _kill_group(process)
+
+    def _finish(self, job: Job):
+        job.finished = time.time()
+        job.state = Job.SUCCEEDED if job.returncode == 0 and not job.error else Job.FAILED
+        logger.info(f"Job {job.id} ({job.name}) {job.state}")
+        self._notify(job)
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work; later commands fail without being run"""
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=wait)
+        self._job_pool.shutdown(wait=wait)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration store for Pipe Network PoP Web UI.
+Keeps a validated, read-only copy of ui-config.json in memory, reloads it
+when the file changes (inotify where available, mtime polling otherwise)
+and writes updates back atomically, coalescing updates that arrive close
+together into a single write. Readers never take a lock: every change
+builds a new mapping and swaps it in with one assignment.
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import struct
+import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+Check = Callable[[Any], Optional[str]]
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration fails validation"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _type_error(key: str, value: Any, default: Any) -> Optional[str]:
+    if default is None:
+        return None
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, (int, float)):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if ok and isinstance(default, int) and not isinstance(value, int):
+            ok = float(value).is_integer()
+    elif isinstance(default, str):
+        ok = isinstance(value, str)
+    elif isinstance(default, list):
+        ok = isinstance(value, list)
+    elif isinstance(default, dict):
+        ok = isinstance(value, dict)
+    else:
+        ok = True
+    return None if ok else f"{key}: expected {type(default).__name__}, got {type(value).__name__}"
+
+
+def validate(raw: Mapping[str, Any], defaults: Mapping[str, Any],
+             checks: Optional[Mapping[str, Check]] = None) -> Dict[str, Any]:
+    """
+    Merge `raw` over `defaults` and check the result.
+
+    Values must have the type of their default (ints may stand in for
+    floats, None defaults accept anything), and `checks[key](value)` may
+    return an error message for other constraints. Unknown keys are kept.
+
+    Raises:
+        ConfigError: Listing every invalid value
+    """
+    if not isinstance(raw, Mapping):
+        raise ConfigError(['configuration must be a JSON object'])
+    config = dict(defaults)
+    config.update(raw)
+    errors = []
+    for key, value in raw.items():
+        if key in defaults:
+            error = _type_error(key, value, defaults[key])
+            if error:
+                errors.append(error)
+                continue
+            if isinstance(defaults[key], dict) and isinstance(value, dict):
+                config[key] = dict(defaults[key], **value)
+        if checks and key in checks:
+            error = checks[key](value)
+            if error:
+                errors.append(f"{key}: {error}")
+    if errors:
+        raise ConfigError(errors)
+    return config
+
+
+def _freeze(config: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(config)
+
+
+class _Inotify:
+    """Minimal inotify binding over libc, watching one directory"""
+
+    def __init__(self, directory: str):
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> Set[str]:
+        """Names of directory entries changed within `timeout` seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set()
+        names, offset = set(), 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigStore:
+    """
+    Validated in-memory configuration backed by a JSON file.
+
+    `current` is a read-only mapping that is replaced, never modified, so
+    request handlers can read it without locking. Listeners registered
+    with add_listener() are called as `func(previous, current, changed)`
+    after every swap, from the thread that caused it.
+    """
+
+    def __init__(self, path: str, defaults: Mapping[str, Any],
+                 checks: Optional[Mapping[str, Check]] = None,
+                 create: Optional[Callable[[], Dict[str, Any]]] = None,
+                 poll_interval: float = 1.0, write_delay: float = 0.2):
+        """
+        Args:
+            path: Configuration file
+            defaults: Values used for keys missing from the file
+            checks: Per-key validators, see validate()
+            create: Returns the contents to write when the file is missing
+            poll_interval: Seconds between mtime checks when inotify is unavailable
+            write_delay: Seconds to wait for more updates before writing the file
+        """
+        self.path = os.path.abspath(path)
+        self.defaults = dict(defaults)
+        self.checks = dict(checks or {})
+        self.create = create
+        self.poll_interval = poll_interval
+        self.write_delay = write_delay
+        self.current: Mapping[str, Any] = _freeze(dict(self.defaults))
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self.writes = 0
+        self._raw: Dict[str, Any] = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._written = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self.watch_mode = None
+
+    def add_listener(self, func: Callable[[Mapping[str, Any], Mapping[str, Any], Set[str]], None]) -> None:
+        self._listeners.append(func)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.current.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.current[key]
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _swap(self, raw: Dict[str, Any], config: Dict[str, Any]) -> None:
+        previous = self.current
+        self._raw = raw
+        self.current = _freeze(config)
+        changed = {key for key in set(previous) | set(config) if previous.get(key) != config.get(key)}
+        if not changed:
+            return
+        for listener in self._listeners:
+            try:
+                listener(previous, self.current, changed)
+            except Exception as e:
+                logger.error(f"Config listener failed: {e}")
+
+    def load(self) -> Mapping[str, Any]:
+        """
+        Read and validate the file, creating it if missing.
+
+        An unreadable or invalid file leaves the current configuration in
+        place and is reported in `last_error`.
+
+        Returns:
+            Mapping[str, Any]: The current configuration
+        """
+        with self._lock:
+            if not os.path.exists(self.path) and self.create:
+                raw = self.create()
+                self._write_file(raw)
+            try:
+                with open(self.path) as f:
+                    raw = json.load(f)
+                config = validate(raw, self.defaults, self.checks)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                logger.error(f"Keeping previous configuration, {self.path} is invalid: {e}")
+                return self.current
+            # Updates not yet written win over what is on disk
+            raw.update(self._pending)
+            config.update(self._pending)
+            self._written = self._signature()
+            self.last_error = None
+            self.reloads += 1
+            self._swap(raw, config)
+            return self.current
+
+    def update(self, changes: Mapping[str, Any]) -> Mapping[str, Any]:
+        """
+        Validate and apply `changes`, and schedule the file to be written.
+
+        The new configuration is visible to readers immediately. Updates
+        made within `write_delay` of each other are written together.
+
+        Raises:
+            ConfigError: If the merged configuration is invalid
+
+        Returns:
+            Mapping[str, Any]: The new configuration
+        """
+        with self._lock:
+            raw = dict(self._raw, **changes)
+            config = validate(raw, self.defaults, self.checks)
+            self._pending.update(changes)
+            self._swap(raw, config)
+        self._dirty.set()
+        if not self._threads:
+            self.flush()
+        return self.current
+
+    def flush(self) -> bool:
+        """Write pending updates now. Returns True if the file was written"""
+        with self._lock:
+            if not self._pending:
+                return False
+            raw = dict(self._raw)
+            self._pending = {}
+            self._dirty.clear()
+            try:
+                self._write_file(raw)
+            except OSError as e:
+                self.last_error = str(e)
+                logger.error(f"Error writing {self.path}: {e}")
+                return False
+            self._written = self._signature()
+            return True
+
+    def _write_file(self, raw: Mapping[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(raw, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.writes += 1
+
+    def start(self) -> None:
+        """Start watching the file and writing batched updates in the background"""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._watch, name='pipe-ui-config-watch', daemon=True),
+            threading.Thread(target=self._write_loop, name='pipe-ui-config-write', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the background threads and write any pending updates"""
+        self._stop.set()
+        self._dirty.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.flush()
+
+    def _write_loop(self) -> None:
+        while not self._stop.is_set():
+            self._dirty.wait()
+            if self._stop.wait(self.write_delay):
+                return
+            self.flush()
+
+    def _changed_on_disk(self) -> bool:
+        signature = self._signature()
+        return signature is not None and signature != self._written
+
+    def _watch(self) -> None:
+        directory = os.path.dirname(self.path)
+        name = os.path.basename(self.path)
+        watcher = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            watcher = _Inotify(directory)
+            self.watch_mode = 'inotify'
+        except OSError as e:
+            logger.info(f"Watching {self.path} by polling every {self.poll_interval:g}s ({e})")
+            self.watch_mode = 'poll'
+
+        try:
+            while not self._stop.is_set():
+                if watcher:
+                    if name not in watcher.read(1.0):
+                        continue
+                    # Let writers that truncate and rewrite in place finish
+                    time.sleep(0.05)
+                elif self._stop.wait(self.poll_interval):
+                    return
+                if self._changed_on_disk():
+                    self.load()
+        finally:
+            if watcher:
+                watcher.close()
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description='Validate a Pipe Network PoP Web UI config file')
+    parser.add_argument('path', nargs='?', default=os.path.expanduser('~/.local/share/pipe-pop/ui-config.json'))
+    args = parser.parse_args(argv)
+
+    from app import CONFIG_CHECKS, DEFAULT_CONFIG
+    try:
+        with open(args.path) as f:
+            validate(json.load(f), DEFAULT_CONFIG, CONFIG_CHECKS)
+    except (OSError, ValueError) as e:
+        errors = e.errors if isinstance(e, ConfigError) else [str(e)]
+        for error in errors:
+            print(f"{args.path}: {error}", file=sys.stderr)
+        return 1
+    print(f"{args.path}: OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
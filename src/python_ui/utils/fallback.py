@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fallback server for Pipe Network PoP Web UI.
+Serves a static page with Flask installation instructions when app.py is
+started with --fallback and Flask cannot be imported. Kept out of app.py so
+the http.server imports are only paid for on this path.
+"""
+
+import os
+import sys
+import logging
+import http.server
+import socketserver
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+
+
+class FallbackHTTPServer(socketserver.ThreadingTCPServer):
+    """Thread-per-connection server so one slow client cannot block others"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FallbackHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=STATIC_DIR, **kwargs)
+
+    def do_GET(self):
+        if self.path == '/' or self.path == '':
+            self.path = '/fallback.html'
+        return super().do_GET()
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+
+def create_fallback_page(host: str, port: int) -> None:
+    """Write static/fallback.html, unless it is already up to date"""
+    os.makedirs(STATIC_DIR, exist_ok=True)
+
+    fallback_html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Pipe Network PoP UI - Installation Required</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; color: #333; }}
+        .container {{ max-width: 800px; margin: 0 auto; background: #f9f9f9; padding: 20px; border-radius: 5px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+        h1 {{ color: #e74c3c; }}
+        h2 {{ color: #3498db; }}
+        pre {{ background: #f1f1f1; padding: 10px; border-radius: 3px; overflow-x: auto; }}
+        .btn {{ display: inline-block; background: #3498db; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; margin-top: 20px; }}
+        .btn:hover {{ background: #2980b9; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Pipe Network PoP UI - Flask Installation Required</h1>
+        
+        <p>The Pipe Network PoP UI requires Flask to run properly. This is a fallback page shown because Flask is not currently installed.</p>
+        
+        <h2>Installation Options:</h2>
+        <ol>
+            <li>
+                <strong>System package (recommended):</strong>
+                <pre>sudo apt-get update && sudo apt-get install -y python3-flask</pre>
+            </li>
+            <li>
+                <strong>Using pip:</strong>
+                <pre>python3 -m pip install flask</pre>
+            </li>
+            <li>
+                <strong>Using the provided installer:</strong>
+                <pre>tools/pop-ui-python install</pre>
+            </li>
+        </ol>
+        
+        <h2>After Installing:</h2>
+        <p>After installing Flask, restart the UI server:</p>
+        <pre>tools/pop-ui-python stop
+tools/pop-ui-python start</pre>
+        
+        <p>Python version: {sys.version}</p>
+        <p>Server running on: http://{host}:{port}/</p>
+        
+        <a href="/" class="btn">Refresh after installation</a>
+    </div>
+</body>
+</html>
+"""
+
+    path = os.path.join(STATIC_DIR, 'fallback.html')
+    try:
+        with open(path) as f:
+            if f.read() == fallback_html:
+                return
+    except OSError:
+        pass
+    with open(path, 'w') as f:
+        f.write(fallback_html)
+
+
+def run_fallback_server(host: str, port: int, on_ready=None) -> None:
+    """
+    Serve the fallback page until the process is killed.
+
+    Args:
+        host: Address to bind to
+        port: Port to listen on
+        on_ready: Called with the server URL once the socket is listening
+    """
+    create_fallback_page(host, port)
+
+    try:
+        httpd = FallbackHTTPServer((host, port), FallbackHTTPRequestHandler)
+    except OSError as e:
+        logger.error(f"Error in fallback server: {e}")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    url = f"http://{host}:{port}/"
+    logger.info(f"Fallback server running at {url}")
+    print(f"Fallback server running at {url}")
+    print("Install Flask to enable full UI functionality")
+    if on_ready:
+        on_ready(url)
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
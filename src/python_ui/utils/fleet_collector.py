@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet metrics collector for Pipe Network PoP.
+Collects `pop --pulse --export json` from every registered node over SSH
+on a bounded worker pool, with a deadline per node and jittered start
+times, and merges the results into the fleet metrics store.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REMOTE_COMMAND = "~/tools/pop --pulse --export json"
+
+# ssh exits with 255 when the connection itself fails
+SSH_CONNECTION_FAILED = 255
+
+# (returncode, stdout, stderr) of a remote command
+RunResult = Tuple[int, str, str]
+
+CANCELLED = 'Cancelled'
+
+
+def is_registry(path: str) -> bool:
+    """True if `path` is an SQLite node registry rather than nodes.json"""
+    return path.endswith('.db')
+
+
+def load_nodes(path: str) -> List[Dict[str, Any]]:
+    """
+    Read registered nodes from a node registry or a nodes.json database.
+
+    Returns:
+        List[Dict[str, Any]]: Node records, empty if the file is missing
+    """
+    if is_registry(path):
+        from utils.fleet_registry import NodeRegistry
+        if not os.path.exists(path):
+            logger.warning(f"Node registry {path} does not exist")
+            return []
+        return NodeRegistry(path).list()
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('nodes', [])
+    except (IOError, OSError, ValueError) as e:
+        logger.warning(f"Cannot read node database {path}: {e}")
+        return []
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to a temporary file and rename it over `path`"""
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class SSHRunner:
+    """Runs a command on a node with one ssh invocation"""
+
+    def __init__(self, key_file: Optional[str] = None, ssh_binary: str = 'ssh',
+                 connect_timeout: float = 5):
+        self.key_file = key_file
+        self.ssh_binary = ssh_binary
+        self.connect_timeout = connect_timeout
+
+    def command(self, node: Dict[str, Any], remote_command: str) -> List[str]:
+        """Build the ssh argument list for a node"""
+        args = [self.ssh_binary]
+        if self.key_file:
+            args += ['-i', self.key_file]
+        args += [
+            '-p', str(node.get('port') or 22),
+            '-o', f"ConnectTimeout={int(self.connect_timeout)}",
+            '-o', 'BatchMode=yes',
+            f"{node['username']}@{node['ip']}",
+            remote_command
+        ]
+        return args
+
+    def __call__(self, node: Dict[str, Any], remote_command: str, timeout: float) -> RunResult:
+        try:
+            result = subprocess.run(
+                self.command(node, remote_command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                timeout=timeout
+            )
+            return result.returncode, result.stdout, result.stderr
+        except subprocess.TimeoutExpired:
+            return -1, '', f"Timed out after {timeout}s"
+        except OSError as e:
+            return -1, '', str(e)
+
+
+class NodeResult:
+    """Outcome of collecting from one node"""
+
+    def __init__(self, name: str, ok: bool, latency: float, metrics: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None, reachable: bool = True):
+        self.name = name
+        self.ok = ok
+        self.latency = latency
+        self.metrics = metrics
+        self.error = error
+        self.reachable = reachable
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'ok': self.ok,
+            'reachable': self.reachable,
+            'latency_ms': round(self.latency * 1000, 1),
+            'error': self.error
+        }
+
+
+class FleetCollector:
+    """
+    Bounded, parallel metrics collection across the fleet.
+
+    Each round runs at most `concurrency` collections at once. The first
+    wave of starts is spread randomly over `spread` seconds so a round does
+    not open every connection in the same instant, and each node gets at
+    most `node_timeout` seconds.
+    """
+
+    def __init__(self, nodes_db: str, metrics_dir: str, data_dir: Optional[str] = None,
+                 runner: Optional[Callable[[Dict[str, Any], str, float], RunResult]] = None,
+                 concurrency: int = 16, node_timeout: float = 20, spread: float = 2.0,
+                 remote_command: str = REMOTE_COMMAND,
+                 on_result: Optional[Callable[[NodeResult], None]] = None):
+        self.nodes_db = nodes_db
+        self.metrics_dir = metrics_dir
+        self.data_dir = data_dir or os.path.dirname(metrics_dir)
+        self.runner = runner or SSHRunner()
+        self.concurrency = max(1, concurrency)
+        self.node_timeout = node_timeout
+        self.spread = spread
+        self.remote_command = remote_command
+        self.on_result = on_result
+        self._stop = threading.Event()
+
+    def collect_node(self, node: Dict[str, Any], delay: float = 0.0) -> NodeResult:
+        """Collect metrics from one node and save them"""
+        if delay and self._stop.wait(delay):
+            return NodeResult(node['name'], False, 0.0, error=CANCELLED, reachable=False)
+
+        started = time.perf_counter()
+        returncode, stdout, stderr = self.runner(node, self.remote_command, self.node_timeout)
+        latency = time.perf_counter() - started
+
+        if returncode != 0:
+            error = (stderr.strip().splitlines() or [f"Exit code {returncode}"])[-1]
+            reachable = returncode not in (SSH_CONNECTION_FAILED, -1)
+            return NodeResult(node['name'], False, latency, error=error, reachable=reachable)
+
+        try:
+            metrics = json.loads(stdout)
+        except ValueError:
+            return NodeResult(node['name'], False, latency, error='Invalid metrics output')
+
+        self._save_metrics(node['name'], metrics)
+        return NodeResult(node['name'], True, latency, metrics=metrics)
+
+    def _save_metrics(self, name: str, metrics: Dict[str, Any]) -> None:
+        node_dir = os.path.join(self.metrics_dir, name)
+        os.makedirs(node_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        write_json_atomic(os.path.join(node_dir, f"metrics_{timestamp}.json"), metrics)
+
+    def collect(self, names: Optional[Iterable[str]] = None) -> List[NodeResult]:
+        """
+        Run one collection round.
+
+        Args:
+            names (Iterable[str], optional): Only collect from these nodes
+
+        Returns:
+            List[NodeResult]: One result per node, in registry order
+        """
+        nodes = load_nodes(self.nodes_db)
+        if names is not None:
+            wanted = set(names)
+            nodes = [n for n in nodes if n.get('name') in wanted]
+        if not nodes:
+            return []
+
+        round_started = time.time()
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(nodes)),
+                                thread_name_prefix='fleet-collect') as pool:
+            # Only the first wave is staggered; later nodes start as workers free up
+            futures = [pool.submit(self._collect_safely, node,
+                                   random.uniform(0, self.spread) if i < self.concurrency else 0.0)
+                       for i, node in enumerate(nodes)]
+            results = [f.result() for f in futures]
+
+        self._merge(results, round_started)
+        return results
+
+    def _collect_safely(self, node: Dict[str, Any], delay: float) -> NodeResult:
+        try:
+            result = self.collect_node(node, delay)
+        except Exception as e:
+            logger.error(f"Collection from {node.get('name')} failed: {e}")
+            result = NodeResult(node.get('name', '?'), False, 0.0, error=str(e))
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+    def _merge(self, results: List[NodeResult], round_started: float) -> None:
+        """Record a round: one node database write and a collection report"""
+        now = datetime.now()
+        seen = now.strftime('%Y-%m-%d %H:%M:%S')
+
+        if is_registry(self.nodes_db):
+            self._merge_registry(results, now)
+        else:
+            self._merge_json(results, now)
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(os.path.join(self.data_dir, 'last_collection.txt'), 'w') as f:
+            f.write(seen + '\n')
+        write_json_atomic(os.path.join(self.data_dir, 'last_collection.json'), {
+            'started': round_started,
+            'duration': round(time.time() - round_started, 3),
+            'nodes': [r.to_dict() for r in results]
+        })
+
+    def _merge_registry(self, results: List[NodeResult], now: datetime) -> None:
+        """Apply a round's statuses to the node registry in one transaction"""
+        from utils.fleet_registry import NodeRegistry
+
+        seen = now.strftime('%Y-%m-%d %H:%M:%S')
+        updates = []
+        for result in results:
+            if result.error == CANCELLED:
+                continue
+            update = {'name': result.name, 'status': 'online' if result.ok else 'offline'}
+            if result.ok:
+                update['last_seen'] = seen
+                update['last_metrics'] = now.strftime('%Y%m%d_%H%M%S')
+                update['metrics'] = result.metrics
+            updates.append(update)
+        try:
+            registry = NodeRegistry(self.nodes_db)
+            registry.update_statuses(updates)
+            registry.close()
+        except Exception as e:
+            logger.error(f"Cannot update node registry {self.nodes_db}: {e}")
+
+    def _merge_json(self, results: List[NodeResult], now: datetime) -> None:
+        """Apply a round's statuses to nodes.json with one atomic rewrite"""
+        seen = now.strftime('%Y-%m-%d %H:%M:%S')
+        by_name = {r.name: r for r in results}
+        try:
+            with open(self.nodes_db, 'r') as f:
+                db = json.load(f)
+            for node in db.get('nodes', []):
+                result = by_name.get(node.get('name'))
+                if result is None or result.error == CANCELLED:
+                    continue
+                node['status'] = 'online' if result.ok else 'offline'
+                if result.ok:
+                    node['last_seen'] = seen
+                    node['last_metrics'] = now.strftime('%Y%m%d_%H%M%S')
+            write_json_atomic(self.nodes_db, db)
+        except (IOError, OSError, ValueError) as e:
+            logger.error(f"Cannot update node database {self.nodes_db}: {e}")
+
+    def run(self, interval: float, jitter: float = 0.1, rounds: Optional[int] = None) -> None:
+        """
+        Collect every `interval` seconds until stop() is called.
+
+        Args:
+            interval (float): Seconds between round starts
+            jitter (float): Random fraction of the interval added or removed
+                per round so collectors on several hosts drift apart
+            rounds (int, optional): Stop after this many rounds
+        """
+        count = 0
+        while not self._stop.is_set():
+            started = time.time()
+            results = self.collect()
+            ok = sum(1 for r in results if r.ok)
+            logger.info(f"Collected {ok}/{len(results)} nodes in {time.time() - started:.1f}s")
+            count += 1
+            # Let a connection pool close masters of nodes no longer polled
+            if hasattr(self.runner, 'evict_idle'):
+                self.runner.evict_idle(load_nodes(self.nodes_db))
+            if rounds is not None and count >= rounds:
+                break
+            wait = interval * (1 + random.uniform(-jitter, jitter)) - (time.time() - started)
+            self._stop.wait(max(0.0, wait))
+
+    def stop(self) -> None:
+        """Stop run() and cancel nodes still waiting for their start"""
+        self._stop.set()
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import signal
+
+    parser = argparse.ArgumentParser(description='Collect metrics from Pipe Network PoP fleet nodes')
+    parser.add_argument('--nodes-db', required=True, help='Node registry (.db) or nodes.json')
+    parser.add_argument('--metrics-dir', required=True, help='Fleet metrics directory')
+    parser.add_argument('--data-dir', help='Directory for collection reports (default: parent of metrics dir)')
+    parser.add_argument('--key', help='SSH private key')
+    parser.add_argument('--ssh', default='ssh', help='ssh executable')
+    parser.add_argument('--control-dir', help='Reuse pooled SSH master connections kept in this directory')
+    parser.add_argument('--concurrency', type=int, default=16, help='Nodes collected at once')
+    parser.add_argument('--timeout', type=float, default=20, help='Deadline per node in seconds')
+    parser.add_argument('--spread', type=float, default=2.0, help='Seconds over which node starts are spread')
+    parser.add_argument('--node', action='append', help='Only collect from this node (repeatable)')
+    parser.add_argument('--interval', type=float, help='Keep collecting every N seconds')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Random fraction of the interval per round')
+    parser.add_argument('--json', action='store_true', help='Print the round report as JSON')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    output_lock = threading.Lock()
+
+    def print_result(result: NodeResult):
+        if args.json:
+            return
+        state = 'ok' if result.ok else f"failed: {result.error}"
+        with output_lock:
+            print(f"{result.name:<20} {result.latency * 1000:>8.0f} ms  {state}", flush=True)
+
+    if args.control_dir:
+        from utils.fleet_ssh import SSHPool
+        runner = SSHPool(args.control_dir, args.key, args.ssh,
+                         idle_timeout=max(300, (args.interval or 0) * 2))
+    else:
+        runner = SSHRunner(args.key, args.ssh)
+
+    collector = FleetCollector(
+        args.nodes_db, args.metrics_dir, args.data_dir,
+        runner=runner,
+        concurrency=args.concurrency, node_timeout=args.timeout, spread=args.spread,
+        on_result=print_result
+    )
+
+    if args.interval:
+        signal.signal(signal.SIGTERM, lambda signum, frame: collector.stop())
+        try:
+            collector.run(args.interval, args.jitter)
+        except KeyboardInterrupt:
+            collector.stop()
+        finally:
+            if args.control_dir:
+                runner.save_stats()
+        return 0
+
+    started = time.time()
+    results = collector.collect(args.node)
+    if args.control_dir:
+        runner.save_stats()
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], indent=2))
+    else:
+        ok = sum(1 for r in results if r.ok)
+        latencies = sorted(r.latency for r in results)
+        slowest = f", slowest {latencies[-1] * 1000:.0f} ms" if latencies else ''
+        print(f"\nCollected {ok}/{len(results)} nodes in {time.time() - started:.1f}s{slowest}")
+    return 0 if results and all(r.ok for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
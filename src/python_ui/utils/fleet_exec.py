@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel fleet command execution and deployment for Pipe Network PoP.
+Runs a command, or uploads a file or folder, on many nodes at once with a
+bounded fan-out. Nodes can be rolled out in batches, optionally behind a
+canary batch, stopping once too many nodes fail. Output is streamed line
+by line, tagged with the node name.
+"""
+
+import os
+import sys
+import gzip
+import time
+import shlex
+import shutil
+import logging
+import tarfile
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from utils.fleet_collector import SSH_CONNECTION_FAILED, SSHRunner, load_nodes
+
+logger = logging.getLogger(__name__)
+
+# Uploads at least this large are gzipped before they are sent
+COMPRESS_THRESHOLD = 1024 * 1024
+
+SKIPPED = 'Skipped'
+
+
+class NodeRun:
+    """Outcome of a command or upload on one node"""
+
+    def __init__(self, name: str, ok: bool = False, returncode: Optional[int] = None,
+                 wall_time: float = 0.0, lines: int = 0, error: Optional[str] = None,
+                 batch: int = 0):
+        self.name = name
+        self.ok = ok
+        self.returncode = returncode
+        self.wall_time = wall_time
+        self.lines = lines
+        self.error = error
+        self.batch = batch
+
+    @property
+    def skipped(self) -> bool:
+        return self.error == SKIPPED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'ok': self.ok,
+            'returncode': self.returncode,
+            'wall_time': round(self.wall_time, 3),
+            'lines': self.lines,
+            'error': self.error,
+            'batch': self.batch
+        }
+
+
+def plan_batches(names: Sequence[str], batch_size: Optional[int] = None,
+                 canary: int = 0) -> List[List[str]]:
+    """
+    Split nodes into rollout batches.
+
+    Args:
+        names (Sequence[str]): Nodes in rollout order
+        batch_size (int, optional): Nodes per batch; all remaining nodes if omitted
+        canary (int): Size of an initial batch run on its own
+
+    Returns:
+        List[List[str]]: Batches in order
+    """
+    names = list(names)
+    batches = []
+    if canary > 0:
+        batches.append(names[:canary])
+        names = names[canary:]
+    size = batch_size if batch_size and batch_size > 0 else max(1, len(names))
+    batches.extend(names[i:i + size] for i in range(0, len(names), size))
+    return [b for b in batches if b]
+
+
+class FleetExecutor:
+    """
+    Runs remote commands on many nodes with at most `width` at a time.
+
+    Batches run one after another. Once more than `max_failures` nodes have
+    failed, nodes that have not started yet are skipped. `on_output` is
+    called from worker threads with (node name, line) for every output line.
+    """
+
+    def __init__(self, nodes: Iterable[Dict[str, Any]], runner=None, width: int = 16,
+                 batch_size: Optional[int] = None, canary: int = 0,
+                 max_failures: Optional[int] = None, node_timeout: Optional[float] = None,
+                 on_output: Optional[Callable[[str, str], None]] = None,
+                 on_result: Optional[Callable[[NodeRun], None]] = None):
+        self.nodes = {n['name']: n for n in nodes if n.get('name')}
+        self.runner = runner or SSHRunner()
+        self.width = max(1, width)
+        self.batch_size = batch_size
+        self.canary = canary
+        self.max_failures = max_failures
+        self.node_timeout = node_timeout
+        self.on_output = on_output
+        self.on_result = on_result
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Skip every node that has not started yet"""
+        self._stop.set()
+
+    def _run_node(self, name: str, remote_command: str, stdin_path: Optional[str],
+                  batch: int) -> NodeRun:
+        if self._stop.is_set():
+            run = NodeRun(name, error=SKIPPED, batch=batch)
+        else:
+            run = self._attempt(name, remote_command, stdin_path, batch)
+        if self.on_result:
+            self.on_result(run)
+        return run
+
+    def _attempt(self, name: str, remote_command: str, stdin_path: Optional[str],
+                 batch: int) -> NodeRun:
+
+        node = self.nodes[name]
+        started = time.perf_counter()
+        run = NodeRun(name, batch=batch)
+
+        if hasattr(self.runner, 'connect') and not self.runner.connect(node):
+            run.returncode = SSH_CONNECTION_FAILED
+            run.error = 'Connection failed'
+        else:
+            self._stream(node, remote_command, stdin_path, run)
+            if hasattr(self.runner, 'finished'):
+                self.runner.finished(node, run.returncode)
+
+        run.wall_time = time.perf_counter() - started
+        run.ok = run.returncode == 0
+        if not run.ok:
+            with self._lock:
+                self._failures += 1
+                if self.max_failures is not None and self._failures > self.max_failures:
+                    self._stop.set()
+        return run
+
+    def _stream(self, node: Dict[str, Any], remote_command: str,
+                stdin_path: Optional[str], run: NodeRun) -> None:
+        """Run one ssh process, passing each output line to on_output"""
+        stdin = open(stdin_path, 'rb') if stdin_path else subprocess.DEVNULL
+        try:
+            proc = subprocess.Popen(self.runner.command(node, remote_command),
+                                    stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    universal_newlines=True, errors='replace')
+        except OSError as e:
+            run.returncode, run.error = -1, str(e)
+            return
+        finally:
+            if stdin_path:
+                stdin.close()
+
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = None
+        if self.node_timeout:
+            timer = threading.Timer(self.node_timeout, kill)
+            timer.daemon = True
+            timer.start()
+        last_line = ''
+        try:
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                run.lines += 1
+                last_line = line or last_line
+                if self.on_output:
+                    self.on_output(node['name'], line)
+            run.returncode = proc.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            run.error = f"Timed out after {self.node_timeout}s"
+        elif run.returncode != 0:
+            run.error = last_line or f"Exit code {run.returncode}"
+
+    def run(self, remote_command: str, names: Optional[Sequence[str]] = None,
+            stdin_path: Optional[str] = None) -> List[NodeRun]:
+        """
+        Run a command on nodes, batch by batch.
+
+        Args:
+            remote_command (str): Shell command run on each node
+            names (Sequence[str], optional): Nodes to run on, in rollout order
+                (default: all nodes)
+            stdin_path (str, optional): File sent to the command's stdin on every node
+
+        Returns:
+            List[NodeRun]: One result per node, in rollout order
+        """
+        names = [n for n in (names if names is not None else self.nodes) if n in self.nodes]
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.width, max(1, len(names))),
+                                thread_name_prefix='fleet-exec') as pool:
+            try:
+                for number, batch in enumerate(plan_batches(names, self.batch_size, self.canary), 1):
+                    futures = [pool.submit(self._run_node, name, remote_command, stdin_path, number)
+                               for name in batch]
+                    for future in futures:
+                        run = future.result()
+                        results[run.name] = run
+            except BaseException:
+                # Ctrl-C: leaving the block would otherwise wait for every
+                # queued node to run
+                self._stop.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+        return [results[name] for name in names]
+
+    def deploy(self, src: str, dest: str, names: Optional[Sequence[str]] = None,
+               compress_threshold: int = COMPRESS_THRESHOLD) -> List[NodeRun]:
+        """
+        Upload a file or folder to nodes with one ssh session per node.
+
+        A folder is sent as a tar stream and unpacked under `dest`, like
+        `rsync src dest` (with a trailing slash, only its contents). A file
+        is written to `dest`, or into it if `dest` is a directory, and
+        replaced atomically. The archive is built once and gzipped when it
+        is at least `compress_threshold` bytes.
+
+        Raises:
+            FileNotFoundError: If `src` does not exist
+        """
+        if not os.path.exists(src):
+            raise FileNotFoundError(f"Source path '{src}' not found")
+
+        workdir = tempfile.mkdtemp(prefix='fleet-deploy-')
+        try:
+            payload, remote_command = self._prepare_upload(src, dest, workdir, compress_threshold)
+            return self.run(remote_command, names, stdin_path=payload)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _prepare_upload(src: str, dest: str, workdir: str, compress_threshold: int):
+        """Build the upload payload once; returns (payload path, remote command)"""
+        quoted_dest = shlex.quote(dest)
+
+        if os.path.isdir(src):
+            size = sum(os.path.getsize(os.path.join(root, f))
+                       for root, _, files in os.walk(src) for f in files)
+            compress = size >= compress_threshold
+            payload = os.path.join(workdir, 'payload.tar' + ('.gz' if compress else ''))
+            with tarfile.open(payload, 'w:gz' if compress else 'w') as tar:
+                if src.endswith('/'):
+                    for entry in sorted(os.listdir(src)):
+                        tar.add(os.path.join(src, entry), arcname=entry)
+                else:
+                    tar.add(src, arcname=os.path.basename(os.path.normpath(src)))
+            flags = 'xzf' if compress else 'xf'
+            return payload, f"mkdir -p {quoted_dest} && tar {flags} - -C {quoted_dest}"
+
+        compress = os.path.getsize(src) >= compress_threshold
+        if compress:
+            payload = os.path.join(workdir, 'payload.gz')
+            with open(src, 'rb') as f_in, gzip.open(payload, 'wb', compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        else:
+            payload = src
+        mode = oct(os.stat(src).st_mode & 0o777)[2:]
+        name = shlex.quote(os.path.basename(src))
+        write = 'gzip -dc >' if compress else 'cat >'
+        return payload, (
+            f"d={quoted_dest}; [ -d \"$d\" ] && d=\"$d/\"{name}; "
+            f"{write} \"$d.part\" && chmod {mode} \"$d.part\" && mv -f \"$d.part\" \"$d\""
+        )
+
+
+def summarize_runs(runs: List[NodeRun], elapsed: float) -> Dict[str, Any]:
+    """Counts and timing for a finished fleet run"""
+    done = [r for r in runs if not r.skipped]
+    serial = sum(r.wall_time for r in done)
+    return {
+        'total': len(runs),
+        'succeeded': sum(1 for r in runs if r.ok),
+        'failed': sum(1 for r in done if not r.ok),
+        'skipped': len(runs) - len(done),
+        'elapsed': round(elapsed, 3),
+        'serial_time': round(serial, 3),
+        'speedup': round(serial / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def print_summary(runs: List[NodeRun], summary: Dict[str, Any], limit: int = 20) -> None:
+    """Print the per-node wall-time table, slowest first, and the totals"""
+    width = max([len(r.name) for r in runs] + [4])
+    print(f"\n{'NODE':<{width}}  {'RESULT':<8} {'TIME':>8}  DETAILS")
+    ordered = sorted(runs, key=lambda r: (r.skipped, -r.wall_time))
+    for run in ordered[:limit]:
+        result = 'ok' if run.ok else ('skipped' if run.skipped else 'failed')
+        print(f"{run.name:<{width}}  {result:<8} {run.wall_time:>7.1f}s  {'' if run.ok else run.error or ''}")
+    if len(ordered) > limit:
+        print(f"... {len(ordered) - limit} more")
+    print(f"\nTotal nodes: {summary['total']}  Successful: {summary['succeeded']}  "
+          f"Failed: {summary['failed']}  Skipped: {summary['skipped']}")
+    print(f"Wall time: {summary['elapsed']:.1f}s (serial estimate {summary['serial_time']:.1f}s)")
+    failed = [r.name for r in runs if not r.ok and not r.skipped]
+    if failed:
+        print(f"Failed nodes: {' '.join(failed)}")
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import json
+    import signal
+
+    parser = argparse.ArgumentParser(description='Run commands or deploy files across Pipe Network PoP fleet nodes')
+    parser.add_argument('--nodes-db', required=True, help='Node registry (.db) or nodes.json')
+    parser.add_argument('--key', help='SSH private key')
+    parser.add_argument('--ssh', default='ssh', help='ssh executable')
+    parser.add_argument('--control-dir', help='Reuse pooled SSH master connections kept in this directory')
+    parser.add_argument('--node', action='append', help='Target node, in rollout order (repeatable; default: all)')
+    parser.add_argument('--width', type=int, default=16, help='Nodes worked on at once')
+    parser.add_argument('--batch', type=int, help='Roll out N nodes at a time')
+    parser.add_argument('--canary', type=int, default=0, help='Run on N nodes first, on their own')
+    parser.add_argument('--max-failures', type=int,
+                        help='Skip nodes not yet started once more than N nodes have failed')
+    parser.add_argument('--timeout', type=float, help='Deadline per node in seconds')
+    parser.add_argument('--quiet', action='store_true', help='Do not stream node output')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    sub = parser.add_subparsers(dest='action', required=True)
+    p = sub.add_parser('exec', help='Run a command')
+    p.add_argument('remote_command', nargs=argparse.REMAINDER)
+    p = sub.add_parser('deploy', help='Upload a file or folder')
+    p.add_argument('src')
+    p.add_argument('dest')
+    p.add_argument('--compress-threshold', type=int, default=COMPRESS_THRESHOLD,
+                   help='Gzip uploads of at least this many bytes')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    nodes = load_nodes(args.nodes_db)
+    names = args.node or [n['name'] for n in nodes if n.get('name')]
+    known = {n.get('name') for n in nodes}
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        print(f"Unknown nodes: {' '.join(unknown)}", file=sys.stderr)
+        return 2
+    if not names:
+        print("No nodes to run on", file=sys.stderr)
+        return 2
+
+    if args.control_dir:
+        from utils.fleet_ssh import SSHPool
+        runner = SSHPool(args.control_dir, args.key, args.ssh)
+    else:
+        runner = SSHRunner(args.key, args.ssh)
+
+    output_lock = threading.Lock()
+    tag_width = max(len(n) for n in names)
+
+    def print_line(name: str, line: str):
+        with output_lock:
+            print(f"{name:<{tag_width}} | {line}", flush=True)
+
+    def print_result(run: NodeRun):
+        if run.skipped:
+            return
+        state = 'ok' if run.ok else f"FAILED ({run.error})"
+        with output_lock:
+            print(f"{run.name:<{tag_width}} * {state} in {run.wall_time:.1f}s", flush=True)
+
+    executor = FleetExecutor(
+        nodes, runner,
+        width=args.width, batch_size=args.batch, canary=args.canary,
+        max_failures=args.max_failures, node_timeout=args.timeout,
+        on_output=None if args.quiet or args.json else print_line,
+        on_result=None if args.json else print_result
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: executor.stop())
+
+    started = time.perf_counter()
+    try:
+        if args.action == 'exec':
+            command = ' '.join(args.remote_command).strip()
+            if not command:
+                parser.error('exec requires a command')
+            runs = executor.run(command, names)
+        else:
+            runs = executor.deploy(args.src, args.dest, names, args.compress_threshold)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        executor.stop()
+        return 130
+    finally:
+        if args.control_dir:
+            runner.save_stats()
+    summary = summarize_runs(runs, time.perf_counter() - started)
+
+    if args.json:
+        print(json.dumps({'summary': summary, 'nodes': [r.to_dict() for r in runs]}, indent=2))
+    else:
+        print_summary(runs, summary)
+        if summary['skipped']:
+            print(f"Stopped after {summary['failed']} failures; {summary['skipped']} nodes were not attempted")
+    return 0 if summary['succeeded'] == summary['total'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
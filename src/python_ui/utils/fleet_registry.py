@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet node registry for Pipe Network PoP.
+Keeps registered nodes and groups in an SQLite database in WAL mode, so
+lookups by name, group or status use indexes and status changes update a
+single row instead of rewriting nodes.json. Several processes (the shell
+scripts, the collector and the web UI) can read and write it at once.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Timestamp format used by registration.sh
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Fields `pop --fleet update` may change
+UPDATABLE_FIELDS = ('ip', 'username', 'port', 'location', 'description', 'status')
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    name TEXT PRIMARY KEY,
+    ip TEXT NOT NULL,
+    username TEXT NOT NULL,
+    port INTEGER NOT NULL DEFAULT 22,
+    location TEXT NOT NULL DEFAULT 'Unknown',
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'Unknown',
+    registered TEXT,
+    last_seen TEXT,
+    last_metrics TEXT,
+    metrics TEXT NOT NULL DEFAULT '{}',
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS nodes_status ON nodes (status COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS node_groups (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL DEFAULT '',
+    created TEXT
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_name TEXT NOT NULL REFERENCES node_groups (name) ON DELETE CASCADE,
+    node_name TEXT NOT NULL,
+    PRIMARY KEY (group_name, node_name)
+);
+CREATE INDEX IF NOT EXISTS group_members_node ON group_members (node_name);
+
+-- Counters for readers that follow changes: `revision` is stamped on every
+-- changed node row, `membership` moves when nodes or group members come or go
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('revision', 0), ('membership', 0);
+CREATE INDEX IF NOT EXISTS nodes_revision ON nodes (revision);
+CREATE TRIGGER IF NOT EXISTS nodes_inserted AFTER INSERT ON nodes BEGIN
+    UPDATE registry_meta SET value = value + 1 WHERE key IN ('revision', 'membership');
+    UPDATE nodes SET revision = (SELECT value FROM registry_meta WHERE key = 'revision')
+        WHERE name = new.name;
+END;
+CREATE TRIGGER IF NOT EXISTS nodes_updated AFTER UPDATE ON nodes
+WHEN new.revision = old.revision BEGIN
+    UPDATE registry_meta SET value = value + 1 WHERE key = 'revision';
+    UPDATE nodes SET revision = (SELECT value FROM registry_meta WHERE key = 'revision')
+        WHERE name = new.name;
+END;
+CREATE TRIGGER IF NOT EXISTS nodes_deleted AFTER DELETE ON nodes BEGIN
+    UPDATE registry_meta SET value = value + 1 WHERE key = 'membership';
+END;
+CREATE TRIGGER IF NOT EXISTS members_inserted AFTER INSERT ON group_members BEGIN
+    UPDATE registry_meta SET value = value + 1 WHERE key = 'membership';
+END;
+CREATE TRIGGER IF NOT EXISTS members_deleted AFTER DELETE ON group_members BEGIN
+    UPDATE registry_meta SET value = value + 1 WHERE key = 'membership';
+END;
+"""
+
+NODE_COLUMNS = ('name', 'ip', 'username', 'port', 'location', 'description', 'status',
+                'registered', 'last_seen', 'last_metrics', 'metrics')
+
+_SELECT_NODES = (
+    "SELECT n.*, (SELECT group_concat(group_name, ',') FROM group_members m "
+    "WHERE m.node_name = n.name) AS groups FROM nodes n"
+)
+
+
+def now_string() -> str:
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+def _port(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 22
+
+
+def _node_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    node = {key: row[key] for key in NODE_COLUMNS}
+    try:
+        node['metrics'] = json.loads(node['metrics'] or '{}')
+    except ValueError:
+        node['metrics'] = {}
+    node['groups'] = row['groups'].split(',') if row['groups'] else []
+    return node
+
+
+class NodeRegistry:
+    """
+    Node and group registry backed by SQLite.
+
+    Each thread gets its own connection. Writes run in `BEGIN IMMEDIATE`
+    transactions and wait up to `timeout` seconds for other writers, so
+    concurrent writers queue instead of overwriting each other.
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def exists_on_disk(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+
+        with self._init_lock:
+            if not self._initialized:
+                # WAL lets readers continue while a writer commits
+                conn.execute("PRAGMA journal_mode = WAL")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    if version == 1:
+                        conn.execute("ALTER TABLE nodes ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+                    conn.executescript(SCHEMA)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                self._initialized = True
+
+        self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Nodes
+
+    def register(self, name: str, ip: str, username: str, port: Any = 22,
+                 location: Optional[str] = None, description: str = '',
+                 status: str = 'Unknown', registered: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add a node, or replace the connection details of an existing one.
+        Group membership and collected metrics of an existing node are kept.
+
+        Returns:
+            Dict[str, Any]: The stored node
+        """
+        if not name or not ip or not username:
+            raise ValueError("name, ip and username are required")
+        timestamp = registered or now_string()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO nodes (name, ip, username, port, location, description, status, "
+                "registered, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET ip = excluded.ip, username = excluded.username, "
+                "port = excluded.port, location = excluded.location, "
+                "description = excluded.description, status = excluded.status, "
+                "registered = excluded.registered, last_seen = excluded.last_seen",
+                (name, ip, username, _port(port), location or 'Unknown', description or '',
+                 status, timestamp, timestamp)
+            )
+        return self.get(name)
+
+    def update(self, name: str, **fields: Any) -> bool:
+        """
+        Change fields of a node.
+
+        Returns:
+            bool: False if the node does not exist
+
+        Raises:
+            ValueError: If a field cannot be updated
+        """
+        invalid = [f for f in fields if f not in UPDATABLE_FIELDS]
+        if invalid or not fields:
+            raise ValueError(f"Invalid field: {', '.join(invalid) or '(none)'}. "
+                             f"Valid fields: {', '.join(UPDATABLE_FIELDS)}")
+        if 'port' in fields:
+            fields['port'] = _port(fields['port'])
+        assignments = ', '.join(f"{field} = ?" for field in fields)
+        with self._write() as conn:
+            cursor = conn.execute(f"UPDATE nodes SET {assignments} WHERE name = ?",
+                                  (*fields.values(), name))
+        return cursor.rowcount > 0
+
+    def remove(self, name: str) -> bool:
+        """Unregister a node and drop it from its groups"""
+        with self._write() as conn:
+            cursor = conn.execute("DELETE FROM nodes WHERE name = ?", (name,))
+            conn.execute("DELETE FROM group_members WHERE node_name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(f"{_SELECT_NODES} WHERE n.name = ?", (name,)).fetchone()
+        return _node_dict(row) if row else None
+
+    def exists(self, name: str) -> bool:
+        return self._connect().execute(
+            "SELECT 1 FROM nodes WHERE name = ?", (name,)).fetchone() is not None
+
+    def _filter(self, group: Optional[str], status: Optional[str],
+                search: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if group:
+            clauses.append("n.name IN (SELECT node_name FROM group_members WHERE group_name = ?)")
+            params.append(group)
+        if status:
+            clauses.append("n.status = ? COLLATE NOCASE")
+            params.append(status)
+        if search:
+            clauses.append("(n.name LIKE ? OR n.ip LIKE ? OR n.location LIKE ?)")
+            params.extend([f"%{search}%"] * 3)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def list(self, group: Optional[str] = None, status: Optional[str] = None,
+             search: Optional[str] = None, limit: Optional[int] = None,
+             offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        List nodes in name order.
+
+        Args:
+            group (str, optional): Only members of this group
+            status (str, optional): Only nodes with this status (case-insensitive)
+            search (str, optional): Substring of the name, IP or location
+            limit (int, optional): Maximum number of nodes
+            offset (int): Nodes to skip
+
+        Returns:
+            List[Dict[str, Any]]: Node records with their group names
+        """
+        where, params = self._filter(group, status, search)
+        sql = f"{_SELECT_NODES}{where} ORDER BY n.name"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        return [_node_dict(row) for row in self._connect().execute(sql, params)]
+
+    def names(self, group: Optional[str] = None, status: Optional[str] = None) -> List[str]:
+        where, params = self._filter(group, status, None)
+        return [row[0] for row in self._connect().execute(
+            f"SELECT n.name FROM nodes n{where} ORDER BY n.name", params)]
+
+    def count(self, group: Optional[str] = None, status: Optional[str] = None,
+              search: Optional[str] = None) -> int:
+        where, params = self._filter(group, status, search)
+        return self._connect().execute(f"SELECT count(*) FROM nodes n{where}", params).fetchone()[0]
+
+    def revisions(self) -> Tuple[int, int]:
+        """
+        Change counters for readers that follow the registry.
+
+        Returns:
+            Tuple[int, int]: (revision, membership). `revision` grows with
+            every node change; `membership` changes when nodes are added or
+            removed or group membership changes.
+        """
+        rows = dict(self._connect().execute("SELECT key, value FROM registry_meta"))
+        return rows.get('revision', 0), rows.get('membership', 0)
+
+    def changed_since(self, revision: int) -> List[Dict[str, Any]]:
+        """Nodes changed after `revision`, each with its own `revision`"""
+        nodes = []
+        for row in self._connect().execute(
+                f"{_SELECT_NODES} WHERE n.revision > ? ORDER BY n.revision", (revision,)):
+            node = _node_dict(row)
+            node['revision'] = row['revision']
+            nodes.append(node)
+        return nodes
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of nodes per status"""
+        return {row[0]: row[1] for row in self._connect().execute(
+            "SELECT status, count(*) FROM nodes GROUP BY status")}
+
+    def set_status(self, name: str, status: str, seen: Optional[str] = None) -> bool:
+        """Set a node's status and its last-seen time (default: now)"""
+        return self.update_statuses([{'name': name, 'status': status,
+                                      'last_seen': seen or now_string()}]) > 0
+
+    def update_statuses(self, updates: Iterable[Dict[str, Any]]) -> int:
+        """
+        Apply many status updates in one transaction.
+
+        Args:
+            updates (Iterable[Dict[str, Any]]): Items with `name` and `status`,
+                and optionally `last_seen`, `last_metrics` and `metrics`;
+                missing optional fields are left unchanged
+
+        Returns:
+            int: Number of nodes updated
+        """
+        rows = [(u['status'], u.get('last_seen'), u.get('last_metrics'),
+                 json.dumps(u['metrics']) if u.get('metrics') is not None else None,
+                 u['name'])
+                for u in updates]
+        if not rows:
+            return 0
+        with self._write() as conn:
+            cursor = conn.executemany(
+                "UPDATE nodes SET status = ?, last_seen = coalesce(?, last_seen), "
+                "last_metrics = coalesce(?, last_metrics), metrics = coalesce(?, metrics) "
+                "WHERE name = ?", rows)
+        return cursor.rowcount
+
+    def set_last_metrics(self, name: str, timestamp: str) -> bool:
+        with self._write() as conn:
+            cursor = conn.execute("UPDATE nodes SET last_metrics = ? WHERE name = ?", (timestamp, name))
+        return cursor.rowcount > 0
+
+    # Groups
+
+    def create_group(self, name: str, description: str = '') -> bool:
+        """Returns False if the group already exists"""
+        with self._write() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO node_groups (name, description, created) VALUES (?, ?, ?)",
+                (name, description or '', now_string()))
+        return cursor.rowcount > 0
+
+    def delete_group(self, name: str) -> bool:
+        with self._write() as conn:
+            cursor = conn.execute("DELETE FROM node_groups WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def add_to_group(self, group: str, node: str) -> bool:
+        """
+        Returns:
+            bool: False if the node was already a member
+
+        Raises:
+            ValueError: If the group does not exist
+        """
+        try:
+            with self._write() as conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO group_members (group_name, node_name) VALUES (?, ?)",
+                    (group, node))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Group '{group}' does not exist")
+        return cursor.rowcount > 0
+
+    def remove_from_group(self, group: str, node: str) -> bool:
+        with self._write() as conn:
+            cursor = conn.execute(
+                "DELETE FROM group_members WHERE group_name = ? AND node_name = ?", (group, node))
+        return cursor.rowcount > 0
+
+    def group_nodes(self, group: str) -> List[str]:
+        return [row[0] for row in self._connect().execute(
+            "SELECT node_name FROM group_members WHERE group_name = ? ORDER BY node_name", (group,))]
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """Groups with their member names"""
+        conn = self._connect()
+        members: Dict[str, List[str]] = {}
+        for group_name, node_name in conn.execute(
+                "SELECT group_name, node_name FROM group_members ORDER BY node_name"):
+            members.setdefault(group_name, []).append(node_name)
+        return [{'name': row['name'], 'description': row['description'], 'created': row['created'],
+                 'nodes': members.get(row['name'], [])}
+                for row in conn.execute("SELECT * FROM node_groups ORDER BY name")]
+
+    # Migration
+
+    def import_json(self, nodes_path: Optional[str] = None,
+                    groups_path: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Import nodes.json and groups.json in one transaction. Existing
+        records with the same names are overwritten, so it is safe to run
+        again.
+
+        Returns:
+            Tuple[int, int]: Nodes and groups imported
+
+        Raises:
+            ValueError: If a file is not valid JSON
+        """
+        nodes = _read_json(nodes_path).get('nodes', []) if nodes_path else []
+        groups = _read_json(groups_path).get('groups', []) if groups_path else []
+
+        node_rows = [
+            (n['name'], n.get('ip', ''), n.get('username', ''), _port(n.get('port')),
+             n.get('location') or 'Unknown', n.get('description') or '',
+             n.get('status') or 'Unknown', n.get('registered'), n.get('last_seen'),
+             n.get('last_metrics'), json.dumps(n.get('metrics') or {}))
+            for n in nodes if n.get('name')
+        ]
+        with self._write() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO nodes ({', '.join(NODE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(NODE_COLUMNS))})", node_rows)
+            for group in groups:
+                if not group.get('name'):
+                    continue
+                conn.execute(
+                    "INSERT INTO node_groups (name, description, created) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET description = excluded.description, "
+                    "created = excluded.created",
+                    (group['name'], group.get('description') or '', group.get('created')))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO group_members (group_name, node_name) VALUES (?, ?)",
+                    [(group['name'], node) for node in group.get('nodes', [])])
+        return len(node_rows), sum(1 for g in groups if g.get('name'))
+
+    def export_json(self, nodes_path: Optional[str] = None, groups_path: Optional[str] = None) -> None:
+        """Write the registry back out in the nodes.json / groups.json formats"""
+        from utils.fleet_collector import write_json_atomic
+
+        if nodes_path:
+            nodes = []
+            for node in self.list():
+                node.pop('groups')
+                node['port'] = str(node['port'])
+                nodes.append({k: v for k, v in node.items() if v is not None})
+            write_json_atomic(nodes_path, {'nodes': nodes})
+        if groups_path:
+            write_json_atomic(groups_path, {'groups': self.groups()})
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description='Pipe Network PoP fleet node registry')
+    parser.add_argument('--db', required=True, help='Registry database file')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('migrate', help='Import nodes.json and groups.json')
+    p.add_argument('--nodes', help='nodes.json to import')
+    p.add_argument('--groups', help='groups.json to import')
+
+    p = sub.add_parser('export', help='Write nodes.json / groups.json from the registry')
+    p.add_argument('--nodes', help='nodes.json to write')
+    p.add_argument('--groups', help='groups.json to write')
+
+    p = sub.add_parser('register', help='Add or replace a node')
+    p.add_argument('name')
+    p.add_argument('ip')
+    p.add_argument('username')
+    p.add_argument('--port', default='22')
+    p.add_argument('--location')
+    p.add_argument('--description', default='')
+    p.add_argument('--status', default='Unknown')
+
+    p = sub.add_parser('update', help='Change one field of a node')
+    p.add_argument('name')
+    p.add_argument('field', choices=UPDATABLE_FIELDS)
+    p.add_argument('value')
+
+    p = sub.add_parser('remove', help='Unregister a node')
+    p.add_argument('name')
+
+    p = sub.add_parser('exists', help='Exit 0 if the node is registered')
+    p.add_argument('name')
+
+    p = sub.add_parser('get', help='Print a node as JSON')
+    p.add_argument('name')
+
+    for command in ('list', 'names'):
+        p = sub.add_parser(command, help='List nodes' if command == 'list' else 'Print node names')
+        p.add_argument('--group')
+        p.add_argument('--status')
+        if command == 'list':
+            p.add_argument('--search')
+            p.add_argument('--format', choices=('json', 'tsv'), default='tsv')
+
+    p = sub.add_parser('status', help='Set node statuses')
+    p.add_argument('name', nargs='?')
+    p.add_argument('status', nargs='?')
+    p.add_argument('--batch', action='store_true',
+                   help='Read "<name> <status>" lines from stdin and apply them in one transaction')
+
+    p = sub.add_parser('last-metrics', help="Record a node's last metrics timestamp")
+    p.add_argument('name')
+    p.add_argument('timestamp')
+
+    p = sub.add_parser('groups', help='List groups as JSON')
+
+    p = sub.add_parser('group', help='Manage groups')
+    p.add_argument('action', choices=('create', 'delete', 'add', 'remove', 'nodes'))
+    p.add_argument('group')
+    p.add_argument('node', nargs='?', help='Node name, or the description for create')
+
+    args = parser.parse_args(argv)
+    registry = NodeRegistry(args.db)
+
+    try:
+        if args.command == 'migrate':
+            nodes, groups = registry.import_json(args.nodes, args.groups)
+            print(f"Imported {nodes} nodes and {groups} groups into {args.db}")
+        elif args.command == 'export':
+            registry.export_json(args.nodes, args.groups)
+        elif args.command == 'register':
+            node = registry.register(args.name, args.ip, args.username, args.port,
+                                     args.location, args.description, args.status)
+            print(json.dumps(node, indent=2))
+        elif args.command == 'update':
+            if not registry.update(args.name, **{args.field: args.value}):
+                print(f"No node with name '{args.name}' found.", file=sys.stderr)
+                return 1
+        elif args.command == 'remove':
+            return 0 if registry.remove(args.name) else 1
+        elif args.command == 'exists':
+            return 0 if registry.exists(args.name) else 1
+        elif args.command == 'get':
+            node = registry.get(args.name)
+            if node is None:
+                return 1
+            print(json.dumps(node, indent=2))
+        elif args.command == 'names':
+            for name in registry.names(args.group, args.status):
+                print(name)
+        elif args.command == 'list':
+            nodes = registry.list(args.group, args.status, args.search)
+            if args.format == 'json':
+                print(json.dumps({'nodes': nodes}, indent=2))
+            else:
+                # name ip port status location registered
+                for n in nodes:
+                    print("\t".join(str(n[k] or '') for k in
+                                    ('name', 'ip', 'port', 'status', 'location', 'registered')))
+        elif args.command == 'status':
+            if args.batch:
+                seen = now_string()
+                updates = [{'name': name, 'status': status, 'last_seen': seen}
+                           for name, _, status in (line.strip().partition(' ') for line in sys.stdin)
+                           if name and status]
+                print(registry.update_statuses(updates))
+            elif args.name and args.status:
+                return 0 if registry.set_status(args.name, args.status) else 1
+            else:
+                parser.error('status requires <name> <status> or --batch')
+        elif args.command == 'last-metrics':
+            return 0 if registry.set_last_metrics(args.name, args.timestamp) else 1
+        elif args.command == 'groups':
+            print(json.dumps({'groups': registry.groups()}, indent=2))
+        elif args.command == 'group':
+            if args.action == 'create':
+                return 0 if registry.create_group(args.group, args.node or '') else 1
+            if args.action == 'delete':
+                return 0 if registry.delete_group(args.group) else 1
+            if args.action == 'nodes':
+                for name in registry.group_nodes(args.group):
+                    print(name)
+                return 0
+            if not args.node:
+                parser.error(f"group {args.action} requires a node name")
+            if args.action == 'add':
+                return 0 if registry.add_to_group(args.group, args.node) else 1
+            return 0 if registry.remove_from_group(args.group, args.node) else 1
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
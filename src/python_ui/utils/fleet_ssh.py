@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent SSH connections for Pipe Network PoP fleet operations.
+Keeps one multiplexed OpenSSH master connection (ControlMaster) per node,
+so repeated commands skip the TCP and key exchange handshake. Masters are
+health checked, evicted when idle, and reconnected with exponential
+backoff after failures.
+"""
+
+import os
+import sys
+import json
+import time
+import stat
+import socket
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from utils.fleet_collector import RunResult, SSH_CONNECTION_FAILED, load_nodes
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = 'stats.json'
+
+
+def control_name(username: str, host: str, port: Any) -> str:
+    """
+    Control socket name for a node.
+
+    Matches fleet_control_path in src/fleet/core/ssh.sh so the shell tools
+    and Python share masters. Hashed to stay within the socket path limit.
+    """
+    digest = hashlib.sha1(f"{username}@{host}:{port}".encode()).hexdigest()[:16]
+    return f"cm-{digest}"
+
+
+class _NodeState:
+    """Connection bookkeeping for one node"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connected = False
+        self.last_used = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class SSHPool:
+    """
+    Pool of multiplexed SSH master connections, one per node.
+
+    run() can be used anywhere an SSHRunner is accepted. The first command
+    to a node starts a master; later commands ride on it until it has been
+    idle for `idle_timeout` seconds. A node whose master cannot be started
+    is not retried until its backoff has elapsed.
+    """
+
+    def __init__(self, control_dir: str, key_file: Optional[str] = None, ssh_binary: str = 'ssh',
+                 connect_timeout: float = 5, idle_timeout: float = 300,
+                 base_backoff: float = 5, max_backoff: float = 300):
+        self.control_dir = control_dir
+        self.key_file = key_file
+        self.ssh_binary = ssh_binary
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._nodes = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'handshakes': 0,
+            'handshake_seconds': 0.0,
+            'reused': 0,
+            'failed_connects': 0,
+            'evicted': 0
+        }
+        os.makedirs(control_dir, mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def _key(node: Dict[str, Any]) -> str:
+        return f"{node['username']}@{node['ip']}:{node.get('port') or 22}"
+
+    def _state(self, node: Dict[str, Any]) -> _NodeState:
+        key = self._key(node)
+        with self._lock:
+            if key not in self._nodes:
+                self._nodes[key] = _NodeState()
+            return self._nodes[key]
+
+    def control_path(self, node: Dict[str, Any]) -> str:
+        """Path of a node's control socket"""
+        return os.path.join(self.control_dir,
+                            control_name(node['username'], node['ip'], node.get('port') or 22))
+
+    def _args(self, node: Dict[str, Any], *extra: str) -> List[str]:
+        args = [self.ssh_binary]
+        if self.key_file:
+            args += ['-i', self.key_file]
+        args += [
+            '-p', str(node.get('port') or 22),
+            '-o', f"ControlPath={self.control_path(node)}",
+            '-o', f"ConnectTimeout={int(self.connect_timeout)}",
+            '-o', 'BatchMode=yes'
+        ]
+        args += list(extra)
+        args.append(f"{node['username']}@{node['ip']}")
+        return args
+
+    def _control(self, node: Dict[str, Any], operation: str) -> bool:
+        """Send a control command (check, exit) to a node's master"""
+        try:
+            result = subprocess.run(self._args(node, '-O', operation),
+                                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=self.connect_timeout)
+            return result.returncode == 0
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+
+    def _master_alive(self, node: Dict[str, Any]) -> bool:
+        """Whether a node's control socket accepts connections, removing it if stale"""
+        path = self.control_path(node)
+        try:
+            mode = os.stat(path).st_mode
+        except OSError:
+            return False
+        if not stat.S_ISSOCK(mode):
+            # Not a socket we can probe directly; let ssh decide
+            return self._control(node, 'check')
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return True
+        except OSError:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+        finally:
+            probe.close()
+
+    @property
+    def average_handshake(self) -> float:
+        """Mean seconds per master handshake seen so far"""
+        if not self.stats['handshakes']:
+            return 0.0
+        return self.stats['handshake_seconds'] / self.stats['handshakes']
+
+    def connect(self, node: Dict[str, Any]) -> bool:
+        """
+        Make sure a live master exists for a node.
+
+        Returns:
+            bool: True if commands can be multiplexed over a master
+        """
+        state = self._state(node)
+        with state.lock:
+            now = time.time()
+            if state.connected and now - state.last_used < self.idle_timeout:
+                return True
+            state.connected = False
+            if now < state.retry_at:
+                return False
+
+            # Another process (or the shell tools) may already hold a master
+            if self._master_alive(node):
+                state.connected = True
+                state.failures = 0
+                state.last_used = now
+                return True
+
+            started = time.perf_counter()
+            # The backgrounded master may keep stderr open, so read it from a
+            # file rather than waiting for EOF on a pipe
+            with tempfile.TemporaryFile(mode='w+') as errors:
+                try:
+                    result = subprocess.run(
+                        self._args(node, '-M', '-N', '-f', '-o', f"ControlPersist={int(self.idle_timeout)}"),
+                        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=errors,
+                        timeout=self.connect_timeout + 5
+                    )
+                    ok = result.returncode == 0
+                except (subprocess.TimeoutExpired, OSError) as e:
+                    ok = False
+                    errors.write(str(e))
+                errors.seek(0)
+                error = errors.read().strip()
+            elapsed = time.perf_counter() - started
+
+            if ok:
+                with self._lock:
+                    self.stats['handshakes'] += 1
+                    self.stats['handshake_seconds'] += elapsed
+                state.connected = True
+                state.failures = 0
+                state.last_used = time.time()
+                return True
+
+            state.failures += 1
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (state.failures - 1))
+            state.retry_at = time.time() + backoff * random.uniform(0.8, 1.2)
+            with self._lock:
+                self.stats['failed_connects'] += 1
+            logger.warning(f"Cannot connect to {self._key(node)} ({error or 'unknown error'}), "
+                           f"retrying in {backoff:.0f}s")
+            return False
+
+    def run(self, node: Dict[str, Any], command: str, timeout: float) -> RunResult:
+        """
+        Run a command on a node over its master connection.
+
+        Returns:
+            RunResult: (returncode, stdout, stderr); returncode is 255 when
+            the node could not be reached
+        """
+        state = self._state(node)
+        if not self.connect(node):
+            wait = max(0.0, state.retry_at - time.time())
+            return SSH_CONNECTION_FAILED, '', f"Connection to {self._key(node)} failed, retry in {wait:.0f}s"
+
+        try:
+            result = subprocess.run(
+                self.command(node, command),
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                universal_newlines=True, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return -1, '', f"Timed out after {timeout}s"
+        except OSError as e:
+            return -1, '', str(e)
+
+        self.finished(node, result.returncode)
+        return result.returncode, result.stdout, result.stderr
+
+    __call__ = run
+
+    def command(self, node: Dict[str, Any], remote_command: str) -> List[str]:
+        """ssh argument list sending a command over a node's master; connect() first"""
+        return self._args(node, '-o', 'ControlMaster=no') + [remote_command]
+
+    def finished(self, node: Dict[str, Any], returncode: int) -> None:
+        """Record the outcome of a command sent with command()"""
+        state = self._state(node)
+        state.last_used = time.time()
+        if returncode == SSH_CONNECTION_FAILED:
+            # The master may have died under us; the next call checks again
+            state.connected = False
+        else:
+            with self._lock:
+                self.stats['reused'] += 1
+
+    def check(self, node: Dict[str, Any]) -> bool:
+        """Health check a node's master, forgetting it if it is gone"""
+        state = self._state(node)
+        alive = self._control(node, 'check')
+        state.connected = alive
+        return alive
+
+    def close(self, node: Dict[str, Any]) -> None:
+        """Shut down a node's master"""
+        self._control(node, 'exit')
+        self._state(node).connected = False
+
+    def evict_idle(self, nodes: Iterable[Dict[str, Any]]) -> int:
+        """
+        Close masters idle for longer than `idle_timeout`.
+
+        Returns:
+            int: Number of masters closed
+        """
+        now = time.time()
+        evicted = 0
+        for node in nodes:
+            state = self._nodes.get(self._key(node))
+            if state and state.connected and now - state.last_used >= self.idle_timeout:
+                self.close(node)
+                evicted += 1
+        with self._lock:
+            self.stats['evicted'] += evicted
+        return evicted
+
+    def report(self) -> Dict[str, Any]:
+        """Stats for this pool, including the estimated time saved by reuse"""
+        report = dict(self.stats)
+        # Every reused command after the first on a master skipped a handshake
+        skipped = max(0, report['reused'] - report['handshakes'])
+        report['handshakes_saved'] = skipped
+        report['seconds_saved'] = round(skipped * self.average_handshake, 3)
+        report['handshake_seconds'] = round(report['handshake_seconds'], 3)
+        return report
+
+    def save_stats(self) -> Dict[str, Any]:
+        """
+        Add this pool's counters to the totals kept in the control directory.
+
+        Returns:
+            Dict[str, Any]: Updated totals
+        """
+        path = os.path.join(self.control_dir, STATS_FILE)
+        with open(path, 'a+') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                totals = json.loads(f.read() or '{}')
+            except ValueError:
+                totals = {}
+            for key, value in self.report().items():
+                totals[key] = round(totals.get(key, 0) + value, 3)
+            # Later runs often reuse masters without any handshake of their
+            # own, so price saved handshakes at the long-run average
+            if totals.get('handshakes'):
+                average = totals['handshake_seconds'] / totals['handshakes']
+                totals['seconds_saved'] = round(totals['handshakes_saved'] * average, 3)
+            f.seek(0)
+            f.truncate()
+            json.dump(totals, f, indent=2)
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0 if key != 'handshake_seconds' else 0.0
+        return totals
+
+
+def read_stats(control_dir: str) -> Dict[str, Any]:
+    """Cumulative pool stats saved in a control directory"""
+    try:
+        with open(os.path.join(control_dir, STATS_FILE), 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pipe Network PoP fleet SSH connection pool')
+    parser.add_argument('--control-dir', default=os.path.expanduser('~/.local/share/pipe-pop/ssh-control'),
+                        help='Directory for control sockets and stats')
+    parser.add_argument('--nodes-db', help='Node registry (.db) or nodes.json')
+    parser.add_argument('--key', help='SSH private key')
+    parser.add_argument('--ssh', default='ssh', help='ssh executable')
+    parser.add_argument('--idle-timeout', type=float, default=300, help='Seconds before idle masters close')
+    sub = parser.add_subparsers(dest='command')
+    p_run = sub.add_parser('run', help='Run a command on a node')
+    p_run.add_argument('node')
+    p_run.add_argument('remote_command', nargs=argparse.REMAINDER)
+    p_run.add_argument('--timeout', type=float, default=60)
+    sub.add_parser('check', help='Health check the master of every node')
+    sub.add_parser('close', help='Close the master of every node')
+    sub.add_parser('stats', help='Show handshake counts and time saved')
+    args = parser.parse_args(argv)
+
+    if args.command == 'stats':
+        stats = read_stats(args.control_dir)
+        if not stats:
+            print("No pooled connections recorded yet")
+            return 0
+        print(f"Handshakes:       {stats.get('handshakes', 0):.0f} "
+              f"({stats.get('handshake_seconds', 0):.1f}s total)")
+        print(f"Reused commands:  {stats.get('reused', 0):.0f}")
+        print(f"Handshakes saved: {stats.get('handshakes_saved', 0):.0f} "
+              f"(~{stats.get('seconds_saved', 0):.1f}s)")
+        print(f"Failed connects:  {stats.get('failed_connects', 0):.0f}")
+        return 0
+
+    if not args.command:
+        parser.print_help()
+        return 1
+    if not args.nodes_db:
+        parser.error('--nodes-db is required')
+
+    nodes = load_nodes(args.nodes_db)
+    pool = SSHPool(args.control_dir, args.key, args.ssh, idle_timeout=args.idle_timeout)
+
+    if args.command == 'run':
+        node = next((n for n in nodes if n.get('name') == args.node), None)
+        if node is None:
+            print(f"Node '{args.node}' not found", file=sys.stderr)
+            return 1
+        returncode, stdout, stderr = pool.run(node, ' '.join(args.remote_command), args.timeout)
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+        pool.save_stats()
+        return returncode
+
+    for node in nodes:
+        if args.command == 'check':
+            print(f"{node['name']:<20} {'connected' if pool.check(node) else 'not connected'}")
+        elif args.command == 'close':
+            pool.close(node)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet summary for Pipe Network PoP Web UI.
+Keeps per-group and fleet-wide aggregates (online counts, CPU/memory/disk
+percentiles, worst nodes and stale nodes) up to date from the node
+registry. Only nodes changed since the last refresh are re-read, and the
+finished summary is cached so requests can be answered without any work.
+"""
+
+import os
+import sys
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from utils.aggregate import DEFAULT_PERCENTILES, percentile_sorted
+from utils.fleet_registry import TIME_FORMAT, NodeRegistry
+
+logger = logging.getLogger(__name__)
+
+# Metrics reported by `pop --pulse --export json` that are aggregated
+METRICS = ('cpu_usage', 'memory_usage', 'disk_usage')
+
+# Registry statuses that count as online
+ONLINE_STATUSES = {'online', 'connected', 'running'}
+
+# Key of the whole fleet in the aggregate table
+FLEET = None
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+class _NodeState:
+    __slots__ = ('name', 'groups', 'online', 'values', 'seen')
+
+    def __init__(self, record: Dict[str, Any]):
+        self.name = record['name']
+        self.groups = tuple(record.get('groups') or ())
+        self.online = str(record.get('status', '')).lower() in ONLINE_STATUSES
+        self.seen = _parse_time(record.get('last_seen'))
+        self.values = {}
+        if self.online:
+            metrics = record.get('metrics') or {}
+            for metric in METRICS:
+                try:
+                    self.values[metric] = float(metrics[metric])
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+
+class _Aggregate:
+    """Counts and sorted metric values for one group"""
+
+    def __init__(self):
+        self.total = 0
+        self.online = 0
+        # Sorted (value, name) pairs and the matching sorted values
+        self.pairs = {metric: [] for metric in METRICS}
+        self.values = {metric: [] for metric in METRICS}
+        self.sums = {metric: 0.0 for metric in METRICS}
+
+    def add(self, node: _NodeState) -> None:
+        self.total += 1
+        self.online += node.online
+        for metric, value in node.values.items():
+            index = bisect.bisect_left(self.pairs[metric], (value, node.name))
+            self.pairs[metric].insert(index, (value, node.name))
+            self.values[metric].insert(index, value)
+            self.sums[metric] += value
+
+    def remove(self, node: _NodeState) -> None:
+        self.total -= 1
+        self.online -= node.online
+        for metric, value in node.values.items():
+            index = bisect.bisect_left(self.pairs[metric], (value, node.name))
+            del self.pairs[metric][index]
+            del self.values[metric][index]
+            self.sums[metric] -= value
+
+    def to_dict(self, percentiles: Sequence[float], worst_n: int, stale: int) -> Dict[str, Any]:
+        metrics, worst = {}, {}
+        for metric in METRICS:
+            values = self.values[metric]
+            if not values:
+                metrics[metric] = {'count': 0}
+                worst[metric] = []
+                continue
+            summary = {
+                'count': len(values),
+                'avg': round(self.sums[metric] / len(values), 2),
+                'min': values[0],
+                'max': values[-1]
+            }
+            for pct in percentiles:
+                summary[f"p{pct:g}"] = round(percentile_sorted(values, pct), 2)
+            metrics[metric] = summary
+            worst[metric] = [{'name': name, 'value': value}
+                             for value, name in reversed(self.pairs[metric][-worst_n:])]
+        return {
+            'total': self.total,
+            'online': self.online,
+            'offline': self.total - self.online,
+            'stale': stale,
+            'metrics': metrics,
+            'worst': worst
+        }
+
+
+class FleetSummary:
+    """
+    Incrementally maintained fleet and group aggregates.
+
+    refresh() reads only the registry rows changed since the previous call
+    (a full reload happens when nodes or group memberships change) and
+    rebuilds the cached summary if anything changed, or every
+    `rebuild_interval` seconds so stale nodes are picked up.
+    """
+
+    def __init__(self, registry: NodeRegistry, stale_after: float = 900, worst_n: int = 5,
+                 percentiles: Iterable[float] = DEFAULT_PERCENTILES, rebuild_interval: float = 30,
+                 stale_limit: int = 50):
+        self.registry = registry
+        self.stale_after = stale_after
+        self.worst_n = worst_n
+        self.percentiles = list(percentiles)
+        self.rebuild_interval = rebuild_interval
+        self.stale_limit = stale_limit
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, _NodeState] = {}
+        self._groups: Dict[Optional[str], _Aggregate] = {FLEET: _Aggregate()}
+        self._revision = 0
+        self._membership = None
+        self._summary = None
+        self._built = 0.0
+        self._dirty = True
+        self._listeners = []
+        self.version = 0
+
+    def add_listener(self, func: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `func(record)` for every node record refresh() reads from the registry"""
+        self._listeners.append(func)
+
+    def _aggregates(self, node: _NodeState) -> List[_Aggregate]:
+        aggregates = [self._groups[FLEET]]
+        for group in node.groups:
+            if group not in self._groups:
+                self._groups[group] = _Aggregate()
+            aggregates.append(self._groups[group])
+        return aggregates
+
+    def update_node(self, record: Dict[str, Any]) -> None:
+        """Replace one node's contribution to the aggregates"""
+        with self._lock:
+            self._update(record)
+
+    def _update(self, record: Dict[str, Any]) -> None:
+        previous = self._nodes.get(record['name'])
+        if previous is not None:
+            for aggregate in self._aggregates(previous):
+                aggregate.remove(previous)
+        node = _NodeState(record)
+        self._nodes[node.name] = node
+        for aggregate in self._aggregates(node):
+            aggregate.add(node)
+        self._dirty = True
+
+    def _reload(self, records: List[Dict[str, Any]]) -> None:
+        self._nodes = {}
+        self._groups = {FLEET: _Aggregate()}
+        for record in records:
+            self._update(record)
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Apply registry changes and return the current summary.
+
+        Returns:
+            Dict[str, Any]: The cached summary, or None if there is no registry
+        """
+        if not self.registry.exists_on_disk():
+            return None
+        with self._lock:
+            records = ()
+            revision, membership = self.registry.revisions()
+            if membership != self._membership:
+                records = self.registry.list()
+                self._reload(records)
+                self._membership = membership
+                self._revision = revision
+            elif revision != self._revision:
+                records = self.registry.changed_since(self._revision)
+                for record in records:
+                    self._update(record)
+                self._revision = revision
+
+            for listener in self._listeners:
+                for record in records:
+                    try:
+                        listener(record)
+                    except Exception as e:
+                        logger.error(f"Fleet summary listener failed: {e}")
+
+            if self._dirty or time.time() - self._built >= self.rebuild_interval:
+                self._rebuild()
+            return self._summary
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """The summary as of the last refresh()"""
+        return self._summary
+
+    def _rebuild(self) -> None:
+        now = time.time()
+        cutoff = now - self.stale_after
+        stale_nodes = sorted((n for n in self._nodes.values()
+                              if n.seen is None or n.seen < cutoff),
+                             key=lambda n: n.seen or 0.0)
+        stale_counts: Dict[Optional[str], int] = {}
+        for node in stale_nodes:
+            stale_counts[FLEET] = stale_counts.get(FLEET, 0) + 1
+            for group in node.groups:
+                stale_counts[group] = stale_counts.get(group, 0) + 1
+
+        self.version += 1
+        self._summary = {
+            'version': self.version,
+            'generated': now,
+            'stale_after': self.stale_after,
+            'fleet': self._groups[FLEET].to_dict(self.percentiles, self.worst_n, stale_counts.get(FLEET, 0)),
+            'groups': {name: aggregate.to_dict(self.percentiles, self.worst_n, stale_counts.get(name, 0))
+                       for name, aggregate in sorted(self._groups.items(), key=lambda item: item[0] or '')
+                       if name is not FLEET and aggregate.total},
+            'stale_nodes': [{'name': n.name,
+                             'last_seen': n.seen,
+                             'age': round(now - n.seen) if n.seen else None}
+                            for n in stale_nodes[:self.stale_limit]]
+        }
+        self._built = now
+        self._dirty = False
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import json
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description='Summarize Pipe Network PoP fleet status')
+    parser.add_argument('--db', required=True, help='Node registry database')
+    parser.add_argument('--stale-after', type=float, default=900,
+                        help='Seconds without contact before a node counts as stale')
+    parser.add_argument('--worst', type=int, default=5, help='Worst nodes listed per metric')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args(argv)
+
+    summary = FleetSummary(NodeRegistry(args.db), stale_after=args.stale_after,
+                           worst_n=args.worst).refresh()
+    if summary is None:
+        print(f"Node registry {args.db} not found", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    def print_group(label: str, group: Dict[str, Any]):
+        print(f"{label}: {group['online']}/{group['total']} online, "
+              f"{group['offline']} offline, {group['stale']} stale")
+        for metric in METRICS:
+            m = group['metrics'][metric]
+            if m['count']:
+                worst = ', '.join(f"{w['name']} {w['value']:g}" for w in group['worst'][metric][:3])
+                print(f"  {metric:<13} avg {m['avg']:>6.1f}  p50 {m['p50']:>6.1f}  "
+                      f"p95 {m['p95']:>6.1f}  max {m['max']:>6.1f}  worst: {worst}")
+
+    print_group('Fleet', summary['fleet'])
+    for name, group in summary['groups'].items():
+        print_group(f"Group {name}", group)
+    if summary['stale_nodes']:
+        print(f"Stale nodes (no contact for {args.stale_after:.0f}s): "
+              f"{' '.join(n['name'] for n in summary['stale_nodes'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP caching and compression helpers for Pipe Network PoP Web UI.
+Content-hash ETags for conditional GETs, Accept-Encoding negotiation with
+gzip (and brotli when the `brotli` package is installed), and static
+assets that are hashed and compressed once and served under fingerprinted
+URLs so browsers can cache them indefinitely.
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Preferred first when a client accepts several equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+# Cache-Control for fingerprinted asset URLs, whose content never changes
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'application/openmetrics-text',
+    'application/xml', 'image/svg+xml'
+)
+
+FINGERPRINT_LENGTH = 12
+FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % FINGERPRINT_LENGTH)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """
+    Pick the content coding to use from an Accept-Encoding header.
+
+    Returns:
+        Optional[str]: The accepted coding with the highest q-value, ties
+        going to the order of `available`, or None for an uncompressed body
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress with `encoding`; level defaults to a speed/size balance suited to responses"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=5 if level is None else level)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+class CompressionCache:
+    """
+    Compressed bodies keyed by content hash and coding, so a response that
+    has not changed since the last request is compressed once rather than
+    once per client.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data: bytes, encoding: str) -> bytes:
+        key = (content_hash(data), encoding)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+        compressed = compress(data, encoding)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+# A static file read into memory, with its compressed variants
+Asset = namedtuple('Asset', ['name', 'hash', 'mimetype', 'body', 'variants', 'signature'])
+
+
+class StaticAssets:
+    """
+    Static files under `directory`, hashed and compressed once.
+
+    url_path() maps `css/base.css` to `css/base.<hash>.css`; resolve()
+    accepts both forms. With `auto_reload` a file is re-read when its size
+    or mtime changes, otherwise it is read once.
+    """
+
+    def __init__(self, directory: str, auto_reload: bool = True):
+        self.directory = os.path.abspath(directory)
+        self.auto_reload = auto_reload
+        self._assets: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.directory, name))
+        if not path.startswith(self.directory + os.sep):
+            return None
+        return path
+
+    def get(self, name: str) -> Optional[Asset]:
+        """The asset for an unfingerprinted name, or None if there is no such file"""
+        asset = self._assets.get(name)
+        if asset is not None and not self.auto_reload:
+            return asset
+        path = self._path(name)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._assets.pop(name, None)
+            return None
+        signature = (st.st_size, st.st_mtime_ns)
+        if asset is not None and asset.signature == signature:
+            return asset
+        if not os.path.isfile(path):
+            return None
+        with self._lock:
+            with open(path, 'rb') as f:
+                body = f.read()
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            variants = {}
+            if compressible(mimetype) and len(body) > 256:
+                # Assets are compressed once, so use the best ratio
+                for encoding in ENCODINGS:
+                    compressed = compress(body, encoding, 9 if encoding == 'gzip' else 11)
+                    if len(compressed) < len(body):
+                        variants[encoding] = compressed
+            asset = Asset(name, content_hash(body)[:FINGERPRINT_LENGTH], mimetype, body, variants, signature)
+            self._assets[name] = asset
+        return asset
+
+    def url_path(self, name: str) -> str:
+        """Fingerprinted path for `name`, or `name` itself if the file is missing"""
+        asset = self.get(name)
+        if asset is None:
+            return name
+        stem, ext = os.path.splitext(name)
+        return f"{stem}.{asset.hash}{ext}"
+
+    def resolve(self, requested: str) -> Tuple[Optional[Asset], bool]:
+        """
+        Look up a requested path.
+
+        Returns:
+            Tuple[Optional[Asset], bool]: The asset, and whether the request
+            named its current fingerprint (and so may be cached forever)
+        """
+        match = FINGERPRINTED.match(requested)
+        if match:
+            asset = self.get(match.group('stem') + match.group('ext'))
+            if asset is not None:
+                return asset, asset.hash == match.group('hash')
+        return self.get(requested), False
+
+    def preload(self) -> int:
+        """Read and compress every file now. Returns the number of assets"""
+        count = 0
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                name = os.path.relpath(os.path.join(root, filename), self.directory).replace(os.sep, '/')
+                try:
+                    if self.get(name) is not None:
+                        count += 1
+                except OSError as e:
+                    logger.error(f"Error reading static file {name}: {e}")
+        return count
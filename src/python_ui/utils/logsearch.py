@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indexed log search for Pipe Network PoP Web UI.
+Maintains a small on-disk index of byte ranges per time bucket, with the set
+of log levels seen in each bucket, so that searches by time range and level
+only read the parts of the log that can possibly match.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKET_SECONDS = 300
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Level bits stored in the index; a bucket's mask is the OR of its lines
+LEVELS = {
+    'debug': 1,
+    'info': 2,
+    'warning': 4,
+    'error': 8,
+    'critical': 16
+}
+LEVEL_ALIASES = {
+    'warn': 'warning',
+    'fatal': 'critical'
+}
+
+TIMESTAMP_RE = re.compile(rb'^\[?(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})')
+LEVEL_RE = re.compile(rb'\b(DEBUG|INFO|WARN|WARNING|ERROR|CRITICAL|FATAL)\b', re.IGNORECASE)
+
+
+def normalize_level(level: str) -> Optional[str]:
+    """Map a level name such as 'WARN' to its canonical name, or None if unknown"""
+    level = level.lower()
+    level = LEVEL_ALIASES.get(level, level)
+    return level if level in LEVELS else None
+
+
+def level_mask(min_level: Optional[str]) -> int:
+    """Bit mask of all levels at or above `min_level`"""
+    if not min_level:
+        return 0
+    threshold = LEVELS[min_level]
+    mask = 0
+    for bit in LEVELS.values():
+        if bit >= threshold:
+            mask |= bit
+    return mask
+
+
+def parse_line(line: bytes, default_ts: int) -> Tuple[int, int]:
+    """
+    Extract the timestamp and level bit from a raw log line.
+
+    Lines without a timestamp (continuations, stack traces) inherit the
+    timestamp of the line before them.
+
+    Returns:
+        Tuple[int, int]: (unix timestamp, level bit or 0)
+    """
+    ts = default_ts
+    match = TIMESTAMP_RE.match(line)
+    if match:
+        try:
+            ts = int(time.mktime(tuple(int(g) for g in match.groups()) + (0, 0, -1)))
+        except (OverflowError, ValueError):
+            pass
+
+    level = 0
+    match = LEVEL_RE.search(line, 0, 120)
+    if match:
+        name = normalize_level(match.group(1).decode('ascii'))
+        if name:
+            level = LEVELS[name]
+    return ts, level
+
+
+class LogIndex:
+    """
+    Sparse time/level index over an append-only log file.
+
+    Each bucket records [bucket start, first byte, end byte, level mask,
+    line count]. The index is extended incrementally from the last indexed
+    offset and rebuilt when the log is rotated or truncated.
+    """
+
+    def __init__(self, log_path: str, index_path: str,
+                 bucket_seconds: int = DEFAULT_BUCKET_SECONDS):
+        self.log_path = log_path
+        self.index_path = index_path
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _empty_state(self, inode: int = 0) -> Dict[str, Any]:
+        return {
+            'inode': inode,
+            'offset': 0,
+            'last_ts': 0,
+            'bucket_seconds': self.bucket_seconds,
+            'buckets': []
+        }
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r') as f:
+                state = json.load(f)
+            if state.get('bucket_seconds') == self.bucket_seconds:
+                return state
+        except (IOError, OSError, ValueError):
+            pass
+        return self._empty_state()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    def update(self) -> int:
+        """
+        Index any lines appended since the last update.
+
+        Returns:
+            int: Number of newly indexed lines
+        """
+        with self._lock:
+            st = os.stat(self.log_path)
+            state = self._state
+            if state['inode'] != st.st_ino or state['offset'] > st.st_size:
+                logger.info(f"Rebuilding log index for {self.log_path}")
+                state = self._state = self._empty_state(st.st_ino)
+
+            if state['offset'] == st.st_size:
+                return 0
+
+            buckets = state['buckets']
+            offset = state['offset']
+            last_ts = state['last_ts']
+            indexed = 0
+
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                while offset < st.st_size:
+                    block = f.read(min(READ_BLOCK_SIZE, st.st_size - offset))
+                    complete = block.rfind(b'\n') + 1
+                    if complete == 0:
+                        # Partial line at the end, index it once it is complete
+                        break
+                    f.seek(offset + complete)
+
+                    for line in block[:complete].splitlines(keepends=True):
+                        last_ts, level = parse_line(line, last_ts)
+                        start = last_ts - last_ts % self.bucket_seconds
+                        end = offset + len(line)
+
+                        if buckets and buckets[-1][0] >= start:
+                            # Same bucket, or a clock step backwards: extend
+                            bucket = buckets[-1]
+                            bucket[2] = end
+                            bucket[3] |= level
+                            bucket[4] += 1
+                        else:
+                            buckets.append([start, offset, end, level, 1])
+
+                        offset = end
+                        indexed += 1
+
+            state['offset'] = offset
+            state['last_ts'] = last_ts
+            if indexed:
+                self._save()
+            return indexed
+
+    def buckets(self, start: Optional[int] = None, end: Optional[int] = None,
+                mask: int = 0) -> List[List[int]]:
+        """
+        Get the index buckets that may contain matching lines.
+
+        Args:
+            start (int, optional): Earliest unix timestamp of interest
+            end (int, optional): Latest unix timestamp of interest
+            mask (int): Level bits of interest, 0 for any level
+
+        Returns:
+            List[List[int]]: Matching buckets in file order
+        """
+        selected = []
+        for bucket in self._state['buckets']:
+            if end is not None and bucket[0] > end:
+                continue
+            if start is not None and bucket[0] + self.bucket_seconds <= start:
+                continue
+            if mask and not bucket[3] & mask:
+                continue
+            selected.append(bucket)
+        return selected
+
+
+def _iter_lines(f, start: int, end: int) -> Iterator[bytes]:
+    """Yield complete lines between two byte offsets, reading in blocks"""
+    f.seek(start)
+    remainder = b''
+    pos = start
+    while pos < end:
+        block = f.read(min(READ_BLOCK_SIZE, end - pos))
+        if not block:
+            break
+        pos += len(block)
+        lines = (remainder + block).split(b'\n')
+        remainder = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if remainder:
+        yield remainder
+
+
+class LogSearch:
+    """Search a log file through its LogIndex"""
+
+    def __init__(self, index: LogIndex):
+        self.index = index
+
+    def search(self, level: Optional[str] = None, start: Optional[int] = None,
+               end: Optional[int] = None, text: Optional[str] = None,
+               pattern: Optional[str] = None, cursor: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Stream log lines matching all of the given filters.
+
+        Args:
+            level (str, optional): Minimum level, e.g. "warning"
+            start (int, optional): Earliest unix timestamp
+            end (int, optional): Latest unix timestamp
+            text (str, optional): Case-insensitive substring
+            pattern (str, optional): Regular expression
+            cursor (int): Byte offset to resume from, from a previous result
+
+        Yields:
+            Dict[str, Any]: offset, next (cursor for the following line),
+            timestamp, level and line for each match
+
+        Raises:
+            ValueError: If the level is unknown
+            re.error: If the regular expression is invalid
+        """
+        min_level = normalize_level(level) if level else None
+        if level and not min_level:
+            raise ValueError(f"Unknown log level: {level}")
+        mask = level_mask(min_level)
+        needle = text.lower().encode('utf-8') if text else None
+        regex = re.compile(pattern.encode('utf-8')) if pattern else None
+
+        self.index.update()
+        level_names = {bit: name for name, bit in LEVELS.items()}
+
+        with open(self.index.log_path, 'rb') as f:
+            for bucket in self.index.buckets(start, end, mask):
+                if bucket[2] <= cursor:
+                    continue
+                # Only the first bucket partially before the cursor is trimmed
+                offset = max(bucket[1], cursor)
+                last_ts = bucket[0]
+
+                for line in _iter_lines(f, offset, bucket[2]):
+                    line_offset = offset
+                    offset += len(line)
+                    ts, bit = parse_line(line, last_ts)
+                    last_ts = ts
+
+                    if start is not None and ts < start:
+                        continue
+                    if end is not None and ts > end:
+                        continue
+                    if mask and not bit & mask:
+                        continue
+                    if needle and needle not in line.lower():
+                        continue
+                    if regex and not regex.search(line):
+                        continue
+
+                    yield {
+                        'offset': line_offset,
+                        'next': offset,
+                        'timestamp': datetime.fromtimestamp(ts).isoformat() if ts else None,
+                        'level': level_names.get(bit),
+                        'line': line.rstrip(b'\r\n').decode('utf-8', errors='replace')
+                    }
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log file tailing for Pipe Network PoP Web UI.
+Serves the end of a log file by reading backwards in blocks, and follows it
+incrementally with "inode:offset" cursors that survive log rotation.
+"""
+
+import os
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+
+def format_cursor(inode: int, offset: int) -> str:
+    """Encode a file position as an opaque cursor string"""
+    return f"{inode}:{offset}"
+
+
+def parse_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Decode a cursor string.
+
+    Args:
+        cursor (str): Cursor in "inode:offset" form; a bare offset is
+            accepted and applies to whichever file is current
+
+    Returns:
+        Tuple[int, int]: (inode, offset), inode is 0 for a bare offset
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    inode, sep, offset = cursor.partition(":")
+    if not sep:
+        return 0, int(inode)
+    return int(inode), int(offset)
+
+
+def _decode(lines: List[bytes]) -> List[str]:
+    return [line.decode('utf-8', errors='replace') for line in lines]
+
+
+class LogTailer:
+    """
+    Read the tail of a log file without spawning processes.
+
+    Only complete lines are returned. A trailing partial line is left in
+    place and is picked up by the next read once it ends in a newline.
+    """
+
+    def __init__(self, path: str, block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+
+    def available(self) -> bool:
+        """Check whether the log file exists and is readable"""
+        return os.path.isfile(self.path) and os.access(self.path, os.R_OK)
+
+    def tail(self, limit: int) -> Tuple[List[str], str]:
+        """
+        Get the last lines of the log.
+
+        Reads backwards from the end one block at a time and stops as soon
+        as enough lines have been seen, so cost depends on `limit` and not
+        on the size of the file. At most `max_bytes` are read, so fewer
+        lines are returned when they do not fit.
+
+        Args:
+            limit (int): Maximum number of lines to return
+
+        Returns:
+            Tuple[List[str], str]: (lines, cursor positioned after them)
+        """
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            pos = st.st_size
+            chunks = []
+            newlines = 0
+
+            # One extra newline guarantees the first kept line is complete
+            while pos > 0 and newlines <= limit and st.st_size - pos < self.max_bytes:
+                step = min(self.block_size, pos, self.max_bytes - (st.st_size - pos))
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step)
+                chunks.append(chunk)
+                newlines += chunk.count(b'\n')
+
+        data = b''.join(reversed(chunks))
+        # Unless the file was read from its start, the first line may be cut off
+        start = data.find(b'\n') + 1 if pos > 0 else 0
+        complete = data.rfind(b'\n') + 1
+        lines = data[start:complete].splitlines()[-limit:] if limit > 0 else []
+        return _decode(lines), format_cursor(st.st_ino, pos + complete)
+
+    def _read_from(self, path: str, offset: int, limit: Optional[int]) -> Tuple[List[bytes], int]:
+        """Read complete lines from `offset`, returning them and the new offset"""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(self.max_bytes)
+
+        complete = data.rfind(b'\n') + 1
+        if complete == 0 and len(data) == self.max_bytes:
+            # A single line longer than max_bytes, return it in pieces
+            complete = len(data)
+        lines = data[:complete].splitlines(keepends=True)
+        if limit is not None and len(lines) > limit:
+            lines = lines[:limit]
+        end = offset + sum(len(line) for line in lines)
+        return [line.rstrip(b'\r\n') for line in lines], end
+
+    def _find_rotated(self, inode: int) -> Optional[str]:
+        """Find the rotated copy of the file a cursor was taken from"""
+        for candidate in (self.path + '.1', self.path + '.0'):
+            try:
+                if os.stat(candidate).st_ino == inode:
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    def read_since(self, cursor: str, limit: Optional[int] = None) -> Tuple[List[str], str, bool]:
+        """
+        Get the lines appended since a cursor.
+
+        If the file was rotated since the cursor was taken, the rest of the
+        rotated file is read first and reading continues at the start of the
+        new file. If the old file cannot be found, or the file was truncated,
+        reading restarts from the beginning and `reset` is True.
+
+        Args:
+            cursor (str): Cursor from a previous tail() or read_since()
+            limit (int, optional): Maximum number of lines to return; the
+                cursor only advances past the lines actually returned
+
+        Returns:
+            Tuple[List[str], str, bool]: (lines, new cursor, reset)
+        """
+        inode, offset = parse_cursor(cursor)
+        st = os.stat(self.path)
+        lines = []
+        reset = False
+
+        if inode and inode != st.st_ino:
+            rotated = self._find_rotated(inode)
+            if rotated:
+                lines, end = self._read_from(rotated, offset, limit)
+                if end < os.path.getsize(rotated):
+                    # More left in the rotated file, stay on it
+                    return _decode(lines), format_cursor(inode, end), False
+            else:
+                logger.info(f"Log cursor file is gone, restarting from the top of {self.path}")
+                reset = True
+            offset = 0
+        elif offset > st.st_size:
+            logger.info(f"Log file {self.path} was truncated, restarting from the top")
+            reset = True
+            offset = 0
+
+        remaining = None if limit is None else limit - len(lines)
+        more, end = self._read_from(self.path, offset, remaining)
+        return _decode(lines + more), format_cursor(st.st_ino, end), reset
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Print the tail of a file and its cursor for standalone testing
+    if len(sys.argv) < 2:
+        print("Usage: logtail.py FILE [LINES]")
+        sys.exit(1)
+
+    tailer = LogTailer(sys.argv[1])
+    lines, cursor = tailer.tail(int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+    for line in lines:
+        print(line)
+    print(f"cursor: {cursor}")
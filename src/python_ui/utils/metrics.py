@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Native system metrics collection for Pipe Network PoP Web UI.
+Reads /proc and statvfs directly instead of forking shell pipelines, and
+derives CPU usage and network throughput from deltas between samples.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# TCP state code for ESTABLISHED in /proc/net/tcp
+TCP_ESTABLISHED = "01"
+
+# Shortest interval, in seconds, over which CPU usage is reported; /proc/stat
+# counts in jiffies, so shorter deltas are mostly rounding noise
+MIN_CPU_INTERVAL = 0.5
+
+
+def read_cpu_times(proc_root: str = "/proc") -> Tuple[int, int]:
+    """
+    Read aggregate CPU jiffies from /proc/stat.
+
+    Returns:
+        Tuple[int, int]: (busy, total) jiffies since boot
+    """
+    with open(os.path.join(proc_root, "stat"), "r") as f:
+        fields = f.readline().split()
+
+    # cpu user nice system idle iowait irq softirq steal guest guest_nice
+    values = [int(v) for v in fields[1:9]]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    total = sum(values)
+    return total - idle, total
+
+
+def read_meminfo(proc_root: str = "/proc") -> Dict[str, int]:
+    """
+    Read /proc/meminfo into a dictionary of kB values.
+
+    Returns:
+        Dict[str, int]: Field name to value in kB
+    """
+    info = {}
+    with open(os.path.join(proc_root, "meminfo"), "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts:
+                try:
+                    info[key] = int(parts[0])
+                except ValueError:
+                    continue
+    return info
+
+
+def read_uptime(proc_root: str = "/proc") -> float:
+    """
+    Read system uptime in seconds from /proc/uptime.
+
+    Returns:
+        float: Seconds since boot
+    """
+    with open(os.path.join(proc_root, "uptime"), "r") as f:
+        return float(f.read().split()[0])
+
+
+def read_net_dev(proc_root: str = "/proc", interface: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Read received and transmitted byte counters from /proc/net/dev.
+
+    Args:
+        proc_root (str): Mount point of procfs
+        interface (str, optional): Only count this interface; all non-loopback
+            interfaces are summed when omitted
+
+    Returns:
+        Tuple[int, int]: (rx_bytes, tx_bytes)
+    """
+    rx_total = 0
+    tx_total = 0
+    with open(os.path.join(proc_root, "net", "dev"), "r") as f:
+        # First two lines are headers
+        for line in f.readlines()[2:]:
+            name, _, data = line.partition(":")
+            name = name.strip()
+            if interface and name != interface:
+                continue
+            if not interface and name == "lo":
+                continue
+            fields = data.split()
+            if len(fields) >= 9:
+                rx_total += int(fields[0])
+                tx_total += int(fields[8])
+    return rx_total, tx_total
+
+
+def count_established(ports: Iterable[int], proc_root: str = "/proc") -> int:
+    """
+    Count established TCP connections on the given local ports.
+
+    Args:
+        ports (Iterable[int]): Local ports the node listens on
+        proc_root (str): Mount point of procfs
+
+    Returns:
+        int: Number of established connections
+    """
+    wanted = {int(p) for p in ports}
+    if not wanted:
+        return 0
+
+    count = 0
+    for name in ("tcp", "tcp6"):
+        path = os.path.join(proc_root, "net", name)
+        try:
+            with open(path, "r") as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 4 or fields[3] != TCP_ESTABLISHED:
+                        continue
+                    local_port = int(fields[1].rsplit(":", 1)[1], 16)
+                    if local_port in wanted:
+                        count += 1
+        except (IOError, OSError):
+            continue
+    return count
+
+
+def disk_usage_percent(path: str = "/") -> float:
+    """
+    Get disk usage for a mount point the way `df` reports it.
+
+    Args:
+        path (str): Any path on the filesystem to inspect
+
+    Returns:
+        float: Used space as a percentage of space available to users
+    """
+    st = os.statvfs(path)
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    available = st.f_bavail * st.f_frsize
+    if used + available == 0:
+        return 0.0
+    return round(used * 100.0 / (used + available), 1)
+
+
+def format_uptime(seconds: float) -> str:
+    """
+    Format seconds the same way as `uptime -p`.
+
+    Args:
+        seconds (float): Uptime in seconds
+
+    Returns:
+        str: Human readable uptime, e.g. "up 2 days, 3 hours, 4 minutes"
+    """
+    minutes_total = int(seconds) // 60
+    weeks, rem = divmod(minutes_total, 7 * 24 * 60)
+    days, rem = divmod(rem, 24 * 60)
+    hours, minutes = divmod(rem, 60)
+
+    parts = []
+    for value, unit in ((weeks, "week"), (days, "day"), (hours, "hour"), (minutes, "minute")):
+        if value:
+            parts.append(f"{value} {unit}{'s' if value != 1 else ''}")
+
+    if not parts:
+        parts.append("0 minutes")
+    return "up " + ", ".join(parts)
+
+
+class MetricsEngine:
+    """
+    In-process system metrics sampler.
+
+    Keeps the previous CPU and network counters so that each call to
+    sample() reports utilisation over the interval since the last call.
+    CPU usage is only measured over at least MIN_CPU_INTERVAL; a sample
+    taken sooner repeats the last figure, or the average since boot
+    before the first one. Safe to share between request threads.
+    """
+
+    def __init__(self, proc_root: str = "/proc", disk_path: str = "/",
+                 interface: Optional[str] = None, node_ports: Iterable[int] = ()):
+        self.proc_root = proc_root
+        self.disk_path = disk_path
+        self.interface = interface
+        self.node_ports = list(node_ports)
+        self._lock = threading.Lock()
+        self._last_cpu = None
+        self._last_cpu_time = None
+        self._last_cpu_percent = None
+        self._last_net = None
+        self._last_time = None
+
+        # Take a baseline so the first sample covers a real interval
+        self._prime()
+
+    def _prime(self):
+        try:
+            self._last_cpu = read_cpu_times(self.proc_root)
+            self._last_cpu_time = time.monotonic()
+            self._last_net = read_net_dev(self.proc_root, self.interface)
+            self._last_time = self._last_cpu_time
+        except (IOError, OSError, ValueError, IndexError) as e:
+            logger.debug(f"Could not prime metrics counters: {e}")
+
+    def _cpu_percent(self, now: float) -> float:
+        last = self._last_cpu
+        if last and now - self._last_cpu_time < MIN_CPU_INTERVAL:
+            # Keep the baseline so the next sample covers a longer interval
+            if self._last_cpu_percent is not None:
+                return self._last_cpu_percent
+            busy, total = read_cpu_times(self.proc_root)
+            return round(busy * 100.0 / total, 1) if total else 0.0
+
+        busy, total = read_cpu_times(self.proc_root)
+        self._last_cpu = (busy, total)
+        self._last_cpu_time = now
+
+        if last and total > last[1]:
+            self._last_cpu_percent = round((busy - last[0]) * 100.0 / (total - last[1]), 1)
+            return self._last_cpu_percent
+
+        # No interval yet, fall back to the average since boot
+        return round(busy * 100.0 / total, 1) if total else 0.0
+
+    def _net_rates(self, now: float) -> Tuple[float, float]:
+        rx, tx = read_net_dev(self.proc_root, self.interface)
+        last = self._last_net
+        elapsed = now - self._last_time if self._last_time else 0
+        self._last_net = (rx, tx)
+
+        # Counters can reset when an interface goes down
+        if not last or elapsed <= 0 or rx < last[0] or tx < last[1]:
+            return 0.0, 0.0
+        return (rx - last[0]) / elapsed, (tx - last[1]) / elapsed
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Collect a metrics sample.
+
+        Returns:
+            Dict[str, Any]: Metrics with the same keys the dashboard expects
+            (cpu, memory, disk, network, uptime, peers) plus raw details
+        """
+        metrics = {
+            'cpu': 0,
+            'memory': 0,
+            'disk': 0,
+            'network': 0,
+            'uptime': "00:00:00",
+            'peers': 0
+        }
+
+        with self._lock:
+            now = time.monotonic()
+
+            try:
+                metrics['cpu'] = self._cpu_percent(now)
+            except (IOError, OSError, ValueError, IndexError) as e:
+                logger.debug(f"CPU metrics unavailable: {e}")
+
+            try:
+                rx_rate, tx_rate = self._net_rates(now)
+                metrics['rx_bytes_per_sec'] = round(rx_rate, 1)
+                metrics['tx_bytes_per_sec'] = round(tx_rate, 1)
+                # Dashboard shows combined throughput in MB/s
+                metrics['network'] = round((rx_rate + tx_rate) / (1024 * 1024), 3)
+            except (IOError, OSError, ValueError) as e:
+                logger.debug(f"Network metrics unavailable: {e}")
+
+            self._last_time = now
+
+        try:
+            mem = read_meminfo(self.proc_root)
+            total = mem.get("MemTotal", 0)
+            available = mem.get("MemAvailable", mem.get("MemFree", 0))
+            if total:
+                metrics['memory'] = round((total - available) * 100.0 / total, 1)
+        except (IOError, OSError) as e:
+            logger.debug(f"Memory metrics unavailable: {e}")
+
+        try:
+            metrics['disk'] = disk_usage_percent(self.disk_path)
+        except OSError as e:
+            logger.debug(f"Disk metrics unavailable: {e}")
+
+        try:
+            uptime_seconds = read_uptime(self.proc_root)
+            metrics['uptime'] = format_uptime(uptime_seconds)
+            metrics['uptime_seconds'] = int(uptime_seconds)
+        except (IOError, OSError, ValueError, IndexError) as e:
+            logger.debug(f"Uptime unavailable: {e}")
+
+        metrics['peers'] = count_established(self.node_ports, self.proc_root)
+
+        return metrics
+
+
+if __name__ == '__main__':
+    # Print two samples one second apart for standalone testing
+    engine = MetricsEngine()
+    time.sleep(1)
+    for key, value in engine.sample().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,676 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Notification dispatcher for Pipe Network PoP alerts.
+Alerts are written to a persistent SQLite queue and delivered by a
+background thread per channel (log file, terminal, email), so a slow or
+unreachable mail server never holds up alert evaluation. Each channel
+retries failed deliveries with exponential backoff, is rate limited, and
+can group alerts raised close together into one digest message.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import smtplib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utils.alerts import LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Channel limits, overridable per channel with `notification_limits` in
+# alerts.json. rate/period: deliveries allowed per period seconds.
+# digest_window: seconds to wait for related alerts before sending.
+DEFAULT_LIMITS = {
+    'log': {'rate': 0, 'period': 60, 'digest_window': 0, 'max_attempts': 5},
+    'terminal': {'rate': 0, 'period': 60, 'digest_window': 0, 'max_attempts': 1},
+    'email': {'rate': 10, 'period': 3600, 'digest_window': 60, 'max_attempts': 8}
+}
+
+# Retry delays grow from BACKOFF_BASE seconds up to BACKOFF_MAX
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+# Channels that talk to another server
+REMOTE_CHANNELS = ('email',)
+
+# Seconds a claimed notification is reserved for the dispatcher delivering it
+CLAIM_LEASE = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    level TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    message TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    source TEXT,
+    created REAL NOT NULL,
+    next_attempt REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS notifications_due ON notifications (channel, status, next_attempt);
+CREATE TABLE IF NOT EXISTS sent (
+    channel TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sent_channel ON sent (channel, ts);
+"""
+
+Notification = Dict[str, Any]
+
+
+class NotificationQueue:
+    """
+    Persistent queue of notifications, one row per message and channel.
+
+    Several dispatchers (the alert daemon and one-off `pop alerts` calls)
+    can share a queue: a dispatcher claims the rows it is about to
+    deliver, which hides them from the others for CLAIM_LEASE seconds.
+    """
+
+    def __init__(self, path: str, timeout: float = 10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def put(self, channels: Iterable[str], level: str, subject: str, message: str,
+            group_key: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Queue a message for each channel, returns the number of rows added"""
+        now = time.time()
+        rows = [(channel, level, subject, message, group_key or subject, source, now, now)
+                for channel in channels]
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT INTO notifications (channel, level, subject, message, group_key, source, created, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def claim(self, channel: str, now: float, digest_window: float = 0,
+              limit: int = 1000) -> List[Notification]:
+        """
+        Claim the channel's due notifications.
+
+        Notifications sharing a group key are only claimed once the oldest
+        of them has waited `digest_window` seconds, so related alerts
+        arriving close together are delivered as one message.
+
+        Returns:
+            List[Notification]: Claimed rows, oldest first
+        """
+        with self._write() as conn:
+            rows = [dict(row) for row in conn.execute(
+                "SELECT * FROM notifications WHERE channel = ? AND status = 'pending' AND next_attempt <= ? "
+                "ORDER BY id LIMIT ?", (channel, now, limit))]
+            if digest_window > 0:
+                oldest = {}
+                for row in rows:
+                    oldest.setdefault(row['group_key'], row['created'])
+                rows = [row for row in rows if oldest[row['group_key']] <= now - digest_window]
+            if rows:
+                conn.executemany("UPDATE notifications SET next_attempt = ? WHERE id = ?",
+                                 [(now + CLAIM_LEASE, row['id']) for row in rows])
+        return rows
+
+    def delete(self, ids: Iterable[int]) -> None:
+        """Remove delivered notifications"""
+        with self._write() as conn:
+            conn.executemany("DELETE FROM notifications WHERE id = ?", [(i,) for i in ids])
+
+    def release(self, ids: Iterable[int], next_attempt: float) -> None:
+        """Return claimed notifications to the queue without counting an attempt"""
+        with self._write() as conn:
+            conn.executemany("UPDATE notifications SET next_attempt = ? WHERE id = ?",
+                             [(next_attempt, i) for i in ids])
+
+    def retry(self, ids: Iterable[int], error: str, max_attempts: int, now: float) -> int:
+        """
+        Record a failed attempt and schedule the next one with exponential
+        backoff. Rows that reached max_attempts are marked failed.
+
+        Returns:
+            int: Number of rows that gave up
+        """
+        ids = list(ids)
+        with self._write() as conn:
+            conn.executemany(
+                "UPDATE notifications SET attempts = attempts + 1, last_error = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END, "
+                "next_attempt = ? + MIN(?, ? * (1 << MIN(attempts, 20))) WHERE id = ?",
+                [(error[:500], max_attempts, now, BACKOFF_MAX, BACKOFF_BASE, i) for i in ids])
+            placeholders = ','.join('?' * len(ids))
+            return conn.execute(f"SELECT COUNT(*) FROM notifications WHERE status = 'failed' "
+                                f"AND id IN ({placeholders})", ids).fetchone()[0] if ids else 0
+
+    def record_sent(self, channel: str, ts: float, keep_after: float) -> None:
+        """Record a delivery on a channel, forgetting those at or before `keep_after`"""
+        with self._write() as conn:
+            conn.execute("DELETE FROM sent WHERE channel = ? AND ts <= ?", (channel, keep_after))
+            conn.execute("INSERT INTO sent (channel, ts) VALUES (?, ?)", (channel, ts))
+
+    def sent_since(self, channel: str, since: float) -> List[float]:
+        """Times of the channel's deliveries after `since`, oldest first"""
+        return [row[0] for row in self._conn().execute(
+            "SELECT ts FROM sent WHERE channel = ? AND ts > ? ORDER BY ts", (channel, since))]
+
+    def next_due(self, channel: str) -> Optional[float]:
+        """Time the channel's next pending notification becomes due"""
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt) FROM notifications WHERE channel = ? AND status = 'pending'",
+            (channel,)).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Pending and failed counts per channel"""
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in self._conn().execute(
+                "SELECT channel, status, COUNT(*) FROM notifications GROUP BY channel, status"):
+            stats.setdefault(row[0], {'pending': 0, 'failed': 0})[row[1]] = row[2]
+        return stats
+
+    def failed(self, limit: int = 20) -> List[Notification]:
+        """Notifications that gave up, newest first"""
+        return [dict(row) for row in self._conn().execute(
+            "SELECT * FROM notifications WHERE status = 'failed' ORDER BY id DESC LIMIT ?", (limit,))]
+
+    def purge_failed(self) -> int:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM notifications WHERE status = 'failed'").rowcount
+
+
+class LogChannel:
+    """Append notifications to the alerts log, keeping the last `limit` entries"""
+
+    def __init__(self, path: str, limit: int = 1000):
+        self.path = path
+        self.limit = limit
+        self._lines = None
+
+    def send(self, level: str, subject: str, message: str) -> None:
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        # Digest bodies are one alert per line, each gets its own entry
+        entries = [f"[{timestamp}] [{level}] {line.lstrip('- ')}\n"
+                   for line in message.splitlines() if line.strip()]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.writelines(entries)
+        if self._lines is None:
+            with open(self.path, 'r', errors='replace') as f:
+                self._lines = sum(1 for _ in f)
+        else:
+            self._lines += len(entries)
+
+        # Trim once the log is 10% over the limit rather than on every write
+        if self.limit and self._lines > self.limit * 1.1:
+            with open(self.path, 'r', errors='replace') as f:
+                keep = deque(f, maxlen=self.limit)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                f.writelines(keep)
+            os.replace(temp_path, self.path)
+            self._lines = len(keep)
+
+
+class TerminalChannel:
+    """Print notifications, coloured like alerts.sh"""
+
+    COLORS = {'info': '\033[0;36m', 'warning': '\033[1;33m', 'critical': '\033[0;31m'}
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, level: str, subject: str, message: str) -> None:
+        color = self.COLORS.get(level, '') if self.stream.isatty() else ''
+        reset = '\033[0m' if color else ''
+        lines = message.splitlines()
+        if len(lines) > 1:
+            print(f"{color}{level.upper()}{reset}: {subject}", file=self.stream)
+            for line in lines:
+                print(f"  {line}", file=self.stream)
+        else:
+            print(f"{color}{level.upper()}{reset}: {message}", file=self.stream)
+        self.stream.flush()
+
+
+class EmailChannel:
+    """
+    Send notifications through an SMTP server.
+
+    Port 465 uses implicit TLS; on other ports STARTTLS is used when the
+    server offers it (and `use_tls` is not False).
+    """
+
+    def __init__(self, server: str, from_address: str, to_address: str, port: int = 587,
+                 username: str = '', password: str = '', use_tls: Optional[bool] = None,
+                 timeout: float = 20):
+        self.server = server
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.from_address = from_address
+        self.to_address = to_address
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> 'EmailChannel':
+        """
+        Build from the `email_settings` section of alerts.json.
+
+        Raises:
+            ValueError: If the server or an address is missing
+        """
+        if not settings.get('smtp_server') or not settings.get('from_address') or not settings.get('to_address'):
+            raise ValueError("missing required email settings (smtp_server, from_address, to_address)")
+        return cls(settings['smtp_server'], settings['from_address'], settings['to_address'],
+                   port=settings.get('smtp_port') or 587,
+                   username=settings.get('smtp_username') or '',
+                   password=settings.get('smtp_password') or '',
+                   use_tls=settings.get('use_tls'))
+
+    def send(self, level: str, subject: str, message: str) -> None:
+        msg = EmailMessage()
+        msg['Subject'] = f"Pipe Network Node Alert: {subject}"
+        msg['From'] = self.from_address
+        msg['To'] = self.to_address
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid()
+        msg.set_content(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{level}]\n\n{message}\n\n---\n"
+                        "Sent by Pipe Network PoP Node Management Tools\n")
+
+        if self.port == 465 and self.use_tls is not False:
+            smtp = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        with smtp:
+            smtp.ehlo()
+            if self.port != 465 and self.use_tls is not False and smtp.has_extn('starttls'):
+                smtp.starttls()
+                smtp.ehlo()
+            elif self.use_tls and self.port != 465:
+                raise smtplib.SMTPException("server does not support STARTTLS")
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(msg)
+
+
+class _RateLimiter:
+    """
+    Allow `rate` deliveries on a channel per sliding `period` seconds (0
+    means unlimited). Delivery times are kept in the queue database, so
+    the daemon and one-off `pop alerts` calls share one budget.
+    """
+
+    def __init__(self, queue: NotificationQueue, channel: str, rate: int, period: float):
+        self.queue = queue
+        self.channel = channel
+        self.rate = int(rate)
+        self.period = float(period)
+
+    def _recent(self, now: float) -> List[float]:
+        return self.queue.sent_since(self.channel, now - self.period)
+
+    def available(self, now: float) -> int:
+        if self.rate <= 0:
+            return sys.maxsize
+        return self.rate - len(self._recent(now))
+
+    def take(self, now: float) -> None:
+        if self.rate > 0:
+            self.queue.record_sent(self.channel, now, now - self.period)
+
+    def next_free(self, now: float) -> float:
+        recent = self._recent(now)
+        return recent[0] + self.period if recent else now
+
+
+def build_digest(rows: List[Notification]) -> Tuple[str, str, str]:
+    """
+    Combine notifications into one message.
+
+    Rows sharing a group key (the same rule) become "<subject> on N nodes";
+    anything else becomes a list of "N alerts".
+
+    Returns:
+        Tuple[str, str, str]: level, subject, message
+    """
+    level = max((row['level'] for row in rows), key=lambda l: LEVELS.index(l) if l in LEVELS else 0)
+    if len(rows) == 1:
+        return level, rows[0]['subject'], rows[0]['message']
+
+    groups = {row['group_key'] for row in rows}
+    if len(groups) == 1:
+        sources = {row['source'] for row in rows if row['source']}
+        count = f"{len(sources)} nodes" if len(sources) > 1 else f"{len(rows)} alerts"
+        subject = f"{rows[0]['subject']} on {count}" if len(sources) > 1 else f"{rows[0]['subject']} ({count})"
+    else:
+        subject = f"{len(rows)} alerts ({sum(row['level'] == 'critical' for row in rows)} critical)"
+    message = "\n".join(f"- {row['message']}" for row in rows)
+    return level, subject, message
+
+
+class Dispatcher:
+    """
+    Deliver queued notifications with retries, rate limits and digests.
+
+    enqueue() only writes to the queue; delivery happens in flush(),
+    called by one background thread per channel after start(), or
+    directly for one-off delivery.
+    """
+
+    def __init__(self, queue: NotificationQueue, channels: Mapping[str, Any],
+                 limits: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self.queue = queue
+        self.channels = dict(channels)
+        self.limits = {}
+        self._limiters = {}
+        for name in self.channels:
+            limit = dict(DEFAULT_LIMITS.get(name, DEFAULT_LIMITS['log']), **((limits or {}).get(name) or {}))
+            self.limits[name] = limit
+            self._limiters[name] = _RateLimiter(queue, name, limit['rate'], limit['period'])
+        self._wake = {name: threading.Event() for name in self.channels}
+        self._stop = threading.Event()
+        self._threads = []
+        self.sent = {name: 0 for name in self.channels}
+
+    def enqueue(self, event: Mapping[str, Any]) -> int:
+        """
+        Queue an alert for every channel.
+
+        Args:
+            event (Mapping): An AlertEngine event, or any mapping with
+                level, subject and message (rule and source are used for
+                digests when present)
+
+        Returns:
+            int: Number of queued deliveries
+        """
+        count = self.queue.put(self.channels, event.get('level', 'info'), event.get('subject', 'Alert'),
+                               event['message'], group_key=event.get('rule') or event.get('subject'),
+                               source=event.get('source'))
+        for wake in self._wake.values():
+            wake.set()
+        return count
+
+    def flush(self, channels: Optional[Iterable[str]] = None, now: Optional[float] = None,
+              digest: bool = True) -> int:
+        """
+        Deliver due notifications.
+
+        Args:
+            channels (Iterable[str], optional): Only these channels
+            now (float, optional): Current time, for tests
+            digest (bool): Wait out digest windows; False delivers all due
+                notifications now (still grouped by rule)
+
+        Returns:
+            int: Messages sent
+        """
+        sent = 0
+        for name in (channels if channels is not None else list(self.channels)):
+            if name in self.channels:
+                sent += self._flush(name, time.time() if now is None else now, digest)
+        return sent
+
+    def drain(self, channels: Optional[Iterable[str]] = None, wait: float = 0) -> int:
+        """
+        Deliver due notifications, then keep delivering for up to `wait`
+        seconds as digest windows close, so a short-lived process still
+        groups alerts raised close together.
+
+        Returns:
+            int: Messages sent
+        """
+        names = [name for name in (channels if channels is not None else self.channels)
+                 if name in self.channels]
+        deadline = time.time() + wait
+        sent = self.flush(names)
+        while True:
+            wakes = []
+            for name in names:
+                next_due = self.queue.next_due(name)
+                if next_due is not None:
+                    wakes.append(next_due + self.limits[name]['digest_window'])
+            if not wakes or min(wakes) > deadline:
+                return sent
+            time.sleep(max(0.05, min(wakes) - time.time()))
+            sent += self.flush(names)
+
+    def _flush(self, name: str, now: float, digest: bool = True) -> int:
+        limit = self.limits[name]
+        limiter = self._limiters[name]
+        rows = self.queue.claim(name, now, limit['digest_window'] if digest else 0)
+        if not rows:
+            return 0
+
+        # One message per group key when digesting, otherwise one per row
+        if limit['digest_window'] > 0:
+            batches = {}
+            for row in rows:
+                batches.setdefault(row['group_key'], []).append(row)
+            batches = list(batches.values())
+        else:
+            batches = [[row] for row in rows]
+
+        # Out of rate budget: fold what is left into a single digest
+        available = limiter.available(now)
+        if available <= 0:
+            self.queue.release([row['id'] for row in rows], limiter.next_free(now))
+            return 0
+        if len(batches) > available:
+            batches = batches[:available - 1] + [[row for batch in batches[available - 1:] for row in batch]]
+
+        sent = 0
+        for batch in batches:
+            ids = [row['id'] for row in batch]
+            try:
+                self.channels[name].send(*build_digest(batch))
+            except Exception as e:
+                gave_up = self.queue.retry(ids, str(e), limit['max_attempts'], time.time())
+                logger.warning(f"Sending {len(batch)} notification(s) via {name} failed: {e}")
+                if gave_up:
+                    logger.error(f"Gave up on {gave_up} {name} notification(s) after {limit['max_attempts']} attempts")
+                continue
+            limiter.take(now)
+            self.queue.delete(ids)
+            sent += 1
+        self.sent[name] += sent
+        return sent
+
+    def _run(self, name: str):
+        wake = self._wake[name]
+        while not self._stop.is_set():
+            try:
+                self._flush(name, time.time())
+                next_due = self.queue.next_due(name)
+            except Exception as e:
+                logger.error(f"Notification dispatcher for {name} failed: {e}")
+                next_due = None
+            now = time.time()
+            if next_due is not None and self.limits[name]['digest_window'] > 0:
+                next_due = max(next_due, now + 1)
+            wait = 30.0 if next_due is None else min(30.0, max(0.05, next_due - now))
+            wake.wait(wait)
+            wake.clear()
+
+    def start(self):
+        """Start a delivery thread per channel"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for name in self.channels:
+            thread = threading.Thread(target=self._run, args=(name,), name=f"pipe-notify-{name}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the delivery threads; undelivered notifications stay queued"""
+        self._stop.set()
+        for wake in self._wake.values():
+            wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+def channels_from_config(config: Mapping[str, Any], log_file: str,
+                         terminal: bool = True) -> Dict[str, Any]:
+    """
+    Build the channels enabled in alerts.json `notification_methods`.
+    Log and terminal default to on, email to off. Email is skipped with a
+    warning when its settings are incomplete.
+    """
+    methods = config.get('notification_methods') or {}
+    channels = {}
+    if methods.get('log', True):
+        channels['log'] = LogChannel(log_file, int(config.get('log_size_limit', 1000)))
+    if terminal and methods.get('terminal', True):
+        channels['terminal'] = TerminalChannel()
+    if methods.get('email', False):
+        try:
+            channels['email'] = EmailChannel.from_settings(config.get('email_settings') or {})
+        except ValueError as e:
+            logger.warning(f"Email notifications disabled: {e}")
+    return channels
+
+
+def dispatcher_from_config(config: Mapping[str, Any], alerts_dir: str, terminal: bool = True) -> Dispatcher:
+    """Dispatcher with the queue and notifications log in the alerts directory"""
+    return Dispatcher(
+        NotificationQueue(os.path.join(alerts_dir, 'notify-queue.db')),
+        channels_from_config(config, os.path.join(alerts_dir, 'notifications.log'), terminal=terminal),
+        limits=config.get('notification_limits')
+    )
+
+
+def deliver_queued(dispatcher: Dispatcher, config_path: str) -> None:
+    """
+    Deliver everything queued by a short-lived process: local channels
+    right away, remote channels from a detached `flush` so a slow mail
+    server does not hold up the caller. The detached flush waits out the
+    digest windows, and rate limits are shared through the queue.
+    """
+    dispatcher.flush([name for name in dispatcher.channels if name not in REMOTE_CHANNELS], digest=False)
+    remote = [name for name in dispatcher.channels if name in REMOTE_CHANNELS]
+    if not remote or not any(dispatcher.queue.next_due(name) is not None for name in remote):
+        return
+    import subprocess
+    wait = max(dispatcher.limits[name]['digest_window'] for name in remote) + 5
+    command = [sys.executable, '-m', 'utils.notify', '--config', os.path.abspath(config_path),
+               'flush', '--wait', str(wait)]
+    for name in remote:
+        command += ['--channel', name]
+    subprocess.Popen(command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+    import json
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.alerts import load_alerts_config
+
+    parser = argparse.ArgumentParser(description='Pipe Network PoP notification dispatcher')
+    parser.add_argument('--config', required=True, help='alerts.json')
+    sub = parser.add_subparsers(dest='command')
+    p_send = sub.add_parser('send', help='Queue a notification and deliver what is due')
+    p_send.add_argument('level', choices=LEVELS)
+    p_send.add_argument('subject')
+    p_send.add_argument('message')
+    p_flush = sub.add_parser('flush', help='Deliver due notifications')
+    p_flush.add_argument('--channel', action='append', help='Only deliver via this channel')
+    p_flush.add_argument('--now', action='store_true', help='Do not wait for digest windows')
+    p_flush.add_argument('--wait', type=float, default=0,
+                         help='Keep delivering for this many seconds as digest windows close')
+    p_run = sub.add_parser('run', help='Deliver notifications until interrupted')
+    p_run.add_argument('--no-terminal', action='store_true', help='Do not print notifications')
+    p_status = sub.add_parser('status', help='Show queued and failed notifications')
+    p_status.add_argument('--json', action='store_true')
+    sub.add_parser('purge', help='Delete notifications that gave up')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    config = load_alerts_config(args.config)
+    dispatcher = dispatcher_from_config(config, os.path.dirname(os.path.abspath(args.config)),
+                                        terminal=not getattr(args, 'no_terminal', False))
+
+    if args.command == 'send':
+        dispatcher.enqueue({'level': args.level, 'subject': args.subject, 'message': args.message})
+        deliver_queued(dispatcher, args.config)
+    elif args.command == 'flush':
+        if args.wait > 0 and not args.now:
+            sent = dispatcher.drain(args.channel, args.wait)
+        else:
+            sent = dispatcher.flush(args.channel, digest=not args.now)
+        print(f"Sent {sent} message(s)")
+    elif args.command == 'run':
+        dispatcher.start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.stop()
+    elif args.command == 'status':
+        stats = dispatcher.queue.stats()
+        failed = dispatcher.queue.failed()
+        if args.json:
+            print(json.dumps({'queued': stats, 'failed': failed}, indent=2))
+            return 0
+        if not stats:
+            print("No queued notifications")
+        for channel, counts in sorted(stats.items()):
+            print(f"{channel:<10} {counts.get('pending', 0)} pending, {counts.get('failed', 0)} failed")
+        for row in failed:
+            print(f"  failed {row['channel']}: {row['subject']} ({row['attempts']} attempts: {row['last_error']})")
+    elif args.command == 'purge':
+        print(f"Deleted {dispatcher.queue.purge_failed()} failed notification(s)")
+    else:
+        parser.print_help()
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenMetrics text exposition for Pipe Network PoP Web UI.
+Builds the /metrics page from values the UI already has in memory and
+keeps the rendered page for a few seconds, so frequent scrapes from many
+collectors cost one render per interval and never run a command.
+"""
+
+import math
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+TEXT_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+KINDS = ('gauge', 'counter', 'histogram', 'info', 'unknown')
+
+Labels = Optional[Mapping[str, Any]]
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + '}'
+
+
+def format_value(value: Any) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def accepts_openmetrics(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for OpenMetrics rather than the Prometheus text format"""
+    return bool(accept) and 'application/openmetrics-text' in accept
+
+
+class Exposition:
+    """
+    Collects metric families and renders them as OpenMetrics text, or as
+    Prometheus text format 0.0.4 for collectors that do not ask for
+    OpenMetrics. Families without samples are left out.
+    """
+
+    def __init__(self):
+        self._families: List[Tuple[str, str, str, Optional[str], List[Tuple[str, str, str]]]] = []
+
+    def add(self, name: str, kind: str, help_text: str,
+            samples: Iterable[Tuple[Labels, Any]], unit: Optional[str] = None) -> None:
+        """
+        Add a metric family.
+
+        Args:
+            name: Family name, without the _total suffix for counters
+            kind: One of KINDS
+            help_text: Description for the HELP line
+            samples: (labels, value) pairs, None values are skipped
+            unit: Unit for the UNIT line, which must end the family name
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown metric type: {kind}")
+        suffix = '_total' if kind == 'counter' else ''
+        lines = [(suffix, format_labels(labels), format_value(value))
+                 for labels, value in samples if value is not None]
+        if lines:
+            self._families.append((name, kind, help_text, unit, lines))
+
+    def gauge(self, name: str, help_text: str, value: Any, labels: Labels = None,
+              unit: Optional[str] = None) -> None:
+        self.add(name, 'gauge', help_text, [(labels, value)], unit)
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, Any]]) -> None:
+        self.add(name, 'counter', help_text, samples)
+
+    def histogram(self, name: str, help_text: str, series: Iterable[Tuple[Labels, Iterable[Tuple[float, int]], float, int]],
+                  unit: Optional[str] = None) -> None:
+        """
+        Add a histogram family.
+
+        Args:
+            series: (labels, cumulative (upper bound, count) buckets, sum, count)
+                per label set; the +Inf bucket is added from the count
+        """
+        lines = []
+        for labels, buckets, total, count in series:
+            labels = dict(labels or {})
+            for bound, cumulative in buckets:
+                lines.append(('_bucket', format_labels(dict(labels, le=format_value(bound))), str(cumulative)))
+            lines.append(('_bucket', format_labels(dict(labels, le='+Inf')), str(count)))
+            lines.append(('_sum', format_labels(labels), format_value(total)))
+            lines.append(('_count', format_labels(labels), str(count)))
+        if lines:
+            self._families.append((name, 'histogram', help_text, unit, lines))
+
+    def render(self, openmetrics: bool = True) -> str:
+        out = []
+        for name, kind, help_text, unit, lines in self._families:
+            # The 0.0.4 format names counter families after their samples
+            family = name if openmetrics or kind != 'counter' else f"{name}_total"
+            out.append(f"# HELP {family} {help_text}")
+            out.append(f"# TYPE {family} {kind if openmetrics or kind != 'info' else 'gauge'}")
+            if unit and openmetrics:
+                out.append(f"# UNIT {family} {unit}")
+            for suffix, labels, value in lines:
+                if kind == 'info' and not openmetrics:
+                    suffix = '_info'
+                out.append(f"{name}{suffix}{labels} {value}")
+        if openmetrics:
+            out.append('# EOF')
+        return '\n'.join(out) + '\n'
+
+
+class CachedExposition:
+    """
+    Renders an Exposition built by `build()` at most once per `ttl` seconds.
+    Concurrent scrapes while a render is in progress wait for it and share
+    the result.
+    """
+
+    def __init__(self, build: Callable[[], Exposition], ttl: float = 5.0):
+        self.build = build
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[bool, Tuple[float, bytes]] = {}
+        self.renders = 0
+
+    def render(self, openmetrics: bool = True) -> bytes:
+        cached = self._cache.get(openmetrics)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        with self._lock:
+            cached = self._cache.get(openmetrics)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+            body = self.build().render(openmetrics).encode('utf-8')
+            self._cache[openmetrics] = (time.monotonic(), body)
+            self.renders += 1
+            return body
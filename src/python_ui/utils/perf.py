@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Performance instrumentation for Pipe Network PoP Web UI.
+Latency histograms per route and per command, cheap enough to leave on,
+and an opt-in sampling profiler that records collapsed stacks (one line
+per stack, frames separated by ';', followed by the sample count) for
+flame graph tools.
+"""
+
+import os
+import sys
+import time
+import bisect
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from a cached API response to a slow pop command
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Label used once a recorder has seen max_keys distinct routes or commands
+OTHER = 'other'
+
+
+def command_name(command: Union[str, Sequence[str]]) -> str:
+    """Short label for a command: the program name and its subcommand"""
+    parts = command.split() if isinstance(command, str) else list(command)
+    if not parts:
+        return ''
+    name = os.path.basename(str(parts[0]))
+    if len(parts) > 1 and not str(parts[1]).startswith('-'):
+        name = f"{name} {parts[1]}"
+    return name
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it) for each finite bucket"""
+        total, buckets = 0, []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for index, count in enumerate(self.counts):
+            upper = self.bounds[index] if index < len(self.bounds) else self.max
+            if count and seen + count >= rank:
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+            lower = upper
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.sum * 1000, 2),
+            'avg_ms': round(self.sum * 1000 / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class PerfRecorder:
+    """
+    Request and command timings.
+
+    Each observation takes one short lock, so recording can stay on in
+    production. Route and command labels are capped at `max_keys`; later
+    ones are counted under OTHER.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, max_keys: int = 200):
+        self.buckets = tuple(buckets)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests: Dict[Tuple[str, str], Histogram] = {}
+            self._statuses: Counter = Counter()
+            self._commands: Dict[str, Histogram] = {}
+            self._command_exec: Counter = Counter()
+            self._command_failures: Counter = Counter()
+            self._command_timeouts: Counter = Counter()
+            self.since = time.time()
+
+    def _observe(self, table: Dict, key, seconds: float):
+        """Add an observation to the histogram for `key`, returning the key used"""
+        histogram = table.get(key)
+        if histogram is None:
+            if len(table) >= self.max_keys:
+                key = (OTHER,) * len(key) if isinstance(key, tuple) else OTHER
+                histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        return key
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float) -> None:
+        with self._lock:
+            route, method = self._observe(self._requests, (route, method), seconds)
+            self._statuses[(route, method, status)] += 1
+
+    def observe_command(self, command: Union[str, Sequence[str]], seconds: float,
+                        result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record one run_command() call.
+
+        Args:
+            command: The command line
+            seconds: Time the caller waited, including queueing
+            result: execute() result, for the time spent in the process and failures
+        """
+        with self._lock:
+            name = self._observe(self._commands, command_name(command), seconds)
+            if result is not None:
+                self._command_exec[name] += result.get('duration', 0.0)
+                if not result.get('success'):
+                    self._command_failures[name] += 1
+                if result.get('timed_out'):
+                    self._command_timeouts[name] += 1
+
+    def request_histograms(self) -> List[Tuple[Tuple[str, str], Histogram]]:
+        with self._lock:
+            return sorted(self._requests.items())
+
+    def request_counts(self) -> List[Tuple[Tuple[str, str, int], int]]:
+        with self._lock:
+            return sorted(self._statuses.items())
+
+    def command_histograms(self) -> List[Tuple[str, Histogram]]:
+        with self._lock:
+            return sorted(self._commands.items())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summaries of every route and command, slowest total time first"""
+        with self._lock:
+            routes = []
+            for (route, method), histogram in self._requests.items():
+                entry = dict(histogram.to_dict(), route=route, method=method)
+                entry['status'] = {str(status): count for (r, m, status), count in self._statuses.items()
+                                   if r == route and m == method}
+                routes.append(entry)
+            commands = []
+            for name, histogram in self._commands.items():
+                entry = dict(histogram.to_dict(), command=name)
+                entry['exec_ms'] = round(self._command_exec[name] * 1000, 2)
+                entry['failures'] = self._command_failures[name]
+                entry['timeouts'] = self._command_timeouts[name]
+                commands.append(entry)
+        routes.sort(key=lambda e: -e['total_ms'])
+        commands.sort(key=lambda e: -e['total_ms'])
+        return {'since': self.since, 'routes': routes, 'commands': commands}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})".replace(';', ':')
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every `interval` seconds while
+    running. Costs nothing while stopped; while running, one thread walks
+    the other threads' frames at the sampling rate.
+    """
+
+    def __init__(self, interval: float = 0.01, max_stacks: int = 20000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._stacks: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+        self.until: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: Optional[float] = None, interval: Optional[float] = None,
+              reset: bool = True) -> bool:
+        """
+        Start sampling, for `duration` seconds or until stop().
+
+        Returns:
+            bool: False if the profiler was already running
+        """
+        if self.running:
+            return False
+        if interval:
+            self.interval = max(0.001, interval)
+        if reset:
+            with self._lock:
+                self._stacks = Counter()
+                self.samples = 0
+        self._stop.clear()
+        self.started = time.time()
+        self.stopped = None
+        self.until = self.started + duration if duration else None
+        self._thread = threading.Thread(target=self._run, name='pipe-ui-profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"Profiler started, sampling every {self.interval * 1000:g}ms"
+                    + (f" for {duration:g}s" if duration else ""))
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(1.0)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        try:
+            while not self._stop.wait(self.interval):
+                if self.until and time.time() >= self.until:
+                    break
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                sampled = []
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, str(ident)))
+                    sampled.append(';'.join(reversed(stack)))
+                with self._lock:
+                    for stack in sampled:
+                        if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                            self._stacks[stack] += 1
+                    self.samples += 1
+        finally:
+            self.stopped = time.time()
+            logger.info(f"Profiler stopped after {self.samples} samples")
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        """Collapsed stacks, most frequent first"""
+        with self._lock:
+            stacks = self._stacks.most_common(limit)
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'samples': self.samples,
+            'stacks': len(self._stacks),
+            'started': self.started,
+            'stopped': self.stopped,
+            'until': self.until
+        }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background sampler for Pipe Network PoP Web UI.
+Refreshes registered data sources on a single thread and publishes an
+immutable, versioned snapshot that request handlers can read in O(1).
+Sources that may block, such as commands and imports, run on threads of
+their own so they never hold up the fast ones.
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# An immutable view of all sources at one point in time.
+# `data` maps source name to its latest value, `updated` maps source name to
+# the wall-clock time it was refreshed.
+Snapshot = namedtuple('Snapshot', ['version', 'data', 'updated', 'timestamp'])
+
+EMPTY_SNAPSHOT = Snapshot(version=0, data={}, updated={}, timestamp=0.0)
+
+
+class Sampler:
+    """
+    Periodically refresh named sources, each with its own TTL.
+
+    The sampler wakes every `interval` seconds and only calls the sources
+    whose TTL has expired, so slow sources (such as `pop status`) can be
+    refreshed far less often than cheap ones (such as CPU usage).
+    Background sources run on a thread each and publish a new snapshot
+    when they complete. Listeners are called in snapshot order on a thread
+    of their own once the sampler is started.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._sources = {}
+        self._due = {}
+        self._snapshot = EMPTY_SNAPSHOT
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+        self._running = set()
+        # Listener thread and its queue of (previous, current) snapshots
+        self._notifier = None
+        # Seconds the latest call to each source took
+        self.durations = {}
+
+    def add_source(self, name: str, func: Callable[[], Any], ttl: float,
+                   when: Optional[Callable[[], bool]] = None, background: bool = False):
+        """
+        Register a data source.
+
+        Args:
+            name (str): Key the value is published under
+            func (Callable): Zero-argument function returning the value
+            ttl (float): Seconds a value stays fresh before it is refreshed
+            when (Callable, optional): Only refresh while this returns True
+            background (bool): Call `func` on a thread of its own, for
+                sources that may block; at most one call runs at a time
+        """
+        self._sources[name] = (func, float(ttl), when, background)
+        self._due[name] = 0.0
+
+    def add_listener(self, func: Callable[[Snapshot, Snapshot], None]):
+        """Call `func(previous, current)` after each new snapshot is published"""
+        self._listeners.append(func)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Mark one source (or all sources) stale and wake the sampler"""
+        for key in ([name] if name else list(self._due)):
+            if key in self._due:
+                self._due[key] = 0.0
+        self._wake.set()
+
+    def refresh(self, force: bool = False) -> Snapshot:
+        """
+        Refresh every source whose TTL has expired and publish a snapshot.
+
+        Background sources are only started; their values are published
+        when they complete.
+
+        Args:
+            force (bool): Refresh all sources regardless of TTL
+
+        Returns:
+            Snapshot: The current snapshot after refreshing
+        """
+        with self._refresh_lock:
+            now = time.monotonic()
+            values = {}
+
+            for name, (func, ttl, when, background) in self._sources.items():
+                if not force and self._due[name] > now:
+                    continue
+                if when is not None and not when():
+                    continue
+
+                if background:
+                    if name not in self._running:
+                        self._running.add(name)
+                        self._due[name] = now + ttl
+                        threading.Thread(target=self._refresh_background, args=(name, func, ttl),
+                                         name=f"pipe-ui-sampler-{name}", daemon=True).start()
+                    continue
+
+                ok, value = self._call(name, func, ttl)
+                if ok:
+                    values[name] = value
+
+            return self._publish(values)
+
+    def _call(self, name: str, func: Callable[[], Any], ttl: float):
+        started = time.perf_counter()
+        try:
+            value = func()
+        except Exception as e:
+            logger.error(f"Sampler source '{name}' failed: {e}")
+            self._due[name] = time.monotonic() + ttl
+            return False, None
+        finally:
+            self.durations[name] = round(time.perf_counter() - started, 6)
+        self._due[name] = time.monotonic() + ttl
+        return True, value
+
+    def _refresh_background(self, name: str, func: Callable[[], Any], ttl: float):
+        try:
+            ok, value = self._call(name, func, ttl)
+        finally:
+            with self._refresh_lock:
+                self._running.discard(name)
+        if ok:
+            with self._refresh_lock:
+                self._publish({name: value})
+
+    def _publish(self, values: dict) -> Snapshot:
+        """Publish a snapshot with new source values; the refresh lock must be held"""
+        current = self._snapshot
+        if not values:
+            return current
+
+        now = time.time()
+        # Swapping the reference is atomic, readers never see a partial update
+        snapshot = Snapshot(
+            version=current.version + 1,
+            data=dict(current.data, **values),
+            updated=dict(current.updated, **{name: now for name in values}),
+            timestamp=now
+        )
+        self._snapshot = snapshot
+
+        # Queued in publish order, so listeners see snapshots in order
+        if self._notifier is not None:
+            self._notifier[1].put((current, snapshot))
+        else:
+            self._notify(current, snapshot)
+        return snapshot
+
+    def _notify(self, previous: Snapshot, current: Snapshot):
+        for listener in self._listeners:
+            try:
+                listener(previous, current)
+            except Exception as e:
+                logger.error(f"Sampler listener failed: {e}")
+
+    def _run_listeners(self, notifications: queue.Queue):
+        while True:
+            item = notifications.get()
+            if item is None:
+                break
+            self._notify(*item)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Get the latest snapshot.
+
+        The first call before the background thread has produced anything
+        refreshes synchronously so callers never see an empty snapshot.
+
+        Returns:
+            Snapshot: The latest published snapshot
+        """
+        snapshot = self._snapshot
+        if snapshot.version == 0:
+            snapshot = self.refresh()
+        return snapshot
+
+    def age(self, name: Optional[str] = None) -> Optional[float]:
+        """Seconds since a source (or the snapshot) was last refreshed"""
+        snapshot = self._snapshot
+        ts = snapshot.updated.get(name) if name else snapshot.timestamp
+        if not ts:
+            return None
+        return round(max(0.0, time.time() - ts), 3)
+
+    def _run(self):
+        logger.info(f"Sampler started (interval {self.interval}s)")
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        logger.info("Sampler stopped")
+
+    def start(self):
+        """Start the background thread if it is not already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        with self._refresh_lock:
+            if self._notifier is None:
+                notifications = queue.Queue()
+                thread = threading.Thread(target=self._run_listeners, args=(notifications,),
+                                          name="pipe-ui-sampler-listeners")
+                thread.daemon = True
+                thread.start()
+                self._notifier = (thread, notifications)
+        self._thread = threading.Thread(target=self._run, name="pipe-ui-sampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._refresh_lock:
+            notifier, self._notifier = self._notifier, None
+        if notifier:
+            # Listeners already queued still run, then the thread exits
+            thread, notifications = notifier
+            notifications.put(None)
+            thread.join(timeout)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Production serving mode for Pipe Network PoP Web UI.
+Serves the WSGI app with a fixed pool of worker threads, HTTP/1.1
+keep-alive, a connection limit and graceful shutdown on SIGTERM/SIGINT.
+Uses waitress when it is installed and a bounded Werkzeug server otherwise.
+"""
+
+import signal
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+logger = logging.getLogger(__name__)
+
+SERVICE_UNAVAILABLE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"Content-Length: 20\r\n"
+    b"Connection: close\r\n\r\n"
+    b"Server is overloaded"
+)
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Request handler that keeps HTTP/1.1 connections open between requests"""
+
+    protocol_version = "HTTP/1.1"
+
+
+class BoundedWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug server that hands connections to a fixed thread pool.
+
+    Connections beyond `connection_limit` are answered with 503 straight
+    away instead of queuing without bound. Idle keep-alive connections are
+    closed after `channel_timeout` seconds.
+    """
+
+    def __init__(self, host: str, port: int, app, threads: int = 8,
+                 connection_limit: int = 100, channel_timeout: float = 15,
+                 backlog: int = 128):
+        # Read by server_activate() during BaseWSGIServer.__init__
+        self.request_queue_size = backlog
+        handler = type('BoundedRequestHandler', (KeepAliveRequestHandler,),
+                       {'timeout': channel_timeout})
+        super().__init__(host, port, app, handler=handler)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='pipe-ui-http')
+        self._slots = threading.BoundedSemaphore(connection_limit)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Connection limit reached, rejecting {client_address[0]}")
+            try:
+                request.sendall(SERVICE_UNAVAILABLE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self, timeout: float):
+        """Wait up to `timeout` seconds for in-flight requests to finish"""
+        waiter = threading.Thread(target=self._pool.shutdown, kwargs={'wait': True})
+        waiter.daemon = True
+        waiter.start()
+        waiter.join(timeout)
+        if waiter.is_alive():
+            logger.warning(f"Requests still running after {timeout}s, exiting anyway")
+
+
+def serve(app, host: str, port: int, threads: int = 8, connection_limit: int = 100,
+          channel_timeout: float = 15, backlog: int = 128, shutdown_timeout: float = 4,
+          on_shutdown: Optional[Callable[[], None]] = None,
+          after_shutdown: Optional[Callable[[], None]] = None):
+    """
+    Serve a WSGI app until SIGTERM or SIGINT, then shut down gracefully.
+
+    Args:
+        app: WSGI application
+        host (str): Address to bind
+        port (int): Port to bind
+        threads (int): Worker threads handling requests
+        connection_limit (int): Maximum simultaneous connections
+        channel_timeout (float): Seconds before an idle connection is closed
+        backlog (int): Listen backlog for pending connections
+        shutdown_timeout (float): Seconds to wait for in-flight requests
+            (waitress uses its own fixed drain timeout)
+        on_shutdown (Callable, optional): Called first on shutdown, e.g. to
+            end long-lived streams so their workers can finish
+        after_shutdown (Callable, optional): Called once in-flight requests
+            have drained and the server is closed
+    """
+    try:
+        import waitress
+    except ImportError:
+        waitress = None
+
+    if waitress:
+        server = waitress.create_server(
+            app, host=host, port=port, threads=threads,
+            connection_limit=connection_limit, channel_timeout=channel_timeout,
+            backlog=backlog, ident='pipe-pop-ui'
+        )
+        logger.info(f"Serving with waitress on http://{host}:{port} ({threads} threads)")
+    else:
+        server = BoundedWSGIServer(host, port, app, threads=threads,
+                                   connection_limit=connection_limit,
+                                   channel_timeout=channel_timeout, backlog=backlog)
+        logger.info(f"Serving with bounded Werkzeug server on http://{host}:{port} ({threads} threads)")
+
+    def _handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down")
+        if on_shutdown:
+            try:
+                on_shutdown()
+            except Exception as e:
+                logger.error(f"Shutdown hook failed: {e}")
+        if waitress:
+            # waitress drains its task queue when run() is interrupted
+            raise SystemExit(0)
+        # shutdown() blocks until serve_forever() returns, so call it elsewhere
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    previous = {sig: signal.signal(sig, _handle_signal) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        if waitress:
+            server.run()
+        else:
+            server.serve_forever()
+            server.drain(shutdown_timeout)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        if waitress:
+            server.close()
+        else:
+            server.server_close()
+        logger.info("Server stopped")
+        if after_shutdown:
+            try:
+                after_shutdown()
+            except Exception as e:
+                logger.error(f"Shutdown hook failed: {e}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Server-Sent Events support for Pipe Network PoP Web UI.
+One producer publishes events, which are serialized once and fanned out to
+any number of subscribers through bounded per-subscriber queues.
+"""
+
+import json
+import queue
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel pushed to a subscriber queue to end its stream
+_CLOSE = object()
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """
+    Serialize one event in text/event-stream format.
+
+    Args:
+        event (str): Event name
+        data (Any): JSON-serializable payload
+        event_id (int, optional): Value for the `id:` field
+
+    Returns:
+        str: Wire-format event terminated by a blank line
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def diff_dict(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the keys of `new` whose values differ from `old`"""
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+def new_lines(previous: List[str], current: List[str]) -> List[str]:
+    """
+    Work out which lines of a tail window were appended since the last one.
+
+    Finds the longest suffix of `previous` that is a prefix of `current`
+    and returns whatever follows it.
+
+    Args:
+        previous (List[str]): Last window sent to clients
+        current (List[str]): Newly read window
+
+    Returns:
+        List[str]: Lines not seen before
+    """
+    if not previous:
+        return list(current)
+    for overlap in range(min(len(previous), len(current)), 0, -1):
+        if previous[-overlap:] == current[:overlap]:
+            return current[overlap:]
+    return list(current)
+
+
+class Subscription:
+    """A single client's event queue"""
+
+    def __init__(self, max_queue: int):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+        self.dropped = False
+
+
+class Broadcaster:
+    """
+    Fan out events from one producer to many subscribers.
+
+    Publishing never blocks the producer. A subscriber whose queue is full
+    is too slow to keep up, so it is disconnected; EventSource clients
+    reconnect automatically and get a fresh full state on connect.
+    """
+
+    def __init__(self, max_queue: int = 64, max_subscribers: int = 100,
+                 heartbeat: float = 15.0):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Optional[Subscription]:
+        """
+        Register a new subscriber.
+
+        Returns:
+            Subscription: The new subscription, or None when the
+            subscriber limit has been reached
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            sub = Subscription(self.max_queue)
+            self._subscribers.add(sub)
+            return sub
+
+    def unsubscribe(self, sub: Subscription):
+        """Remove a subscriber"""
+        with self._lock:
+            self._subscribers.discard(sub)
+        sub.closed = True
+
+    def publish(self, event: str, data: Any, event_id: Optional[int] = None):
+        """
+        Send an event to every subscriber.
+
+        Args:
+            event (str): Event name
+            data (Any): JSON-serializable payload
+            event_id (int, optional): Value for the `id:` field
+        """
+        if not self._subscribers:
+            return
+
+        message = format_sse(event, data, event_id)
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(message)
+            except queue.Full:
+                logger.warning("Dropping slow event stream subscriber")
+                sub.dropped = True
+                self.unsubscribe(sub)
+                # Make room for the close marker so the stream ends promptly
+                try:
+                    sub.queue.get_nowait()
+                    sub.queue.put_nowait(_CLOSE)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def close_all(self):
+        """Disconnect every subscriber, e.g. on shutdown"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            self.unsubscribe(sub)
+            try:
+                sub.queue.put_nowait(_CLOSE)
+            except queue.Full:
+                pass
+
+    def stream(self, sub: Subscription, initial: Iterable[str] = ()) -> Iterator[str]:
+        """
+        Generate the wire data for one subscriber.
+
+        Args:
+            sub (Subscription): Subscription returned by subscribe()
+            initial (Iterable[str]): Pre-formatted events to send first
+
+        Yields:
+            str: Events and heartbeat comments
+        """
+        try:
+            # Ask the browser to wait a few seconds before reconnecting
+            yield "retry: 3000\n\n"
+            for message in initial:
+                yield message
+
+            while not sub.closed:
+                try:
+                    message = sub.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Comment lines keep proxies from timing out idle streams
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is _CLOSE:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(sub)
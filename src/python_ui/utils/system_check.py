@@ -7,14 +7,18 @@ for running a Pipe Network PoP Node.
 
 import os
 import sys
+import time
 import platform
 import shutil
 import subprocess
 import logging
 import socket
+import threading
 import urllib.request
 import json
-from typing import Dict, Any, Tuple, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from typing import Callable, Dict, Any, Tuple, List, Optional
 import re
 
 # Configure logging
@@ -30,6 +34,15 @@ MIN_DISK_SPACE_GB = 20  # 20 GB
 REQUIRED_PORTS = [4500, 8585]  # Default ports
 REQUIRED_COMMANDS = ["python3", "curl", "ip", "iptables"]
 
+# Network probes, configurable for hosts without internet access
+DEFAULT_PROBE_URLS = ["https://www.google.com", "https://www.cloudflare.com"]
+DEFAULT_IP_LOOKUP_URL = "https://api.ipify.org?format=json"
+PROBE_TIMEOUT = 5  # Seconds per request
+
+CHECK_DEADLINE = 8  # Seconds to wait for all checks
+CACHE_TTL = 300  # Seconds results are reused
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/pipe-pop/system-check.json")
+
 
 def check_os_compatibility() -> Tuple[bool, str]:
     """
@@ -152,62 +165,88 @@ def check_disk_space(directory: str = "/") -> Tuple[bool, str]:
         return False, f"Error checking disk space: {str(e)}"
 
 
-def check_network_connectivity() -> Tuple[bool, str]:
+def _fetch(url: str, timeout: float) -> bytes:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read(65536)
+
+
+def _port_in_use(port: int, timeout: float = 1) -> bool:
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return sock.connect_ex(('127.0.0.1', port)) == 0
+    except Exception:
+        return False  # Assume port is available if we couldn't check
+
+
+def check_network_connectivity(probe_urls: Optional[List[str]] = None,
+                               ip_lookup_url: Optional[str] = DEFAULT_IP_LOOKUP_URL,
+                               ports: Optional[List[int]] = None,
+                               timeout: float = PROBE_TIMEOUT) -> Tuple[bool, str]:
     """
     Check network connectivity.
     
+    The probe URLs, the public IP lookup and the port probes all run at
+    the same time; the first probe URL that answers settles internet
+    connectivity. An empty `probe_urls` list skips the internet check and
+    an empty `ip_lookup_url` skips the IP lookup, for air-gapped hosts.
+    
+    Args:
+        probe_urls (List[str], optional): URLs tried for internet access
+        ip_lookup_url (str, optional): URL returning {"ip": ...}
+        ports (List[int], optional): Ports that must be free
+        timeout (float): Timeout of each request
+    
     Returns:
         Tuple[bool, str]: (has_connectivity, message)
     """
-    # Check internet connectivity
+    probe_urls = DEFAULT_PROBE_URLS if probe_urls is None else probe_urls
+    ports = REQUIRED_PORTS if ports is None else ports
+    
+    pool = ThreadPoolExecutor(max_workers=len(probe_urls) + len(ports) + 1,
+                              thread_name_prefix="system-check-net")
     try:
-        # Try to connect to a reliable host
-        urllib.request.urlopen("https://www.google.com", timeout=5)
-        internet_connectivity = True
-        internet_message = "Internet connectivity: OK"
-    except Exception:
-        try:
-            # Try another host in case the first one is blocked
-            urllib.request.urlopen("https://www.cloudflare.com", timeout=5)
+        probes = [pool.submit(_fetch, url, timeout) for url in probe_urls]
+        ip_lookup = pool.submit(_fetch, ip_lookup_url, timeout) if ip_lookup_url else None
+        port_probes = {port: pool.submit(_port_in_use, port) for port in ports}
+        
+        # Check internet connectivity
+        if not probes:
             internet_connectivity = True
-            internet_message = "Internet connectivity: OK"
-        except Exception as e:
+            internet_message = "Internet connectivity: not checked"
+        else:
             internet_connectivity = False
-            internet_message = f"No internet connectivity: {str(e)}"
-    
-    # Try to get public IP address
-    try:
-        response = urllib.request.urlopen("https://api.ipify.org?format=json", timeout=5)
-        data = json.loads(response.read().decode())
-        public_ip = data.get("ip", "unknown")
-        ip_message = f"Public IP: {public_ip}"
-    except Exception:
-        public_ip = "unknown"
-        ip_message = "Could not determine public IP address"
-    
-    # Check if the required ports are available
-    open_ports = []
-    closed_ports = []
-    
-    for port in REQUIRED_PORTS:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('127.0.0.1', port))
-            sock.close()
-            
-            if result == 0:
-                closed_ports.append(port)
-            else:
-                open_ports.append(port)
-        except Exception:
-            open_ports.append(port)  # Assume port is available if we couldn't check
+            error = None
+            for future in as_completed(probes):
+                try:
+                    future.result()
+                    internet_connectivity = True
+                    break
+                except Exception as e:
+                    error = error or e
+            internet_message = ("Internet connectivity: OK" if internet_connectivity
+                                else f"No internet connectivity: {str(error)}")
+        
+        # Try to get public IP address
+        if ip_lookup is None:
+            ip_message = "Public IP: not checked"
+        else:
+            try:
+                public_ip = json.loads(ip_lookup.result().decode()).get("ip", "unknown")
+                ip_message = f"Public IP: {public_ip}"
+            except Exception:
+                ip_message = "Could not determine public IP address"
+        
+        # Check if the required ports are available
+        closed_ports = [port for port, future in port_probes.items() if future.result()]
+    finally:
+        pool.shutdown(wait=False)
     
     if closed_ports:
         port_message = f"Ports already in use: {', '.join(map(str, closed_ports))}"
         port_check = False
     else:
-        port_message = f"Required ports are available: {', '.join(map(str, REQUIRED_PORTS))}"
+        port_message = f"Required ports are available: {', '.join(map(str, ports))}"
         port_check = True
     
     # Combine results
@@ -236,52 +275,215 @@ def check_dependencies() -> Tuple[bool, str]:
         return True, f"All required dependencies are installed: {', '.join(REQUIRED_COMMANDS)}"
 
 
-def check_system() -> Dict[str, Any]:
-    """
-    Perform all system checks and return the results.
-    
-    Returns:
-        Dict[str, Any]: Dictionary with check results
-    """
-    results = {
-        "timestamp": platform.node(),
-        "system_info": {
-            "hostname": platform.node(),
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "processor": platform.processor(),
-            "architecture": platform.architecture()[0]
-        }
+def _system_info() -> Dict[str, str]:
+    return {
+        "hostname": platform.node(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "processor": platform.processor(),
+        "architecture": platform.architecture()[0]
     }
+
+
+class SystemChecker:
+    """
+    Runs the system checks concurrently and caches the results.
     
-    # Perform checks
-    os_ok, os_message = check_os_compatibility()
-    memory_ok, memory_message = check_memory()
-    disk_ok, disk_message = check_disk_space()
-    network_ok, network_message = check_network_connectivity()
-    dependencies_ok, dependencies_message = check_dependencies()
+    run() returns cached results while they are younger than `ttl`
+    seconds. Otherwise it starts all checks at once and waits at most
+    `deadline` seconds: checks still running then are listed under
+    "pending" and left out of the results. They keep running in the
+    background and complete the cached results when they finish, and a
+    run() during that time waits for them instead of probing again.
     
-    # Store results
-    results["os"] = os_ok
-    results["os_message"] = os_message
+    Results are also written to `cache_path` so the installer and the
+    web UI share them.
+    """
     
-    results["memory"] = memory_ok
-    results["memory_message"] = memory_message
+    def __init__(self, probe_urls: Optional[List[str]] = None,
+                 ip_lookup_url: Optional[str] = DEFAULT_IP_LOOKUP_URL,
+                 ports: Optional[List[int]] = None, timeout: float = PROBE_TIMEOUT,
+                 deadline: float = CHECK_DEADLINE, ttl: float = CACHE_TTL,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH):
+        self.probe_urls = DEFAULT_PROBE_URLS if probe_urls is None else list(probe_urls)
+        self.ip_lookup_url = ip_lookup_url
+        self.ports = REQUIRED_PORTS if ports is None else [int(p) for p in ports]
+        self.timeout = timeout
+        self.deadline = deadline
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._results = None
+        self._futures = None
+        self._key = json.dumps([self.probe_urls, self.ip_lookup_url, self.ports])
+    
+    def configure(self, **settings) -> None:
+        """
+        Change any of the settings taken by __init__ except cache_path.
+        
+        Cached results are dropped, and checks still running with the old
+        settings no longer complete them.
+        
+        Raises:
+            TypeError: For an unknown setting
+        """
+        unknown = set(settings) - {'probe_urls', 'ip_lookup_url', 'ports', 'timeout', 'deadline', 'ttl'}
+        if unknown:
+            raise TypeError(f"Unknown system check settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            if 'probe_urls' in settings:
+                probe_urls = settings['probe_urls']
+                self.probe_urls = DEFAULT_PROBE_URLS if probe_urls is None else list(probe_urls)
+            if 'ip_lookup_url' in settings:
+                self.ip_lookup_url = settings['ip_lookup_url']
+            if 'ports' in settings:
+                ports = settings['ports']
+                self.ports = REQUIRED_PORTS if ports is None else [int(p) for p in ports]
+            for name in ('timeout', 'deadline', 'ttl'):
+                if name in settings:
+                    setattr(self, name, settings[name])
+            self._key = json.dumps([self.probe_urls, self.ip_lookup_url, self.ports])
+            self._results = None
+            self._futures = None
+    
+    def _checks(self) -> Dict[str, Callable[[], Tuple[bool, str]]]:
+        return {
+            "os": check_os_compatibility,
+            "memory": check_memory,
+            "disk": check_disk_space,
+            "network": lambda: check_network_connectivity(self.probe_urls, self.ip_lookup_url,
+                                                          self.ports, self.timeout),
+            "dependencies": check_dependencies
+        }
     
-    results["disk"] = disk_ok
-    results["disk_message"] = disk_message
+    def _fresh(self, results: Optional[Dict[str, Any]]) -> bool:
+        return bool(results) and not results.get("pending") and \
+            results.get("config") == self._key and time.time() - results.get("checked", 0) < self.ttl
     
-    results["network"] = network_ok
-    results["network_message"] = network_message
+    def cached(self) -> Optional[Dict[str, Any]]:
+        """Cached results (from memory or the cache file) if still fresh"""
+        results = self._results
+        if self._fresh(results):
+            return results
+        if self.cache_path:
+            try:
+                with open(self.cache_path, 'r') as f:
+                    results = json.load(f)
+            except (IOError, OSError, ValueError):
+                return None
+            if self._fresh(results):
+                self._results = results
+                return results
+        return None
+    
+    def run(self, refresh: bool = False, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get check results, probing only if the cache is stale.
+        
+        Args:
+            refresh (bool): Ignore cached results
+            deadline (float, optional): Seconds to wait, overrides the default
+        
+        Returns:
+            Dict[str, Any]: Check results, see check_system()
+        """
+        if not refresh:
+            results = self.cached()
+            if results:
+                return results
+        
+        started = False
+        with self._lock:
+            futures = self._futures
+            if futures is None:
+                checks = self._checks()
+                pool = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="system-check")
+                futures = self._futures = {name: pool.submit(check) for name, check in checks.items()}
+                pool.shutdown(wait=False)
+                started = True
+        
+        # Outside the lock, a finished future runs its callback right away
+        if started:
+            for future in futures.values():
+                future.add_done_callback(lambda _: self._collect())
+        
+        wait(list(futures.values()), timeout=self.deadline if deadline is None else deadline)
+        return self._assemble(futures)
+    
+    def _assemble(self, futures: Dict[str, Future]) -> Dict[str, Any]:
+        results = {
+            "timestamp": datetime.now().isoformat(),
+            "checked": time.time(),
+            "config": self._key,
+            "system_info": _system_info()
+        }
+        pending = []
+        for name, future in futures.items():
+            if not future.done():
+                pending.append(name)
+                continue
+            try:
+                ok, message = future.result()
+            except Exception as e:
+                logger.error(f"System check {name} failed: {str(e)}")
+                ok, message = False, f"Error running {name} check: {str(e)}"
+            results[name] = ok
+            results[f"{name}_message"] = message
+        
+        results["pending"] = pending
+        if pending:
+            results["pending_message"] = (f"Still checking after {self.deadline:g}s: {', '.join(pending)}")
+        
+        # Overall result
+        results["all_checks_passed"] = not pending and all(results[name] for name in futures)
+        return results
+    
+    def _collect(self):
+        """Cache the results once every check has finished"""
+        with self._lock:
+            futures = self._futures
+            if futures is None or not all(f.done() for f in futures.values()):
+                return
+            self._futures = None
+        results = self._assemble(futures)
+        self._results = results
+        if self.cache_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+                temp_path = f"{self.cache_path}.tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump(results, f)
+                os.replace(temp_path, self.cache_path)
+            except (IOError, OSError) as e:
+                logger.warning(f"Could not cache system check results: {str(e)}")
+
+
+_default_checker = None
+
+
+def check_system(refresh: bool = False, deadline: Optional[float] = None,
+                 checker: Optional[SystemChecker] = None) -> Dict[str, Any]:
+    """
+    Perform all system checks and return the results.
     
-    results["dependencies"] = dependencies_ok
-    results["dependencies_message"] = dependencies_message
+    Checks run concurrently and results are cached, see SystemChecker.
     
-    # Overall result
-    results["all_checks_passed"] = os_ok and memory_ok and disk_ok and network_ok and dependencies_ok
+    Args:
+        refresh (bool): Probe again even if cached results are fresh
+        deadline (float, optional): Seconds to wait for the checks
+        checker (SystemChecker, optional): Checker with custom probes
     
-    return results
+    Returns:
+        Dict[str, Any]: Dictionary with check results. Checks that did not
+        finish before the deadline are listed in "pending".
+    """
+    global _default_checker
+    if checker is None:
+        if _default_checker is None:
+            _default_checker = SystemChecker()
+        checker = _default_checker
+    return checker.run(refresh=refresh, deadline=deadline)
 
 
 def get_installation_recommendations(check_results: Dict[str, Any]) -> List[str]:
@@ -292,20 +494,24 @@ def get_installation_recommendations(check_results: Dict[str, Any]) -> List[str]
         check_results (Dict[str, Any]): Results from check_system()
     
     Returns:
-        List[str]: List of recommendations
+        List[str]: List of recommendations, none for checks still pending
     """
     recommendations = []
+    pending = set(check_results.get("pending", []))
     
-    if not check_results.get("os", False):
+    def failed(name: str) -> bool:
+        return name not in pending and not check_results.get(name, False)
+    
+    if failed("os"):
         recommendations.append("Consider using a supported Linux distribution (Ubuntu 20.04+ recommended)")
     
-    if not check_results.get("memory", False):
+    if failed("memory"):
         recommendations.append(f"Increase system memory to at least {MIN_MEMORY_MB} MB for optimal performance")
     
-    if not check_results.get("disk", False):
+    if failed("disk"):
         recommendations.append(f"Ensure at least {MIN_DISK_SPACE_GB} GB of free disk space is available")
     
-    if not check_results.get("network", False):
+    if failed("network"):
         if "already in use" in check_results.get("network_message", ""):
             ports = re.findall(r'Ports already in use: ([\d, ]+)', check_results.get("network_message", ""))
             if ports:
@@ -314,7 +520,7 @@ def get_installation_recommendations(check_results: Dict[str, Any]) -> List[str]
         if "No internet connectivity" in check_results.get("network_message", ""):
             recommendations.append("Ensure the system has a working internet connection")
     
-    if not check_results.get("dependencies", False):
+    if failed("dependencies"):
         missing = re.findall(r'Missing dependencies: ([\w, ]+)', check_results.get("dependencies_message", ""))
         if missing:
             recommendations.append(f"Install missing dependencies: {missing[0]}")
@@ -322,10 +528,38 @@ def get_installation_recommendations(check_results: Dict[str, Any]) -> List[str]
     return recommendations
 
 
-if __name__ == "__main__":
-    print("Running Pipe Network PoP Node System Compatibility Check...\n")
-    
-    results = check_system()
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Pipe Network PoP Node system compatibility check')
+    parser.add_argument('--probe-url', action='append', dest='probe_urls',
+                        help='URL tried for internet access (repeatable)')
+    parser.add_argument('--no-internet', action='store_true', help='Skip internet and public IP checks')
+    parser.add_argument('--ip-url', default=DEFAULT_IP_LOOKUP_URL, help='Public IP lookup URL')
+    parser.add_argument('--port', type=int, action='append', dest='ports', help='Port that must be free (repeatable)')
+    parser.add_argument('--timeout', type=float, default=PROBE_TIMEOUT, help='Seconds per network request')
+    parser.add_argument('--deadline', type=float, default=CHECK_DEADLINE, help='Seconds to wait for all checks')
+    parser.add_argument('--ttl', type=float, default=CACHE_TTL, help='Seconds cached results are reused')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_PATH, help='Results cache file')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached results')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+    
+    checker = SystemChecker(
+        probe_urls=[] if args.no_internet else args.probe_urls,
+        ip_lookup_url=None if args.no_internet else args.ip_url,
+        ports=args.ports, timeout=args.timeout, deadline=args.deadline,
+        ttl=args.ttl, cache_path=args.cache_file or None
+    )
+    
+    if not args.json:
+        print("Running Pipe Network PoP Node System Compatibility Check...\n")
+    
+    results = check_system(refresh=args.refresh, checker=checker)
+    
+    if args.json:
+        print(json.dumps(dict(results, recommendations=get_installation_recommendations(results)), indent=2))
+        return 0 if results["all_checks_passed"] else 1
     
     print("\n=== System Check Results ===\n")
     
@@ -334,14 +568,21 @@ if __name__ == "__main__":
     else:
         print("⚠️ Some checks failed. This system may not meet all requirements for optimal performance.\n")
     
-    print(f"Operating System: {'✅' if results['os'] else '❌'} {results['os_message']}")
-    print(f"Memory: {'✅' if results['memory'] else '❌'} {results['memory_message']}")
-    print(f"Disk Space: {'✅' if results['disk'] else '❌'} {results['disk_message']}")
-    print(f"Network: {'✅' if results['network'] else '❌'} {results['network_message']}")
-    print(f"Dependencies: {'✅' if results['dependencies'] else '❌'} {results['dependencies_message']}")
+    for name, label in (("os", "Operating System"), ("memory", "Memory"), ("disk", "Disk Space"),
+                        ("network", "Network"), ("dependencies", "Dependencies")):
+        if name in results["pending"]:
+            print(f"{label}: ⏳ Did not finish within {args.deadline:g}s")
+        else:
+            print(f"{label}: {'✅' if results[name] else '❌'} {results[f'{name}_message']}")
     
     recommendations = get_installation_recommendations(results)
     if recommendations:
         print("\n=== Recommendations ===\n")
         for i, rec in enumerate(recommendations, 1):
-            print(f"{i}. {rec}") 
\ No newline at end of file
+            print(f"{i}. {rec}")
+    
+    return 0 if results["all_checks_passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
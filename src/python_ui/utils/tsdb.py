@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact time-series store for Pipe Network PoP Web UI.
+Each metric is kept as append-only segment files of fixed-width
+(timestamp, value) double records, one file per time partition. Reads
+memory-map the segments and binary search them, so range queries only
+touch the partitions and records they need.
+
+Rollup tiers of 1-minute, 15-minute, 1-hour and 1-day buckets holding
+min/max/sum/count are updated as samples are appended, so downsampled
+queries over long ranges read a bounded number of records.
+
+Writers (the UI and the history.sh CLI) share a lock file in the store
+directory, so several processes can append to the same store.
+"""
+
+import os
+import re
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Native byte order so segments can be read in place through a memoryview;
+# the store is local to the node and never copied between machines
+RECORD = struct.Struct('=dd')
+# Bucket start, min, max, sum, count
+ROLLUP_RECORD = struct.Struct('=ddddd')
+SEGMENT_SUFFIX = '.seg'
+LOCK_FILE = '.lock'
+DEFAULT_PARTITION_SECONDS = 86400
+
+# (bucket seconds, partition seconds), finest first. Partitions grow with
+# the bucket size so every tier holds a similar number of records per file.
+ROLLUP_TIERS = (
+    (60, 86400),
+    (900, 30 * 86400),
+    (3600, 90 * 86400),
+    (86400, 3650 * 86400)
+)
+
+METRIC_NAME_RE = re.compile(r'^[A-Za-z0-9_.-]+$')
+HISTORY_FILE_RE = re.compile(r'^metrics_(\d{8})_(\d{6})\.json$')
+
+
+def to_float(value) -> Optional[float]:
+    """Convert a history value such as 87, "87.5" or "87.5%" to a float"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip('%'))
+        except ValueError:
+            return None
+    return None
+
+
+def _search(view: memoryview, count: int, ts: float, stride: int = 2) -> int:
+    """First record index whose timestamp is >= ts (records are sorted)"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if view[mid * stride] < ts:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class TimeSeriesStore:
+    """
+    Append-only, time-partitioned store of float samples per metric.
+
+    Layout on disk: <root>/<metric>/<partition start>.seg, where each
+    segment is a flat array of (timestamp, value) doubles, and
+    <root>/<metric>/<bucket seconds>s/<partition start>.seg for the rollup
+    tiers, flat arrays of (bucket start, min, max, sum, count) doubles.
+    Samples older than the newest stored sample of a metric are dropped so
+    segments stay sorted.
+
+    Every write holds <root>/.lock. Another process may have written while
+    it was not held, so the cached newest timestamps and open rollup
+    buckets are dropped each time it is taken and re-read from disk.
+    """
+
+    def __init__(self, root: str, partition_seconds: int = DEFAULT_PARTITION_SECONDS,
+                 retention_days: int = 90):
+        self.root = root
+        self.partition_seconds = partition_seconds
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._last_ts = {}
+        self._open_buckets = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _metric_dir(self, metric: str) -> str:
+        if not METRIC_NAME_RE.match(metric):
+            raise ValueError(f"Invalid metric name: {metric}")
+        return os.path.join(self.root, metric)
+
+    def _partition(self, ts: float) -> int:
+        return int(ts) - int(ts) % self.partition_seconds
+
+    def _rollup_dir(self, metric: str, resolution: int) -> str:
+        return os.path.join(self._metric_dir(metric), f"{resolution}s")
+
+    def _segments(self, metric: str, resolution: Optional[int] = None) -> List[Tuple[int, str]]:
+        """(partition start, path) for each raw or rollup segment, oldest first"""
+        directory = self._metric_dir(metric) if resolution is None else self._rollup_dir(metric, resolution)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        segments = []
+        for name in names:
+            if name.endswith(SEGMENT_SUFFIX):
+                try:
+                    segments.append((int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(directory, name)))
+                except ValueError:
+                    continue
+        return sorted(segments)
+
+    def metrics(self) -> List[str]:
+        """Names of all stored metrics"""
+        try:
+            return sorted(name for name in os.listdir(self.root)
+                          if os.path.isdir(os.path.join(self.root, name)))
+        except OSError:
+            return []
+
+    def last(self, metric: str) -> Optional[Tuple[float, float]]:
+        """Most recent (timestamp, value) of a metric, or None"""
+        for _, path in reversed(self._segments(metric)):
+            size = os.path.getsize(path) // RECORD.size * RECORD.size
+            if size:
+                with open(path, 'rb') as f:
+                    f.seek(size - RECORD.size)
+                    return RECORD.unpack(f.read(RECORD.size))
+        return None
+
+    def _last_timestamp(self, metric: str) -> float:
+        if metric not in self._last_ts:
+            last = self.last(metric)
+            self._last_ts[metric] = last[0] if last else float('-inf')
+            if last and not os.path.isdir(self._rollup_dir(metric, ROLLUP_TIERS[0][0])):
+                self._rebuild_rollups(metric)
+        return self._last_ts[metric]
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            with open(os.path.join(self.root, LOCK_FILE), 'a') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                self._last_ts.clear()
+                self._open_buckets.clear()
+                yield
+
+    def append(self, metric: str, ts: float, value: float) -> bool:
+        """
+        Append one sample.
+
+        Returns:
+            bool: False if the sample was older than the newest stored one
+        """
+        return self.append_many(ts, {metric: value}) == 1
+
+    def append_many(self, ts: float, values: Dict[str, float]) -> int:
+        """
+        Append one sample for each of several metrics sharing a timestamp.
+
+        Returns:
+            int: Number of samples written
+        """
+        with self._locked():
+            return self._append_many(ts, values)
+
+    def _append_many(self, ts: float, values: Dict[str, float]) -> int:
+        written = 0
+        for metric, value in values.items():
+            value = to_float(value)
+            if value is None or ts <= self._last_timestamp(metric):
+                continue
+            directory = self._metric_dir(metric)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{self._partition(ts)}{SEGMENT_SUFFIX}")
+            with open(path, 'ab') as f:
+                f.write(RECORD.pack(ts, value))
+            self._last_ts[metric] = ts
+            self._update_rollups(metric, ts, value)
+            written += 1
+        return written
+
+    def _last_bucket(self, metric: str, resolution: int) -> Optional[list]:
+        """The newest bucket of a tier, from memory or the end of its last segment"""
+        key = (metric, resolution)
+        if key not in self._open_buckets:
+            bucket = None
+            for _, path in reversed(self._segments(metric, resolution)):
+                size = os.path.getsize(path) // ROLLUP_RECORD.size * ROLLUP_RECORD.size
+                if size:
+                    with open(path, 'rb') as f:
+                        f.seek(size - ROLLUP_RECORD.size)
+                        bucket = list(ROLLUP_RECORD.unpack(f.read(ROLLUP_RECORD.size)))
+                    break
+            self._open_buckets[key] = bucket
+        return self._open_buckets[key]
+
+    def _update_rollups(self, metric: str, ts: float, value: float) -> None:
+        """Fold one sample into the open bucket of every tier"""
+        for resolution, partition_seconds in ROLLUP_TIERS:
+            start = int(ts) - int(ts) % resolution
+            partition = start - start % partition_seconds
+            directory = self._rollup_dir(metric, resolution)
+            path = os.path.join(directory, f"{partition}{SEGMENT_SUFFIX}")
+            bucket = self._last_bucket(metric, resolution)
+
+            if bucket is not None and bucket[0] == start:
+                # Rewrite the open bucket in place
+                bucket[1] = min(bucket[1], value)
+                bucket[2] = max(bucket[2], value)
+                bucket[3] += value
+                bucket[4] += 1
+                with open(path, 'r+b') as f:
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(size - size % ROLLUP_RECORD.size - ROLLUP_RECORD.size)
+                    f.write(ROLLUP_RECORD.pack(*bucket))
+            else:
+                bucket = [float(start), value, value, value, 1.0]
+                os.makedirs(directory, exist_ok=True)
+                with open(path, 'ab') as f:
+                    f.write(ROLLUP_RECORD.pack(*bucket))
+                self._open_buckets[(metric, resolution)] = bucket
+
+    def _rebuild_rollups(self, metric: str) -> None:
+        """Recompute every rollup tier of a metric from its raw samples"""
+        logger.info(f"Building rollups for {metric}")
+        for resolution, _ in ROLLUP_TIERS:
+            for _, path in self._segments(metric, resolution):
+                os.remove(path)
+            self._open_buckets[(metric, resolution)] = None
+        timestamps, values = self.query(metric)
+        for resolution, partition_seconds in ROLLUP_TIERS:
+            directory = self._rollup_dir(metric, resolution)
+            os.makedirs(directory, exist_ok=True)
+            segments = {}
+            bucket = None
+            for ts, value in zip(timestamps, values):
+                start = int(ts) - int(ts) % resolution
+                if bucket is not None and bucket[0] == start:
+                    bucket[1] = min(bucket[1], value)
+                    bucket[2] = max(bucket[2], value)
+                    bucket[3] += value
+                    bucket[4] += 1
+                    continue
+                if bucket is not None:
+                    segments.setdefault(int(bucket[0]) - int(bucket[0]) % partition_seconds,
+                                        bytearray()).extend(ROLLUP_RECORD.pack(*bucket))
+                bucket = [float(start), value, value, value, 1.0]
+            if bucket is not None:
+                segments.setdefault(int(bucket[0]) - int(bucket[0]) % partition_seconds,
+                                    bytearray()).extend(ROLLUP_RECORD.pack(*bucket))
+            for partition, data in segments.items():
+                with open(os.path.join(directory, f"{partition}{SEGMENT_SUFFIX}"), 'wb') as f:
+                    f.write(data)
+            self._open_buckets[(metric, resolution)] = bucket
+
+    def rebuild_rollups(self, metric: str) -> None:
+        """Recompute the rollup tiers of a metric, e.g. after manual edits"""
+        with self._locked():
+            self._rebuild_rollups(metric)
+
+    def query(self, metric: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> Tuple[array, array]:
+        """
+        Get the samples of a metric within a time range.
+
+        Args:
+            metric (str): Metric name
+            start (float, optional): Earliest timestamp, inclusive
+            end (float, optional): Latest timestamp, inclusive
+
+        Returns:
+            Tuple[array, array]: Timestamps and values as arrays of doubles
+        """
+        records = array('d')
+        for partition, path in self._segments(metric):
+            if end is not None and partition > end:
+                break
+            if start is not None and partition + self.partition_seconds <= start:
+                continue
+            self._read_segment(path, start, end, records)
+        return records[0::2], records[1::2]
+
+    def _read_segment(self, path: str, start: Optional[float], end: Optional[float],
+                      out: array, record: struct.Struct = RECORD) -> None:
+        stride = record.size // 8
+        with open(path, 'rb') as f:
+            count = os.fstat(f.fileno()).st_size // record.size
+            if not count:
+                return
+            mm = mmap.mmap(f.fileno(), count * record.size, access=mmap.ACCESS_READ)
+            try:
+                view = memoryview(mm).cast('d')
+                try:
+                    lo = _search(view, count, start, stride) if start is not None else 0
+                    hi = _search(view, count, end + 1e-9, stride) if end is not None else count
+                    if hi > lo:
+                        out.frombytes(mm[lo * record.size:hi * record.size])
+                finally:
+                    view.release()
+            finally:
+                mm.close()
+
+    def _query_rollup(self, metric: str, resolution: int, partition_seconds: int,
+                      start: Optional[float], end: Optional[float]) -> array:
+        """Flat (start, min, max, sum, count) doubles of the buckets overlapping a range"""
+        if start is not None:
+            start = int(start) - int(start) % resolution
+        records = array('d')
+        for partition, path in self._segments(metric, resolution):
+            if end is not None and partition > end:
+                break
+            if start is not None and partition + partition_seconds <= start:
+                continue
+            self._read_segment(path, start, end, records, ROLLUP_RECORD)
+        return records
+
+    def first(self, metric: str) -> Optional[float]:
+        """Timestamp of the oldest retained data of a metric, or None"""
+        for resolution, _ in reversed(ROLLUP_TIERS):
+            for _, path in self._segments(metric, resolution):
+                with open(path, 'rb') as f:
+                    data = f.read(ROLLUP_RECORD.size)
+                if len(data) == ROLLUP_RECORD.size:
+                    return ROLLUP_RECORD.unpack(data)[0]
+        for _, path in self._segments(metric):
+            with open(path, 'rb') as f:
+                data = f.read(RECORD.size)
+            if len(data) == RECORD.size:
+                return RECORD.unpack(data)[0]
+        return None
+
+    def downsample(self, metric: str, start: Optional[float] = None,
+                   end: Optional[float] = None, points: int = 100) -> Dict[str, object]:
+        """
+        Get at most `points` buckets of min/max/avg/count covering a range.
+
+        The coarsest rollup tier that still yields at least `points` buckets
+        is read, and its buckets are merged down to `points`, so the cost
+        does not grow with the length of the range. Ranges too short for
+        the finest tier are served from raw samples.
+
+        Args:
+            metric (str): Metric name
+            start (float, optional): Range start, defaults to the oldest data
+            end (float, optional): Range end, defaults to the newest sample
+            points (int): Maximum number of buckets
+
+        Returns:
+            Dict[str, object]: resolution (bucket seconds of the tier read,
+            0 for raw samples) and buckets as [start, min, max, avg, count]
+        """
+        points = max(1, int(points))
+        with self._locked():
+            # Builds missing rollups for stores written before tiers existed
+            newest = self._last_timestamp(metric)
+        if start is None:
+            start = self.first(metric)
+        if end is None:
+            end = newest
+        if start is None or end == float('-inf') or end < start:
+            return {'resolution': 0, 'buckets': []}
+
+        span = end - start
+        records, resolution = None, 0
+        for tier_resolution, partition_seconds in reversed(ROLLUP_TIERS):
+            if span / tier_resolution >= points:
+                records = self._query_rollup(metric, tier_resolution, partition_seconds, start, end)
+                resolution = tier_resolution
+                break
+
+        if records is None:
+            timestamps, values = self.query(metric, start, end)
+            records = array('d')
+            for ts, value in zip(timestamps, values):
+                records.extend((ts, value, value, value, 1.0))
+
+        # Merge into `points` equal time slots across the range
+        width = max(span / points, resolution, 1e-9)
+        buckets = []
+        slot = None
+        for i in range(0, len(records), 5):
+            ts, low, high, total, n = records[i:i + 5]
+            index = int((ts - start) / width)
+            if buckets and index == slot:
+                bucket = buckets[-1]
+                bucket[1] = min(bucket[1], low)
+                bucket[2] = max(bucket[2], high)
+                bucket[3] += total
+                bucket[4] += n
+            else:
+                buckets.append([ts, low, high, total, n])
+                slot = index
+        for bucket in buckets:
+            bucket[3] = bucket[3] / bucket[4]
+            bucket[4] = int(bucket[4])
+        return {'resolution': resolution, 'buckets': buckets}
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Apply retention and tidy old partitions.
+
+        Partitions entirely older than the retention period are deleted.
+        Closed partitions with a truncated trailing record (from a crash
+        mid-write) are rewritten without it.
+
+        Returns:
+            Dict[str, int]: Counts of removed and repaired segments
+        """
+        now = now if now is not None else time.time()
+        cutoff = now - self.retention_days * 86400
+        stats = {'removed': 0, 'repaired': 0}
+
+        with self._locked():
+            for metric in self.metrics():
+                tiers = [(None, self.partition_seconds, RECORD)]
+                tiers += [(res, part, ROLLUP_RECORD) for res, part in ROLLUP_TIERS]
+                for resolution, partition_seconds, record in tiers:
+                    current_partition = int(now) - int(now) % partition_seconds
+                    for partition, path in self._segments(metric, resolution):
+                        if partition + partition_seconds <= cutoff:
+                            os.remove(path)
+                            stats['removed'] += 1
+                            continue
+                        if partition >= current_partition:
+                            continue
+                        size = os.path.getsize(path)
+                        if size % record.size:
+                            with open(path, 'r+b') as f:
+                                f.truncate(size - size % record.size)
+                            stats['repaired'] += 1
+                    if resolution is not None:
+                        self._open_buckets.pop((metric, resolution), None)
+                self._last_ts.pop(metric, None)
+
+        if stats['removed'] or stats['repaired']:
+            logger.info(f"Compacted time-series store: {stats}")
+        return stats
+
+    def import_json_history(self, directory: str, since: Optional[float] = None) -> int:
+        """
+        Import metrics_YYYYMMDD_HHMMSS.json files written by history.sh.
+
+        Files are imported in time order and numeric fields become metrics.
+        Files whose name is not newer than `since` are skipped without being
+        opened, so repeated imports of the same directory are cheap.
+
+        Args:
+            directory (str): History directory
+            since (float, optional): Only import files newer than this
+
+        Returns:
+            int: Number of samples written
+        """
+        try:
+            names = os.listdir(directory)
+        except OSError as e:
+            logger.debug(f"History directory unavailable: {e}")
+            return 0
+
+        files = []
+        for name in names:
+            match = HISTORY_FILE_RE.match(name)
+            if not match:
+                continue
+            ts = time.mktime(datetime.strptime(match.group(1) + match.group(2), '%Y%m%d%H%M%S').timetuple())
+            if since is None or ts > since:
+                files.append((ts, name))
+
+        written = 0
+        # One lock for the whole import, so concurrent imports of the same
+        # directory cannot both write a file's samples
+        with self._locked():
+            for file_ts, name in sorted(files):
+                try:
+                    with open(os.path.join(directory, name), 'r') as f:
+                        data = json.load(f)
+                except (IOError, OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable history file {name}: {e}")
+                    continue
+                ts = to_float(data.get('timestamp')) or file_ts
+                values = {k: v for k, v in data.items()
+                          if k not in ('timestamp', 'date') and METRIC_NAME_RE.match(k)}
+                written += self._append_many(ts, values)
+        return written
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pipe Network PoP metrics history store')
+    parser.add_argument('--store', default=os.path.expanduser('~/.local/share/pipe-pop/tsdb'),
+                        help='Store directory')
+    sub = parser.add_subparsers(dest='command')
+    p_import = sub.add_parser('import', help='Import history.sh JSON files')
+    p_import.add_argument('directory')
+    p_import.add_argument('--new-only', action='store_true',
+                          help='Skip files not newer than the last imported reputation sample')
+    p_query = sub.add_parser('query', help='Print samples of a metric')
+    p_query.add_argument('metric')
+    p_query.add_argument('--from', dest='start', type=float)
+    p_query.add_argument('--to', dest='end', type=float)
+    p_downsample = sub.add_parser('downsample', help='Print min/max/avg/count buckets of a metric')
+    p_downsample.add_argument('metric')
+    p_downsample.add_argument('--from', dest='start', type=float)
+    p_downsample.add_argument('--to', dest='end', type=float)
+    p_downsample.add_argument('--points', type=int, default=100)
+    p_rebuild = sub.add_parser('rebuild', help='Recompute rollup tiers of a metric')
+    p_rebuild.add_argument('metric')
+    sub.add_parser('metrics', help='List stored metrics')
+    sub.add_parser('compact', help='Apply retention')
+    args = parser.parse_args(argv)
+
+    store = TimeSeriesStore(args.store)
+    if args.command == 'import':
+        since = None
+        if args.new_only:
+            last = store.last('reputation')
+            since = last[0] if last else None
+        print(f"Imported {store.import_json_history(args.directory, since=since)} samples")
+    elif args.command == 'query':
+        timestamps, values = store.query(args.metric, args.start, args.end)
+        for ts, value in zip(timestamps, values):
+            print(f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')} {value:g}")
+    elif args.command == 'downsample':
+        # start min max avg count, tab-separated for shell scripts
+        for bucket in store.downsample(args.metric, args.start, args.end, args.points)['buckets']:
+            print("\t".join([f"{bucket[0]:.0f}"] + [f"{v:g}" for v in bucket[1:]]))
+    elif args.command == 'rebuild':
+        store.rebuild_rollups(args.metric)
+    elif args.command == 'metrics':
+        for name in store.metrics():
+            print(name)
+    elif args.command == 'compact':
+        print(store.compact())
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()